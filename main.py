@@ -6,10 +6,12 @@ if sys.platform.startswith("win"):
     from asyncio import WindowsSelectorEventLoopPolicy
     asyncio.set_event_loop_policy(WindowsSelectorEventLoopPolicy())
 
-from src.di import dp, bot, polling_service
-
 async def main():
+    # импорт внутри: процессы пула картинок (spawn) импортируют main.py, но не должны собирать DI
+    from src.di import dp, bot, polling_service, media_gc
+
     asyncio.create_task(polling_service.run())
+    asyncio.create_task(media_gc.run())
     await dp.start_polling(bot)
 
 if __name__ == "__main__":
@@ -1,11 +1,11 @@
 # src/bot/handlers/post.py
+from datetime import datetime
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from aiogram.types import CallbackQuery, Message, InputMediaPhoto, FSInputFile
-from pathlib import Path
+from aiogram.types import CallbackQuery, Message, InputMediaPhoto
 
-from src.utils.paths import MEDIA_DIR
 from src.bot.keyboards import main_keyboard, edit_keyboard, media_keyboard
 from src.bot.filter import LockManager, EditingSessionFilter, ProgOrAdminFilter
 
@@ -26,12 +26,14 @@ def build_post_admin_router(
     *,
     build_caption,
     build_meta,
+    file_cache,
 ) -> Router:
     """
     sent_repo      -> DuckDBRepository(SentNewsItem)
     processed_repo -> DuckDBRepository(ProcessedNewsItem)
     build_caption(item) -> str
     build_meta(item)    -> str
+    file_cache     -> TelegramFileCache (медиа уходят по file_id, без повторной загрузки)
     """
     router = Router()
 
@@ -55,6 +57,20 @@ def build_post_admin_router(
             except Exception:
                 pass
 
+    def _album(media_ids, caption_full):
+        album, names = [], []
+        for mid in media_ids[:10]:
+            media_src = file_cache.source(mid)
+            if media_src is None:
+                continue
+            if not album:
+                cap, _trim = _clip(caption_full, 1024)  # Telegram caption limit
+                album.append(InputMediaPhoto(media=media_src, caption=cap, parse_mode="HTML"))
+            else:
+                album.append(InputMediaPhoto(media=media_src))
+            names.append(mid)
+        return album, names
+
     async def _send_post(bot, chat_id, item):
         """
         Отправить пост (как делает SendingService): альбом (если медиа) + meta с клавой.
@@ -66,25 +82,18 @@ def build_post_admin_router(
         caption_full = build_caption(item)
         # альбом
         if item.media_ids:
-            album = []
-            trimmed_any = False
-            for i, mid in enumerate(item.media_ids[:10]):
-                path = Path(MEDIA_DIR) / mid
-                if path.exists():
-                    media_src = FSInputFile(path)
-                elif len(mid) >= 40 and "." not in mid:
-                    media_src = mid
-                else:
-                    continue
-
-                if i == 0:
-                    cap, _trim = _clip(caption_full, 1024)  # Telegram caption limit
-                    trimmed_any = trimmed_any or _trim
-                    album.append(InputMediaPhoto(media=media_src, caption=cap, parse_mode="HTML"))
-                else:
-                    album.append(InputMediaPhoto(media=media_src))
+            album, names = _album(item.media_ids, caption_full)
             if album:
-                msgs = await bot.send_media_group(chat_id, album)
+                try:
+                    msgs = await bot.send_media_group(chat_id, album)
+                except Exception as e:
+                    if not (file_cache.is_stale_error(e) and file_cache.has_cached(names)):
+                        raise
+                    # Telegram отверг file_id — загружаем файлы заново
+                    file_cache.forget(names)
+                    album, names = _album(item.media_ids, caption_full)
+                    msgs = await bot.send_media_group(chat_id, album)
+                file_cache.remember(names, msgs)
                 if msgs:
                     main_mid = msgs[0].message_id
                     others.extend(m.message_id for m in msgs)
@@ -322,11 +331,12 @@ def build_post_admin_router(
         post = sent_repo.fetch_by_id(pid)
         main_mid, others = await _send_post(cb.bot, cb.message.chat.id, post)
 
-        # обновить message_ids в sent_repo
+        # обновить message_ids (и время отправки — от него считается хранение медиа)
         sent_repo.update_fields(
             pid,
             main_message_id=main_mid,
             others_message_ids=others,
+            sent_at=datetime.utcnow(),
         )
 
         await state.clear()
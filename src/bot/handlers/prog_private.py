@@ -3,15 +3,48 @@ from aiogram import Router
 from aiogram.types import Message
 from aiogram import F
 
-router = Router()
+STATE_ICONS = {"closed": "🟢", "half_open": "🟡", "open": "🔴"}
 
-@router.message(F.chat.type == "private", F.text.startswith("/"))
-async def prog_command_handler(message: Message):
+
+def build_prog_router(web_collector, prog_filter, scheduler=None) -> Router:
     """
-    Handle commands from programmers in private chat.
+    Команды разработчиков в личке.
+    web_collector -> WebScraperCollector (состояние источников для /sources)
+    prog_filter   -> фильтр доступа (ProgFilter); пропускает только разработчиков
+    scheduler     -> SourceScheduler | None (время следующего опроса)
     """
-    cmd = message.text.split()[0]
-    if cmd == "/status":
-        await message.answer("✅ Система запущена и принимает обновления.")
-    else:
-        await message.answer(f"Неизвестная команда: {cmd}")
+    router = Router()
+    # доступ проверяется на самом роутере: middleware на dp.update получает Update, а не Message
+    router.message.filter(prog_filter)
+
+    def _sources_text():
+        lines = ["Источники:"]
+        for h in web_collector.source_health():
+            line = (
+                f"{STATE_ICONS.get(h['state'], '⚪')} {h['class']} {h['url']}\n"
+                f"   опросов {h['total_runs']}, неудач {h['total_failures']} "
+                f"(подряд {h['failures']}), таймаутов {h['timeouts']}, статей {h['fetched']}"
+            )
+            if h["state"] == "open":
+                line += f"\n   пробный опрос через {h['retry_in']:.0f} с"
+            if scheduler is not None and h["url"] in scheduler.state:
+                line += f"\n   следующий опрос через {scheduler.delay(h['url']):.0f} с"
+            if h["last_error"] and h["failures"]:
+                line += f"\n   ошибка: {h['last_error'][:200]}"
+            lines.append(line)
+        return "\n".join(lines) if len(lines) > 1 else "Источников нет."
+
+    @router.message(F.chat.type == "private", F.text.startswith("/"))
+    async def prog_command_handler(message: Message):
+        """
+        Handle commands from programmers in private chat.
+        """
+        cmd = message.text.split()[0]
+        if cmd == "/status":
+            await message.answer("✅ Система запущена и принимает обновления.")
+        elif cmd == "/sources":
+            await message.answer(_sources_text()[:4096], disable_web_page_preview=True)
+        else:
+            await message.answer(f"Неизвестная команда: {cmd}")
+
+    return router
@@ -0,0 +1,61 @@
+# src/data_collector/circuit_breaker.py
+import time
+
+
+class CircuitBreaker:
+    """
+    Предохранитель источника.
+      closed    — опрашиваем как обычно; после threshold неудач подряд → open;
+      open      — источник пропускается cooldown секунд (без запросов и без логов ошибок);
+      half_open — по истечении cooldown один пробный опрос: успех → closed,
+                  неудача → снова open с удвоенным cooldown (не больше max_cooldown).
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold=3, cooldown=300.0, max_cooldown=6 * 3600.0):
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.state = self.CLOSED
+        self.cooldown = cooldown
+        self.failures = 0         # подряд
+        self.total_failures = 0
+        self.total_runs = 0
+        self.opened_until = 0.0   # time.monotonic()
+        self.last_error = None
+
+    def allow(self) -> bool:
+        """Можно ли опрашивать сейчас; по истечении cooldown переводит в half_open."""
+        if self.state == self.OPEN and time.monotonic() >= self.opened_until:
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def remaining(self) -> float:
+        """Секунд до пробного опроса (0 — не открыт)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_until - time.monotonic())
+
+    def success(self) -> bool:
+        """Учитывает удачный опрос; True — предохранитель только что замкнулся."""
+        self.total_runs += 1
+        recovered = self.state == self.HALF_OPEN
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        return recovered
+
+    def failure(self, error) -> bool:
+        """Учитывает неудачу; True — предохранитель только что разомкнулся."""
+        self.total_runs += 1
+        self.failures += 1
+        self.total_failures += 1
+        self.last_error = str(error) or error.__class__.__name__
+        if self.state == self.HALF_OPEN:
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+        elif self.failures < self.threshold:
+            return False
+        self.state = self.OPEN
+        self.opened_until = time.monotonic() + self.cooldown
+        return True
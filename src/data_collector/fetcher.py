@@ -0,0 +1,205 @@
+# src/data_collector/fetcher.py
+"""
+Общий слой скачивания для скраперов поверх HttpClient:
+  • семафор на хост — не больше N одновременных запросов к одному сайту;
+  • token bucket на хост — не чаще rate запросов в секунду (настраивается в source_map);
+  • повторы идемпотентных GET с экспоненциальной задержкой и джиттером,
+    заголовок Retry-After соблюдается;
+  • archive (HttpArchive) — запись ответов на диск или воспроизведение без сети.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import aiohttp
+from multidict import CIMultiDict
+
+
+class FetchError(aiohttp.ClientError):
+    def __init__(self, url, status):
+        super().__init__(f"HTTP {status} для {url}")
+        self.url = url
+        self.status = status
+
+
+@dataclass
+class HttpResponse:
+    """Ответ, уже прочитанный целиком (соединение возвращено в пул)."""
+    url: str
+    status: int
+    headers: CIMultiDict = field(default_factory=CIMultiDict)
+    body: bytes = b""
+    charset: str | None = None
+
+    @property
+    def ok(self):
+        return self.status < 400
+
+    def text(self):
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise FetchError(self.url, self.status)
+
+
+class TokenBucket:
+    """rate токенов в секунду, не больше burst подряд."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Fetcher:
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        http,
+        *,
+        retries=3,
+        backoff_base=0.5,
+        backoff_max=30.0,
+        host_concurrency=4,
+        logger=None,
+        archive=None,
+    ):
+        self.http = http
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.host_concurrency = host_concurrency
+        self.logger = logger
+        self.archive = archive
+        self._hosts = {}   # host -> (Semaphore, TokenBucket | None)
+        self._limits_of = {}  # host -> (concurrency, rate, burst), заданные явно
+
+    def configure_host(self, host, *, rate=None, burst=None, concurrency=None):
+        """
+        Лимиты для хоста; rate=None — без ограничения частоты, только семафор.
+        Если хост уже настроен другим источником, действуют более строгие лимиты
+        из обоих (конфликт — в лог), а не последние заданные.
+        """
+        concurrency = concurrency or self.host_concurrency
+        burst = burst or 1
+        prev = self._limits_of.get(host)
+        if prev is not None and prev != (concurrency, rate, burst):
+            p_conc, p_rate, p_burst = prev
+            merged = (
+                min(concurrency, p_conc),
+                min(r for r in (rate, p_rate) if r) if rate or p_rate else None,
+                min(burst, p_burst),
+            )
+            if self.logger:
+                self.logger.warning(
+                    "Разные лимиты для %s: %s и %s — берём строже: %s",
+                    host, prev, (concurrency, rate, burst), merged,
+                )
+            concurrency, rate, burst = merged
+        self._limits_of[host] = (concurrency, rate, burst)
+        self._hosts[host] = (
+            asyncio.Semaphore(concurrency),
+            TokenBucket(rate, burst) if rate else None,
+        )
+
+    def _limits(self, host):
+        if host not in self._hosts:
+            self.configure_host(host)
+        return self._hosts[host]
+
+    # ───────────────────────── запросы ───────────────────────── #
+    async def get(self, url, *, headers=None, timeout=10):
+        """
+        GET с лимитами хоста и повторами. Возвращает последний ответ —
+        вызывающий сам решает, что делать со статусом (304, 404 и т.п.).
+        Сетевые ошибки после исчерпания повторов пробрасываются.
+        """
+        sem, bucket = self._limits(urlparse(url).netloc)
+        attempt = 0
+        while True:
+            try:
+                async with sem:
+                    if bucket is not None:
+                        await bucket.acquire()
+                    resp = await self._request(url, headers, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries:
+                    raise
+                wait = self._backoff(attempt)
+                self._log_retry(url, e, wait)
+            else:
+                if resp.status not in self.RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+                retry_after = self._retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None and retry_after > self.backoff_max:
+                    return resp  # сервер просит ждать дольше, чем мы готовы — до следующего опроса
+                wait = retry_after if retry_after is not None else self._backoff(attempt)
+                self._log_retry(url, f"HTTP {resp.status}", wait)
+            attempt += 1
+            await asyncio.sleep(wait)
+
+    async def _request(self, url, headers, timeout):
+        if self.archive is not None:
+            if self.archive.replaying:
+                return await self.archive.replay(url)
+            headers = self.archive.request_headers(headers)
+        resp = await self._network(url, headers, timeout)
+        if self.archive is not None:
+            self.archive.record(url, resp)
+        return resp
+
+    async def _network(self, url, headers, timeout):
+        async with self.http.session.get(
+            url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            body = await resp.read()
+            try:
+                charset = resp.get_encoding()
+            except Exception:
+                charset = None
+            return HttpResponse(str(resp.url), resp.status, CIMultiDict(resp.headers), body, charset)
+
+    # ───────────────────────── helpers ───────────────────────── #
+    def _backoff(self, attempt):
+        """Экспонента с «половинным» джиттером: [d/2, d], d = base * 2^attempt."""
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    @staticmethod
+    def _retry_after(value):
+        """Retry-After: секунды или HTTP-дата → секунды ожидания (None, если не разобрали)."""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    def _log_retry(self, url, reason, wait):
+        if self.logger:
+            self.logger.debug("Повтор %s через %.1f с: %s", url, wait, reason)
@@ -0,0 +1,100 @@
+# src/data_collector/http_archive.py
+import asyncio
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+
+from multidict import CIMultiDict
+
+from src.data_collector.fetcher import HttpResponse
+
+
+class HttpArchive:
+    """
+    Запись/воспроизведение HTTP-обменов общего Fetcher'а.
+
+      root/index.jsonl             — по строке на ответ: url, статус, заголовки, хэш тела
+                                     (дописывается; при повторной записи URL побеждает последняя строка);
+      root/blobs/ab/<sha256>.gz    — тела, сжатые gzip и адресуемые по содержимому:
+                                     одинаковые ответы с разных URL хранятся один раз.
+
+    mode="record"  — ответы сети сохраняются (условные заголовки не отправляются,
+                     чтобы в архив попадали полные тела, а не 304);
+    mode="replay"  — сеть не используется, ответ берётся из архива через latency секунд;
+                     неизвестный URL → 404.
+    """
+
+    CONDITIONAL = ("If-None-Match", "If-Modified-Since")
+
+    def __init__(self, root, mode="replay", latency=0.0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Неизвестный режим архива: {mode!r}")
+        self.root = Path(root)
+        self.mode = mode
+        self.latency = latency
+        self.index = {}
+        self.stats = {"hits": 0, "misses": 0, "recorded": 0}
+        self._load()
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def _load(self):
+        path = self.root / "index.jsonl"
+        if not path.exists():
+            return
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.index[entry["url"]] = entry
+
+    def _blob(self, digest):
+        return self.root / "blobs" / digest[:2] / f"{digest}.gz"
+
+    # ───────────────────────── запись ───────────────────────── #
+    def request_headers(self, headers):
+        """Заголовки, с которыми идти в сеть при записи."""
+        if not headers or self.replaying:
+            return headers
+        return {k: v for k, v in headers.items() if k not in self.CONDITIONAL} or None
+
+    def record(self, url, resp: HttpResponse):
+        digest = hashlib.sha256(resp.body).hexdigest()
+        blob = self._blob(digest)
+        if not blob.exists():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(resp.body))
+            tmp.replace(blob)
+        entry = {
+            "url": url,
+            "final_url": resp.url,
+            "status": resp.status,
+            "headers": list(resp.headers.items()),
+            "charset": resp.charset,
+            "body": digest,
+            "recorded": datetime.utcnow().isoformat(),
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        with (self.root / "index.jsonl").open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.index[url] = entry
+        self.stats["recorded"] += 1
+
+    # ───────────────────────── воспроизведение ───────────────────────── #
+    async def replay(self, url) -> HttpResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        entry = self.index.get(url)
+        if entry is None:
+            self.stats["misses"] += 1
+            return HttpResponse(url, 404)
+        self.stats["hits"] += 1
+        body = gzip.decompress(self._blob(entry["body"]).read_bytes())
+        return HttpResponse(
+            entry["final_url"], entry["status"], CIMultiDict(entry["headers"]), body, entry["charset"]
+        )
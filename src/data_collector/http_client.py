@@ -0,0 +1,52 @@
+# src/data_collector/http_client.py
+import aiohttp
+
+
+class HttpClient:
+    """
+    Один aiohttp.ClientSession на процесс (владелец — DI-контейнер).
+    TCPConnector держит keep-alive соединения, кэширует DNS и ограничивает
+    число соединений на хост — скраперы и MediaService не платят за TCP/TLS каждый раз.
+    Сессия создаётся лениво: ей нужен уже запущенный event loop.
+    """
+
+    DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+    def __init__(
+        self,
+        *,
+        limit=100,
+        limit_per_host=8,
+        dns_ttl=300,
+        keepalive_timeout=30,
+        timeout=20,
+        headers=None,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.headers = headers or self.DEFAULT_HEADERS
+        self._session = None
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers,
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
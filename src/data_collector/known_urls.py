@@ -0,0 +1,39 @@
+# src/data_collector/known_urls.py
+
+
+class KnownUrls:
+    """
+    Множество уже известных URL (raw_news + отсеянные как дубликаты).
+    Скраперы спрашивают его до скачивания детальной страницы — известные статьи не качаются.
+    Из БД грузится один раз, дальше пополняется CollectorService'ом.
+    rejected — RejectedUrlRepository: отсеянные копии переживают перезапуск.
+    """
+
+    def __init__(self, repo, field="url", rejected=None):
+        self.repo = repo
+        self.field = field
+        self.rejected = rejected
+        self._urls = None
+
+    def _ensure(self):
+        if self._urls is None:
+            self._urls = {str(u) for u in self.repo.all_field(self.field)}
+            if self.rejected is not None:
+                self._urls.update(self.rejected.all_urls())
+        return self._urls
+
+    def __contains__(self, url):
+        return str(url) in self._ensure()
+
+    def __len__(self):
+        return len(self._ensure())
+
+    def add_many(self, urls):
+        self._ensure().update(str(u) for u in urls)
+
+    def reject_many(self, urls):
+        """Запоминает отсеянные URL; с rejected — и в БД."""
+        urls = [str(u) for u in urls]
+        if self.rejected is not None:
+            self.rejected.add_many(urls)
+        self.add_many(urls)
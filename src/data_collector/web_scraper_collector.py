@@ -1,10 +1,24 @@
 # src/data_collector/web_scraper_collector.py
 import asyncio
+from urllib.parse import urlparse
+
+from src.data_collector.circuit_breaker import CircuitBreaker
 
 class WebScraperCollector:
     """
     Принимает source_map из конфига, валидирует каждую запись,
     создаёт экземпляры скра-перов и асинхронно запускает их.
+    Все скраперы ходят в сеть через один общий HttpClient и Fetcher;
+    лимиты частоты/параллельности из SourceSpec настраиваются на хост источника.
+    stream() отдаёт статьи микробатчами по мере готовности — самый медленный
+    сайт больше не задерживает обработку остальных.
+    catchup_pages / catchup_max_age (timedelta) — пределы догоняющей пагинации
+    по умолчанию; SourceSpec.catchup_pages переопределяет глубину для источника.
+
+    deadline — предел одного опроса источника в секундах (SourceSpec.deadline
+    переопределяет): по истечении run() отменяется, уже отданные статьи остаются.
+    У каждого источника свой CircuitBreaker: лежащий сайт после breaker_threshold
+    неудач подряд не опрашивается, пока не истечёт cooldown.
     """
 
     def __init__(
@@ -13,8 +27,20 @@ class WebScraperCollector:
         source_spec_model,
         scraper_registry,
         logger,
+        http=None,
+        fetcher=None,
+        validators=None,
+        parse_pool=None,
+        catchup_pages=0,
+        catchup_max_age=None,
+        deadline=None,
+        breaker_threshold=3,
+        breaker_cooldown=300.0,
+        breaker_max_cooldown=6 * 3600.0,
     ):
         self.log = logger
+        self.http = http
+        self.fetcher = fetcher
         self.scrapers = []
 
         for topic, raw_specs in source_map.items():
@@ -30,27 +56,171 @@ class WebScraperCollector:
                     self.log.error("Scraper %s not found in registry", spec.class_)
                     continue
 
-                scraper = cls(str(spec.url))
+                if fetcher is not None:
+                    fetcher.configure_host(
+                        urlparse(str(spec.url)).netloc,
+                        rate=spec.rate_limit,
+                        burst=spec.rate_burst,
+                        concurrency=spec.max_concurrency,
+                    )
+                try:
+                    scraper = cls.from_spec(spec, http=http, fetcher=fetcher)
+                except Exception as e:
+                    self.log.error("Cannot create %s for %s: %s", spec.class_, spec.url, e)
+                    continue
                 scraper.topic = topic
+                scraper.validators = validators
+                if parse_pool is not None:
+                    scraper.parse_pool = parse_pool
+                scraper.catchup_pages = catchup_pages if spec.catchup_pages is None else spec.catchup_pages
+                scraper.catchup_max_age = catchup_max_age
+                scraper.deadline = spec.deadline or deadline
+                scraper.breaker = CircuitBreaker(breaker_threshold, breaker_cooldown, breaker_max_cooldown)
                 self.scrapers.append(scraper)
 
-    async def _safe_run(self, scraper):
-        try:
-            return await scraper.run()
-        except Exception as exc:
-            self.log.exception("%s failed: %s", scraper.__class__.__name__, exc)
+    async def _safe_run(self, scraper, known=None, emit=None):
+        """Опрос с предохранителем и дедлайном; при таймауте — то, что успели отдать."""
+        breaker = scraper.breaker
+        if not breaker.allow():
+            scraper.cycle_stats.clear()
+            self.log.debug("%s: предохранитель разомкнут, пробный опрос через %.0f с",
+                           scraper.base_url, breaker.remaining())
             return []
 
-    async def collect(self):
-        if not self.scrapers:
+        partial = []
+
+        async def keep(s, item):
+            partial.append(item)
+            if emit is not None:
+                await emit(s, item)
+
+        # не wait_for: сетевой таймаут внутри run() тоже TimeoutError, а это обычная неудача
+        task = asyncio.create_task(scraper.run(known, keep))
+        try:
+            await asyncio.wait({task}, timeout=scraper.deadline)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        if task.cancelled():
+            scraper._count("timeouts")
+            if not partial:
+                self._failed(scraper, f"не уложился в {scraper.deadline:g} с")
+                return []
+            self.log.warning("%s: не уложился в %g с, отдано статей: %d",
+                             scraper.base_url, scraper.deadline, len(partial))
+            items = partial
+        elif task.exception() is not None:
+            self._failed(scraper, task.exception())
             return []
+        else:
+            items = task.result()
 
-        results = await asyncio.gather(*(self._safe_run(s) for s in self.scrapers))
-        merged = []
+        if breaker.success():
+            self.log.info("%s: источник снова доступен", scraper.base_url)
+        return items
 
-        for scraper, items in zip(self.scrapers, results, strict=True):
-            for item in items:
-                item.setdefault("topic", scraper.topic)
-                merged.append(item)
+    def _failed(self, scraper, error):
+        breaker = scraper.breaker
+        name = scraper.__class__.__name__
+        if breaker.failure(error):
+            self.log.error("%s %s: неудач подряд %d, пропускаем %g с: %s",
+                           name, scraper.base_url, breaker.failures, breaker.cooldown, error)
+        elif breaker.failures == 1:
+            self.log.error("%s failed: %s", name, error,
+                           exc_info=error if isinstance(error, BaseException) else None)
+        else:
+            self.log.warning("%s failed (%d подряд): %s", name, breaker.failures, error)
 
-        return merged
\ No newline at end of file
+    def source_stats(self):
+        """Счётчики по источникам: {url: {"fetched": .., "skipped": ..}} за всё время."""
+        return {s.base_url: dict(s.stats) for s in self.scrapers}
+
+    def source_health(self):
+        """Состояние предохранителей по источникам (для /sources)."""
+        return [
+            {
+                "url": s.base_url,
+                "class": s.__class__.__name__,
+                "state": s.breaker.state,
+                "failures": s.breaker.failures,
+                "total_failures": s.breaker.total_failures,
+                "total_runs": s.breaker.total_runs,
+                "retry_in": s.breaker.remaining(),
+                "last_error": s.breaker.last_error,
+                "timeouts": s.stats["timeouts"],
+                "fetched": s.stats["fetched"],
+            }
+            for s in self.scrapers
+        ]
+
+    def _log_cycle(self, scraper):
+        self.log.debug(
+            "%s: детали скачано %d, пропущено известных %d, список не изменился: %s",
+            scraper.base_url,
+            scraper.cycle_stats["fetched"],
+            scraper.cycle_stats["skipped"],
+            bool(scraper.cycle_stats["not_modified"]),
+        )
+
+    async def stream(self, known=None, batch_size=20, max_wait=2.0, queue_size=200, scrapers=None):
+        """
+        Асинхронный генератор микробатчей: все скраперы работают параллельно и кладут
+        готовые статьи в ограниченную очередь (backpressure), а потребитель получает
+        список из batch_size item'ов — или сколько набралось за max_wait секунд.
+        known — оракул уже известных URL: детальные страницы для них не качаются.
+        scrapers — подмножество источников (по умолчанию все).
+        """
+        scrapers = self.scrapers if scrapers is None else scrapers
+        if not scrapers:
+            return
+
+        queue = asyncio.Queue(queue_size)
+        done = object()
+
+        async def emit(scraper, item):
+            item.setdefault("topic", scraper.topic)
+            await queue.put(item)
+
+        async def produce(scraper):
+            try:
+                await self._safe_run(scraper, known, emit)
+                self._log_cycle(scraper)
+            finally:
+                await queue.put(done)
+
+        tasks = [asyncio.create_task(produce(s)) for s in scrapers]
+        running = len(tasks)
+        batch = []
+        loop = asyncio.get_running_loop()
+        try:
+            while running:
+                deadline = loop.time() + max_wait
+                while running and len(batch) < batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if item is done:
+                        running -= 1
+                    else:
+                        batch.append(item)
+                if batch:
+                    yield batch
+                    batch = []
+        finally:
+            # потребитель мог прерваться — не оставляем скраперы висеть на полной очереди
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def collect(self, known=None, scrapers=None):
+        """Всё сразу одним списком (поверх stream)."""
+        merged = []
+        async for batch in self.stream(known, scrapers=scrapers):
+            merged.extend(batch)
+        return merged
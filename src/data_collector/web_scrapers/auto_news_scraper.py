@@ -1,8 +1,8 @@
 import logging
 from . import WebScraperBase
-from bs4 import BeautifulSoup
+from .parsing import Selector, parse_html, text_of
 from urllib.parse import urljoin
-import requests
+from src.data_collector.fetcher import FetchError
 from datetime import datetime
 import re
 
@@ -23,64 +23,74 @@ HEADERS = {
 }
 
 class AutonewsNewsScraper(WebScraperBase):
-    def __init__(self, url: str):
-        super().__init__(url)
+    LIST_HEADERS = HEADERS
+
+    BLOCKS  = Selector('div.item-big__inner')
+    LINK    = Selector('a.item-big__link')
+    TITLE   = Selector('span.item-big__title')
+    DATE    = Selector('span.item-big__date')
+    CONTENT = Selector("div.article__text[itemprop='articleBody']")
+    IMAGES  = Selector('img')
+
+    def __init__(self, url: str, http=None, fetcher=None):
+        super().__init__(url, http, fetcher)
         self.logger = logging.getLogger("bot")
 
-    def run(self) -> list[dict]:
-        # Fetch list page with proper headers
-        resp = requests.get(self.base_url, headers=HEADERS, timeout=10)
-        resp.raise_for_status()
-        return self.parse(resp.text)
+    async def parse(self, html: str, known=None) -> list[dict]:
+        tasks = []
+        for title, url, date_str in await self.in_pool(self._parse_list, html):
+            if self.is_known(url, known):
+                continue
+            tasks.append(self._fetch_detail(title, url, date_str))
+
+        return await self.gather_details(tasks)
 
-    def parse(self, html: str) -> list[dict]:
-        soup = BeautifulSoup(html, 'html.parser')
-        items = []
-        for block in soup.select('div.item-big__inner'):
+    def _parse_list(self, html: str) -> list[tuple]:
+        entries = []
+        for block in self.BLOCKS.all(parse_html(html)):
             # Extract link and title
-            link_tag = block.select_one('a.item-big__link')
-            href = link_tag.get('href', '') if link_tag else ''
+            href = self.LINK.attr(block, 'href', '')
             url = urljoin(self.base_url, href)
-
-            title_tag = block.select_one('span.item-big__title')
-            title = title_tag.get_text(strip=True) if title_tag else ''
+            title = self.TITLE.text(block)
 
             # Extract and parse date
-            date_tag = block.select_one('span.item-big__date')
-            raw_date = date_tag.get_text(strip=True) if date_tag else ''
-            date_str = self._parse_date(raw_date)
-
-            try:
-                resp = requests.get(url, headers={**HEADERS, 'Referer': self.base_url}, timeout=10)
-                resp.raise_for_status()
-                detail = BeautifulSoup(resp.text, 'html.parser')
+            date_str = self._parse_date(self.DATE.text(block))
+            entries.append((title, url, date_str))
+        return entries
 
-                # Main text
-                content_div = detail.select_one("div.article__text[itemprop='articleBody']")
-                text = content_div.get_text(strip=True, separator='\n') if content_div else ''
+    def _parse_detail(self, html: str) -> tuple[str, list[str]]:
+        # Main text
+        content_div = self.CONTENT.first(parse_html(html))
+        text = text_of(content_div, separator='\n')
 
-                # Media URLs
-                media_urls = []
-                if content_div:
-                    for img in content_div.find_all('img'):
-                        src = img.get('src')
-                        if src:
-                            media_urls.append(urljoin(self.base_url, src))
+        # Media URLs
+        media_urls = []
+        if content_div is not None:
+            for img in self.IMAGES.all(content_div):
+                src = img.get('src')
+                if src:
+                    media_urls.append(urljoin(self.base_url, src))
+        return text, media_urls
 
-                items.append({
-                    "title": title,
-                    "url": url,
-                    "date": date_str,
-                    "text": text,
-                    "media_urls": media_urls
-                })
+    async def _fetch_detail(self, title: str, url: str, date_str: str) -> dict | None:
+        try:
+            html = await self.fetch_text(url, headers={**HEADERS, 'Referer': self.base_url})
+            text, media_urls = await self.in_pool(self._parse_detail, html)
 
-            except requests.HTTPError as e:
-                self.logger.error(f"Error parsing Autonews article {url}: {e}")
-            except Exception as e:
-                self.logger.error(f"Unexpected error in Autonews scraper for {url}: {e}", exc_info=True)
+            return {
+                "title": title,
+                "url": url,
+                "date": date_str,
+                "text": text,
+                "media_urls": media_urls
+            }
 
-        return items
+        except FetchError as e:
+            self.logger.error(f"Error parsing Autonews article {url}: {e}")
+        except Exception as e:
+            self.logger.error(f"Unexpected error in Autonews scraper for {url}: {e}", exc_info=True)
+        self._count("failed")
+        return None
 
     def _parse_date(self, raw_date: str) -> str:
         # Normalize and remove punctuation
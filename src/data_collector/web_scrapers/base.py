@@ -6,22 +6,74 @@
 
 from __future__ import annotations
 
+import asyncio
+import itertools
+import logging
 import aiohttp
 import requests
 from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime, timedelta
+from hashlib import blake2b
+
+from src.data_collector.fetcher import Fetcher, HttpResponse
+from src.utils.ru_dates import parse_list_date
+from .parsing import DEFAULT_PARSE_POOL
+
+logger = logging.getLogger("bot")
 
 
 class WebScraperBase(ABC):
     """
     Каждый наследник обязан переопределить parse().
     Метод run() скачивает страницу списка и вызывает parse().
-    parse() может запрашивать доп-страницы через тот же session.
+    parse() запрашивает доп-страницы через fetch()/fetch_text() — общий Fetcher
+    с лимитами на хост и повторами поверх сессии HttpClient из DI.
     Возвращаемый формат: List[dict] с ключами
       title, url, date, text, media_urls
+
+    known — множество уже известных URL: для них детальная страница не качается
+    (см. is_known); счётчики fetched/skipped лежат в stats и cycle_stats.
+
+    Разбор HTML — синхронные функции на lxml (см. parsing.py), запускаются
+    через in_pool() в ограниченном пуле потоков, а не на event loop.
+
+    emit — async-колбэк стриминга: деталь, загруженная через gather_details(),
+    отдаётся коллектору сразу, не дожидаясь остальных статей источника.
+
+    validators — HttpCacheRepository: страница списка запрашивается условным GET
+    (If-None-Match / If-Modified-Since); на 304 или неизменный хэш тела
+    parse() и все детальные запросы источника пропускаются.
+
+    PAGE_URL — схема пагинации списка (шаблон с {base} и {page}). Если на первой
+    странице нет ни одного известного URL (бот простаивал, raw_news очищен),
+    catch_up() дочитывает старые страницы — см. его описание.
     """
 
-    def __init__(self, base_url: str):
+    LIST_HEADERS: dict | None = None  # доп. заголовки для страницы списка
+    PAGE_URL: str | None = None       # "{base}/page{page}/", "{base}?page={page}"; None — без пагинации
+
+    def __init__(self, base_url: str, http=None, fetcher=None):
         self.base_url = base_url.rstrip("/")
+        self.http = http
+        self.fetcher = fetcher or (Fetcher(http) if http is not None else None)
+        self.stats = Counter()        # за всё время
+        self.cycle_stats = Counter()  # за последний run()
+        self.validators = None        # HttpCacheRepository, выставляет коллектор
+        self.parse_pool = DEFAULT_PARSE_POOL
+        self._emit = None
+        self._emitted = set()
+        self.catchup_pages = 0        # сколько страниц списка читать при догонялке (0 — выкл.)
+        self.catchup_max_age = None   # timedelta: старше — не догоняем
+
+    @classmethod
+    def from_spec(cls, spec, http=None, fetcher=None) -> WebScraperBase:
+        """Создание из SourceSpec; наследники с доп. настройками переопределяют."""
+        return cls(str(spec.url), http=http, fetcher=fetcher)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self.http.session
 
     # ───────────────────────────────────────── helpers
 
@@ -32,21 +84,207 @@ class WebScraperBase(ABC):
         resp.raise_for_status()
         return resp.text
 
+    async def fetch(self, url: str, headers: dict | None = None, timeout: float = 10) -> HttpResponse:
+        return await self.fetcher.get(url, headers=headers, timeout=timeout)
+
+    async def fetch_text(self, url: str, headers: dict | None = None, timeout: float = 10) -> str:
+        resp = await self.fetch(url, headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        return resp.text()
+
+    async def fetch_list(self, url: str) -> HttpResponse | None:
+        """Страница списка условным GET; None — с прошлого раза не изменилась."""
+        headers = dict(self.LIST_HEADERS or {})
+        prev = self.validators.get(url) if self.validators is not None else None
+        if prev:
+            if prev["etag"]:
+                headers["If-None-Match"] = prev["etag"]
+            if prev["last_modified"]:
+                headers["If-Modified-Since"] = prev["last_modified"]
+
+        resp = await self.fetch(url, headers=headers or None)
+        if resp.status == 304:
+            self._count("not_modified")
+            return None
+        resp.raise_for_status()
+        if prev and prev["content_hash"] == self._body_hash(resp):
+            self._count("not_modified")
+            return None
+        return resp
+
+    def remember_list(self, url: str, resp: HttpResponse) -> None:
+        """Запоминает валидаторы — только после успешной обработки, иначе повторим в след. цикле."""
+        if self.validators is not None:
+            self.validators.save(
+                url,
+                resp.headers.get("ETag"),
+                resp.headers.get("Last-Modified"),
+                self._body_hash(resp),
+            )
+
+    def list_payload(self, resp: HttpResponse):
+        """Что отдать в parse(): по умолчанию декодированный текст страницы."""
+        return resp.text()
+
+    @staticmethod
+    def _body_hash(resp: HttpResponse) -> str:
+        return blake2b(resp.body, digest_size=16).hexdigest()
+
+    async def in_pool(self, fn, *args):
+        """Выполняет разбор (fn) в пуле потоков парсинга."""
+        return await self.parse_pool.run(fn, *args)
+
+    async def gather_details(self, coros) -> list[dict]:
+        """
+        Параллельно выполняет загрузки деталей (порядок результатов сохраняется),
+        готовые item'ы сразу передаёт в emit. Исключения и None отбрасываются.
+        """
+        coros = list(coros)
+        results = [None] * len(coros)
+
+        async def one(i, coro):
+            try:
+                item = await coro
+            except Exception:
+                return  # ошибку логирует сам _fetch_detail
+            if item:
+                results[i] = item
+                await self._send(item)
+
+        await asyncio.gather(*(one(i, c) for i, c in enumerate(coros)))
+        return [r for r in results if r]
+
+    async def _send(self, item: dict) -> None:
+        if self._emit is not None and id(item) not in self._emitted:
+            self._emitted.add(id(item))
+            await self._emit(self, item)
+
+    def _count(self, key, n=1):
+        self.stats[key] += n
+        self.cycle_stats[key] += n
+
+    def is_known(self, url: str, known=None) -> bool:
+        """True — статья уже есть в raw_news, деталь не качаем."""
+        if known is not None and url in known:
+            self._count("skipped")
+            return True
+        self._count("fetched")
+        return False
+
+    # ───────────────────────────────────────── catch-up pagination
+
+    def page_url(self, page: int) -> str | None:
+        """Адрес page-й страницы списка (page ≥ 2); None — источник не пагинируется."""
+        if not self.PAGE_URL:
+            return None
+        return self.PAGE_URL.format(base=self.base_url, page=page)
+
+    def row_date(self, row: tuple) -> datetime | None:
+        """
+        Дата строки списка (title, url, date, …) для ограничения по возрасту.
+        Понимает и относительные русские даты лент («2 часа назад», «вчера, 10:15», «12 мая»).
+        None — даты в строке нет; нераспознанная дата — ValueError.
+        """
+        if not row[2]:
+            return None
+        date = parse_list_date(row[2])
+        if date is None:
+            raise ValueError(f"Нераспознанная дата в списке: {row[2]!r}")
+        return date
+
+    def _is_young(self, row: tuple, cutoff: datetime) -> bool:
+        """Строка моложе cutoff; нераспознанная дата считается старой — догонялка на ней стоп."""
+        try:
+            date = self.row_date(row)
+        except ValueError as e:
+            logger.warning("%s: %s — догонялка остановлена", self.base_url, e)
+            return False
+        return date is None or date >= cutoff
+
+    def needs_catch_up(self, rows: list[tuple], known=None) -> bool:
+        """Догонялка нужна, если вся первая страница новая — значит, часть статей уже ушла дальше."""
+        return (
+            known is not None
+            and self.catchup_pages > 1
+            and self.page_url(2) is not None
+            and bool(rows)
+            and not any(r[1] in known for r in rows)
+        )
+
+    async def catch_up(self, rows: list[tuple], parse_rows, known=None) -> list[tuple]:
+        """
+        Дочитывает старые страницы списка после простоя.
+        rows — строки первой страницы, parse_rows(html, page_url) — синхронный разбор
+        страницы (выполняется в пуле). Страницы качаются окнами по host_concurrency
+        параллельно (лимиты хоста соблюдает Fetcher) и обрабатываются по порядку до
+        первого известного URL, статьи старше catchup_max_age, пустой страницы,
+        ошибки или catchup_pages. Возвращает строки всех прочитанных страниц без дублей;
+        отсев известных — как обычно, через is_known().
+        """
+        if not self.needs_catch_up(rows, known):
+            return rows
+
+        cutoff = datetime.utcnow() - self.catchup_max_age if self.catchup_max_age else None
+        out, seen = list(rows), {r[1] for r in rows}
+        window = max(1, self.fetcher.host_concurrency)
+        page = 2
+        while page <= self.catchup_pages:
+            batch = range(page, min(page + window, self.catchup_pages + 1))
+            pages = await asyncio.gather(*(self._catch_up_page(p, parse_rows) for p in batch))
+            for page_rows in pages:
+                if not page_rows:
+                    return self._caught_up(out, page - 1)
+                page += 1
+                # за время обхода список сдвигается — строки могут повториться
+                fresh = [r for r in page_rows if r[1] not in seen]
+                seen.update(r[1] for r in fresh)
+                if cutoff is not None:
+                    young = list(itertools.takewhile(lambda r: self._is_young(r, cutoff), fresh))
+                    if len(young) < len(fresh):
+                        return self._caught_up(out + young, page - 1)
+                out.extend(fresh)
+                if any(r[1] in known for r in fresh):
+                    return self._caught_up(out, page - 1)
+        return self._caught_up(out, self.catchup_pages)
+
+    async def _catch_up_page(self, page: int, parse_rows) -> list[tuple] | None:
+        url = self.page_url(page)
+        try:
+            html = await self.fetch_text(url, headers=self.LIST_HEADERS)
+            return await self.in_pool(parse_rows, html, url)
+        except Exception as e:
+            logger.error("Догонялка %s, страница %d: %s", self.base_url, page, e)
+            self._count("failed")
+            return None
+
+    def _caught_up(self, rows: list[tuple], pages: int) -> list[tuple]:
+        self._count("catchup_pages", pages - 1)
+        logger.info("%s: догонялка — страниц %d, строк списка %d", self.base_url, pages, len(rows))
+        return rows
+
     # ───────────────────────────────────────── contract
 
     @abstractmethod
-    async def parse(
-        self, html: str, session: aiohttp.ClientSession | None = None
-    ) -> list[dict]:
-        """Парсинг html‐списка; session может быть None, если не нужен."""
+    async def parse(self, html: str, known=None) -> list[dict]:
+        """Парсинг html‐списка; детальные страницы — через self.fetch_text()."""
         ...
 
     # ───────────────────────────────────────── entrypoint
 
-    async def run(self) -> list[dict]:
-        """Общий pipeline: GET списка -> parse()."""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(self.base_url, timeout=10) as resp:
-                resp.raise_for_status()
-                html = await resp.text()
-            return await self.parse(html, session)
+    async def run(self, known=None, emit=None) -> list[dict]:
+        """Общий pipeline: условный GET списка -> parse() -> запомнить валидаторы."""
+        self.cycle_stats.clear()
+        self._emit, self._emitted = emit, set()
+        try:
+            resp = await self.fetch_list(self.base_url)
+            if resp is None:
+                return []
+            items = await self.parse(self.list_payload(resp), known)
+            # то, что parse() вернул, минуя gather_details, отдаём в конце
+            for item in items:
+                await self._send(item)
+            if not self.cycle_stats["failed"]:
+                self.remember_list(self.base_url, resp)
+            return items
+        finally:
+            self._emit, self._emitted = None, set()
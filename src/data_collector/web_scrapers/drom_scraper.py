@@ -1,73 +1,62 @@
 # src/data_collector/web_scraper/drom_scraper.py
 import logging
-import aiohttp
-import asyncio
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from .base import WebScraperBase
+from .parsing import Selector, parse_html
 from . import register
 
 @register
 class DromNewsScraper(WebScraperBase):
-    def __init__(self, url: str):
-        super().__init__(url)
-        self.logger = logging.getLogger("bot")
+    PAGE_URL = "{base}/page{page}/"
+
+    BLOCKS = Selector(
+        "div.b-wrapper div.b-content div.b-left-side "
+        "div.b-media-query.b-random-group div.b-info-block"
+    )
+    LINK   = Selector("a.b-info-block__cont")
+    TITLE  = Selector("div.b-info-block__title")
+    DATE   = Selector("div.b-info-block__text_type_news-date")
+    TEXT   = Selector("#news_text")
+    MEDIA  = Selector("div.news_img > a")
 
-    async def run(self) -> list[dict]:
-        """
-        Загружает страницу списка новостей и сразу же парсит детали в рамках одной сессии.
-        """
-        async with aiohttp.ClientSession() as session:
-            # 1) Скачиваем HTML списка
-            async with session.get(self.base_url, timeout=10) as resp:
-                resp.raise_for_status()
-                html = await resp.text()
-            # 2) Парсим и загружаем детали, используя ту же сессию
-            return await self.parse(html, session)
+    def __init__(self, url: str, http=None, fetcher=None):
+        super().__init__(url, http, fetcher)
+        self.logger = logging.getLogger("bot")
 
-    async def parse(self, html: str, session: aiohttp.ClientSession) -> list[dict]:
-        soup = BeautifulSoup(html, 'html.parser')
-        blocks = soup.select(
-            "div.b-wrapper div.b-content div.b-left-side "
-            "div.b-media-query.b-random-group div.b-info-block"
-        )
+    async def parse(self, html: str, known=None) -> list[dict]:
         tasks = []
-        for block in blocks:
-            a_tag = block.find("a", class_="b-info-block__cont")
-            title_tag = block.find("div", class_="b-info-block__title")
-            date_tag = block.find("div", class_="b-info-block__text_type_news-date")
+        rows = await self.in_pool(self._parse_list, html)
+        for title, url, date in await self.catch_up(rows, self._parse_list, known):
+            if self.is_known(url, known):
+                continue
+            tasks.append(self._fetch_detail(title, url, date))
 
-            title = title_tag.get_text(strip=True) if title_tag else None
-            url = a_tag.get("href") if a_tag else None
-            date = date_tag.get_text(strip=True) if date_tag else None
+        return await self.gather_details(tasks)
+
+    def _parse_list(self, html: str, page_url: str | None = None) -> list[tuple]:
+        entries = []
+        for block in self.BLOCKS.all(parse_html(html)):
+            title = self.TITLE.text(block) or None
+            url = self.LINK.attr(block, "href")
+            date = self.DATE.text(block) or None
 
             if url and not url.startswith("http"):
                 url = urljoin(self.base_url, url)
             if not title or not url:
                 continue
+            entries.append((title, url, date))
+        return entries
 
-            tasks.append(self._fetch_detail(title, url, date, session))
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        items = []
-        for r in results:
-            if isinstance(r, Exception):
-                # Ошибка уже залогирована в _fetch_detail
-                continue
-            if r:
-                items.append(r)
-        return items
+    def _parse_detail(self, html: str) -> tuple[str, list[str]]:
+        root = parse_html(html)
+        text = self.TEXT.text(root, separator="\n")
+        media_urls = [a.get("href") for a in self.MEDIA.all(root) if a.get("href")]
+        return text, media_urls
 
-    async def _fetch_detail(self, title: str, url: str, date: str, session: aiohttp.ClientSession) -> dict | None:
+    async def _fetch_detail(self, title: str, url: str, date: str) -> dict | None:
         try:
-            async with session.get(url, timeout=10) as resp:
-                resp.raise_for_status()
-                detail_html = await resp.text()
-
-            detail_soup = BeautifulSoup(detail_html, 'html.parser')
-            text_block = detail_soup.select_one("#news_text")
-            text = text_block.get_text(strip=True, separator="\n") if text_block else ""
-            media_urls = [img.get("href") for img in detail_soup.select("div.news_img > a") if img.get("href")]
+            detail_html = await self.fetch_text(url)
+            text, media_urls = await self.in_pool(self._parse_detail, detail_html)
 
             return {
                 "title": title,
@@ -78,4 +67,5 @@ class DromNewsScraper(WebScraperBase):
             }
         except Exception as e:
             self.logger.error(f"Error parsing Drom article {url}: {e}", exc_info=True)
+            self._count("failed")
             return None
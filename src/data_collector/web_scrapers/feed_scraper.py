@@ -0,0 +1,250 @@
+# src/data_collector/web_scrapers/feed_scraper.py
+import io
+import logging
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+
+from lxml import etree
+
+from .base import WebScraperBase
+from .parsing import Selector, parse_html, text_of
+from . import register
+
+NS_ATOM    = "http://www.w3.org/2005/Atom"
+NS_CONTENT = "http://purl.org/rss/1.0/modules/content/"
+NS_MEDIA   = "http://search.yahoo.com/mrss/"
+NS_NEWS    = "http://www.google.com/schemas/sitemap-news/0.9"
+NS_IMAGE   = "http://www.google.com/schemas/sitemap-image/1.1"
+
+
+@register
+class FeedScraper(WebScraperBase):
+    """
+    Дешёвый путь загрузки: RSS 2.0, Atom и Google News sitemap.
+    Заголовок, ссылка, дата и часто полный текст приходят одним документом —
+    без HTML-разбора каждой статьи.
+
+      • тело ленты уже в памяти (его хэширует условный GET), но дерево целиком
+        не строится: iterparse отдаёт запись за записью, и разобранный элемент
+        сразу освобождается вместе с пройденными соседями; recover — битый хвост
+        ленты не теряет уже прочитанные записи;
+      • условный GET (ETag/Last-Modified/хэш) — общий из WebScraperBase.run;
+      • детальная страница качается только если текст в ленте обрезан
+        (нет текста, только короткий description, «Читать далее…»).
+        Тело ищется по selectors.body из SourceSpec, иначе по абзацам статьи.
+    """
+
+    LIST_HEADERS = {
+        "Accept": "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.8, */*;q=0.5",
+    }
+    MIN_TEXT = 300
+    TRUNCATION_MARKS = ("…", "...", "[…]", "[...]", "Читать далее", "Read more")
+
+    IMAGES        = Selector("img")
+    BODY_FALLBACK = Selector("[itemprop='articleBody'] p, article p")
+    PARAGRAPHS    = Selector("p")
+
+    def __init__(self, url: str, http=None, fetcher=None, selectors=None, min_text=MIN_TEXT):
+        super().__init__(url, http, fetcher)
+        self.logger = logging.getLogger("bot")
+        self.min_text = min_text
+        self.body = Selector(selectors.body) if selectors and selectors.body else None
+        self.media = Selector(selectors.media) if selectors and selectors.media else None
+        self.media_attr = selectors.media_attr if selectors else "src"
+
+    @classmethod
+    def from_spec(cls, spec, http=None, fetcher=None):
+        return cls(str(spec.url), http=http, fetcher=fetcher, selectors=spec.selectors)
+
+    def list_payload(self, resp):
+        return resp.body  # байты: кодировку XML определяет сам парсер по декларации
+
+    # ───────────────────────── лента ───────────────────────── #
+    async def parse(self, data: bytes, known=None) -> list[dict]:
+        ready, tasks = [], []
+        for entry in await self.in_pool(self._parse_feed, data):
+            if self.is_known(entry["url"], known):
+                continue
+            if entry.pop("truncated"):
+                tasks.append(self._fetch_detail(entry))
+            else:
+                ready.append(entry)
+                await self._send(entry)
+        return ready + await self.gather_details(tasks)
+
+    def _parse_feed(self, data: bytes) -> list[dict]:
+        events = etree.iterparse(
+            io.BytesIO(data), events=("end",), recover=True, resolve_entities=False, no_network=True
+        )
+        entries = []
+        self._drain(events, entries)
+        return entries
+
+    def _drain(self, events, entries):
+        for _, el in events:
+            if not isinstance(el.tag, str):
+                continue
+            name = etree.QName(el).localname
+            parent = el.getparent()
+            if name == "item":
+                entry = self._rss_entry(el)
+            elif name == "entry":
+                entry = self._atom_entry(el)
+            elif name == "url" and parent is not None and etree.QName(parent).localname == "urlset":
+                entry = self._sitemap_entry(el)
+            else:
+                continue
+            if entry:
+                entries.append(entry)
+            # освобождаем разобранное: сам элемент и уже пройденных соседей
+            el.clear()
+            while el.getprevious() is not None:
+                del parent[0]
+
+    # ───────────────────────── форматы ───────────────────────── #
+    def _rss_entry(self, el):
+        title = self._child_text(el, None, "title")
+        link = self._child_text(el, None, "link")
+        if not link:
+            guid = self._child(el, None, "guid")
+            if guid is not None and guid.get("isPermaLink", "true") != "false":
+                link = (guid.text or "").strip()
+        date = self._child_text(el, None, "pubDate") or self._child_text(el, "*", "date")
+
+        encoded = self._child_text(el, NS_CONTENT, "encoded")
+        text, images = self._html_text(encoded or self._child_text(el, None, "description"))
+
+        media = [c.get("url") for c in el
+                 if self._is(c, None, "enclosure") and (c.get("type") or "image/").startswith("image/")]
+        media += [c.get("url") for c in el if self._is(c, NS_MEDIA, "content") or self._is(c, NS_MEDIA, "thumbnail")]
+        return self._entry(title, link, date, text, media + images, full=bool(encoded))
+
+    def _atom_entry(self, el):
+        title = self._child_text(el, NS_ATOM, "title")
+        link = None
+        for c in el:
+            if self._is(c, NS_ATOM, "link") and c.get("rel", "alternate") == "alternate":
+                link = c.get("href")
+                break
+        date = self._child_text(el, NS_ATOM, "published") or self._child_text(el, NS_ATOM, "updated")
+
+        content = self._child(el, NS_ATOM, "content")
+        node = content if content is not None else self._child(el, NS_ATOM, "summary")
+        if node is None:
+            text, images = "", []
+        elif node.get("type") == "xhtml":
+            text = text_of(node, "\n")
+            images = [img.get("src") for img in node.iter("{*}img")]
+        else:
+            text, images = self._html_text(node.text)
+
+        media = [c.get("href") for c in el if self._is(c, NS_ATOM, "link") and c.get("rel") == "enclosure"]
+        media += [c.get("url") for c in el if self._is(c, NS_MEDIA, "content") or self._is(c, NS_MEDIA, "thumbnail")]
+        return self._entry(title, link, date, text, media + images, full=content is not None)
+
+    def _sitemap_entry(self, el):
+        news = self._child(el, NS_NEWS, "news")
+        if news is None:
+            return None  # обычный sitemap без новостной разметки — не новость
+        link = self._child_text(el, "*", "loc")
+        title = self._child_text(news, NS_NEWS, "title")
+        date = self._child_text(news, NS_NEWS, "publication_date")
+        media = [self._child_text(img, NS_IMAGE, "loc") for img in el if self._is(img, NS_IMAGE, "image")]
+        return self._entry(title, link, date, "", media, full=False)
+
+    def _entry(self, title, link, date, text, media, full):
+        if not title or not link:
+            return None
+        url = urljoin(self.base_url, link.strip())
+        media_urls = []
+        for m in media:
+            if m and not ("{{" in m and "}}" in m):
+                full_url = urljoin(url, m.strip())
+                if full_url.startswith(("http://", "https://")) and full_url not in media_urls:
+                    media_urls.append(full_url)
+        return {
+            "title": title,
+            "url": url,
+            "date": self._parse_date(date),
+            "text": text,
+            "media_urls": media_urls,
+            "truncated": self._is_truncated(text, full),
+        }
+
+    def _is_truncated(self, text, full):
+        if not text:
+            return True
+        if text.rstrip().endswith(self.TRUNCATION_MARKS):
+            return True
+        return not full and len(text) < self.min_text
+
+    # ───────────────────────── деталь ───────────────────────── #
+    def _parse_detail(self, html: str, url: str) -> tuple[str, list[str]]:
+        root = parse_html(html)
+        if self.body is not None:
+            text = self.body.text(root, separator="\n")
+        else:
+            paragraphs = self.BODY_FALLBACK.all(root) or self.PARAGRAPHS.all(root)
+            text = "\n".join(t for t in (text_of(p) for p in paragraphs) if t)
+        media = []
+        if self.media is not None:
+            media = [urljoin(url, el.get(self.media_attr)) for el in self.media.all(root)
+                     if el.get(self.media_attr)]
+        return text, media
+
+    async def _fetch_detail(self, entry: dict) -> dict:
+        """Дотягивает текст со страницы; при ошибке остаётся то, что было в ленте."""
+        try:
+            html = await self.fetch_text(entry["url"])
+            text, media = await self.in_pool(self._parse_detail, html, entry["url"])
+        except Exception as e:
+            self.logger.warning("Лента %s: не скачалась деталь %s: %s", self.base_url, entry["url"], e)
+            return entry if entry["text"] else None
+        if len(text) > len(entry["text"]):
+            entry["text"] = text
+        entry["media_urls"] += [m for m in media if m not in entry["media_urls"]]
+        return entry
+
+    # ───────────────────────── helpers ───────────────────────── #
+    @staticmethod
+    def _is(el, ns, name):
+        if not isinstance(el.tag, str):
+            return False
+        q = etree.QName(el)
+        return q.localname == name and (ns == "*" or q.namespace == ns)
+
+    def _child(self, el, ns, name):
+        for c in el:
+            if self._is(c, ns, name):
+                return c
+        return None
+
+    def _child_text(self, el, ns, name):
+        c = self._child(el, ns, name)
+        return (c.text or "").strip() if c is not None else ""
+
+    def _html_text(self, value):
+        """Текст и картинки из HTML-содержимого description/content."""
+        if not value:
+            return "", []
+        if "<" not in value:
+            return value.strip(), []
+        root = parse_html(value)
+        return text_of(root, "\n"), [img.get("src") for img in self.IMAGES.all(root)]
+
+    @staticmethod
+    def _parse_date(value):
+        """RFC 822 (RSS) или ISO 8601 (Atom, sitemap) → naive UTC datetime."""
+        if not value:
+            return None
+        try:
+            dt = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            try:
+                dt = datetime.fromisoformat(value.strip())
+            except ValueError:
+                return None
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return dt
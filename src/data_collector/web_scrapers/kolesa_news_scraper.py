@@ -1,11 +1,9 @@
 # src/data_collector/web_scraper/kolesa_news_scraper.py
 import logging
-import aiohttp
-import asyncio
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 
 from .base import WebScraperBase
+from .parsing import Selector, parse_html
 from . import register
 
 @register
@@ -16,84 +14,72 @@ class KolesaNewsScraper(WebScraperBase):
       title, url, date, text, media_urls
     """
     BASE_HOST = "https://www.kolesa.ru"
+    PAGE_URL  = "{base}?page={page}"
 
-    def __init__(self, url: str):
-        super().__init__(url)
-        self.logger = logging.getLogger("bot")
+    ITEMS      = Selector("a.post-list-item")
+    TITLE      = Selector("span.post-name")
+    DATE       = Selector("span.post-meta-item.pull-right")
+    CONTENT    = Selector("div.post-content")
+    GALLERY    = Selector("div.post-gallery img")
+    MAIN_IMAGE = Selector("span.post-image")
 
-    async def run(self) -> list[dict]:
-        async with aiohttp.ClientSession() as session:
-            # Скачиваем страницу списка
-            async with session.get(self.base_url, timeout=10) as resp:
-                resp.raise_for_status()
-                html = await resp.text()
-            # Парсим и скачиваем детали
-            return await self.parse(html, session)
+    def __init__(self, url: str, http=None, fetcher=None):
+        super().__init__(url, http, fetcher)
+        self.logger = logging.getLogger("bot")
 
-    async def parse(self, html: str, session: aiohttp.ClientSession) -> list[dict]:
-        soup = BeautifulSoup(html, 'html.parser')
+    async def parse(self, html: str, known=None) -> list[dict]:
         tasks = []
-        for link in soup.select('a.post-list-item'):
+        rows = await self.in_pool(self._parse_list, html)
+        for title, href, date in await self.catch_up(rows, self._parse_list, known):
+            if self.is_known(href, known):
+                continue
+            tasks.append(self._fetch_detail(title, href, date))
+
+        return await self.gather_details(tasks)
+
+    def _parse_list(self, html: str, page_url: str | None = None) -> list[tuple]:
+        entries = []
+        for link in self.ITEMS.all(parse_html(html)):
             href = link.get('href')
             if href and not href.startswith('http'):
                 href = urljoin(self.BASE_HOST, href)
 
-            title_tag = link.select_one('span.post-name')
-            date_tag  = link.select_one('span.post-meta-item.pull-right')
-            title = title_tag.get_text(strip=True) if title_tag else ''
-            date  = date_tag.get_text(strip=True) if date_tag else ''
+            title = self.TITLE.text(link)
+            date  = self.DATE.text(link)
 
             if not title or not href:
                 continue
-            tasks.append(self._fetch_detail(title, href, date, session))
+            entries.append((title, href, date))
+        return entries
 
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        # Оставляем только успешные словари
-        return [r for r in results if isinstance(r, dict)]
+    def _absolute(self, src: str) -> str | None:
+        """Абсолютный http(s)-URL картинки; шаблонные ссылки {{ … }} отбрасываются."""
+        if not src or ('{{' in src and '}}' in src):
+            return None
+        if src.startswith(("http://", "https://")):
+            return src
+        full_url = urljoin(self.BASE_HOST, src)
+        return full_url if full_url.startswith(("http://", "https://")) else None
 
-    async def _fetch_detail(self, title: str, url: str, date: str, session: aiohttp.ClientSession) -> dict:
-        try:
-            async with session.get(url, timeout=10) as resp:
-                resp.raise_for_status()
-                detail_html = await resp.text()
-            detail_soup = BeautifulSoup(detail_html, 'html.parser')
+    def _parse_detail(self, html: str) -> tuple[str, list[str]]:
+        root = parse_html(html)
+        text = self.CONTENT.text(root, separator='\n')
 
-            content_block = detail_soup.select_one('div.post-content')
-            text = content_block.get_text(strip=True, separator='\n') if content_block else ''
+        # — Галерея изображений
+        media_urls = [u for u in (self._absolute(img.get('src')) for img in self.GALLERY.all(root)) if u]
 
-            media_urls = []
-            # — Галерея изображений
-            for img in detail_soup.select('div.post-gallery img'):
-                src = img.get('src')
-                # пропускаем пустые и шаблонные ссылки {{ … }}
-                if not src or ('{{' in src and '}}' in src):
-                    continue
-                # если уже абсолютный
-                if src.startswith(("http://", "https://")):
-                    media_urls.append(src)
-                else:
-                    # собираем абсолютный из относительного
-                    full_url = urljoin(self.BASE_HOST, src)
-                    if full_url.startswith(("http://", "https://")):
-                        media_urls.append(full_url)
+        # — Главная картинка в стиле background-image
+        style = self.MAIN_IMAGE.attr(root, 'style')
+        if style and 'url(' in style:
+            img_url = self._absolute(style.split('url(')[1].split(')')[0].strip('"\''))
+            if img_url:
+                media_urls.insert(0, img_url)
+        return text, media_urls
 
-            # — Главная картинка в стиле background-image
-            main_img = detail_soup.select_one('span.post-image')
-            if main_img and main_img.has_attr('style'):
-                style = main_img['style']
-                if 'url(' in style:
-                    img_url = style.split('url(')[1].split(')')[0].strip('"\'')
-                    # пропускаем шаблоны
-                    if '{{' in img_url and '}}' in img_url:
-                        img_url = None
-                    # иначе собираем и фильтруем так же, как выше
-                    if img_url:
-                        if img_url.startswith(("http://", "https://")):
-                            media_urls.insert(0, img_url)
-                        else:
-                            full_url = urljoin(self.BASE_HOST, img_url)
-                            if full_url.startswith(("http://", "https://")):
-                                media_urls.insert(0, full_url)
+    async def _fetch_detail(self, title: str, url: str, date: str) -> dict:
+        try:
+            detail_html = await self.fetch_text(url)
+            text, media_urls = await self.in_pool(self._parse_detail, detail_html)
 
             return {
                 'title': title,
@@ -104,4 +90,5 @@ class KolesaNewsScraper(WebScraperBase):
             }
         except Exception as e:
             self.logger.error(f"Error parsing Kolesa article {url}: {e}", exc_info=True)
+            self._count("failed")
             return None
@@ -0,0 +1,95 @@
+# src/data_collector/web_scrapers/parsing.py
+"""
+Движок разбора HTML для скраперов:
+  • lxml вместо BeautifulSoup(html.parser) — в разы быстрее;
+  • CSS-селекторы компилируются в XPath один раз (Selector на уровне класса);
+  • разбор выполняется в ограниченном пуле потоков (ParsePool), event loop
+    и диспетчер aiogram не блокируются.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import lxml.html
+from lxml.cssselect import CSSSelector
+
+_SKIP_TEXT = frozenset({"script", "style"})
+
+
+def parse_html(html):
+    """Корень документа; пустой/битый html → пустой <html>, а не исключение."""
+    if not html or not html.strip():
+        return lxml.html.Element("html")
+    try:
+        return lxml.html.fromstring(html)
+    except (lxml.etree.ParserError, ValueError):
+        return lxml.html.Element("html")
+
+
+def text_of(node, separator=""):
+    """Аналог bs4 get_text(strip=True, separator=...): непустые строки без script/style."""
+    if node is None:
+        return ""
+    parts = []
+
+    def walk(el):
+        if el.text:
+            parts.append(el.text)
+        for child in el:
+            # комментарии и processing instructions имеют не-строковый tag
+            if isinstance(child.tag, str) and child.tag not in _SKIP_TEXT:
+                walk(child)
+            if child.tail:
+                parts.append(child.tail)
+
+    walk(node)
+    return separator.join(s for s in (p.strip() for p in parts) if s)
+
+
+class Selector:
+    """CSS-селектор, скомпилированный один раз."""
+
+    __slots__ = ("css", "_compiled")
+
+    def __init__(self, css):
+        self.css = css
+        self._compiled = CSSSelector(css, translator="html")
+
+    def all(self, node):
+        return self._compiled(node)
+
+    def first(self, node):
+        found = self._compiled(node)
+        return found[0] if found else None
+
+    def text(self, node, separator=""):
+        return text_of(self.first(node), separator)
+
+    def attr(self, node, name, default=None):
+        el = self.first(node)
+        return el.get(name, default) if el is not None else default
+
+    def __repr__(self):
+        return f"Selector({self.css!r})"
+
+
+class ParsePool:
+    """Ограниченный пул потоков для разбора HTML (lxml отпускает GIL при парсинге)."""
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._executor = None
+
+    async def run(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="html-parse")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+DEFAULT_PARSE_POOL = ParsePool()
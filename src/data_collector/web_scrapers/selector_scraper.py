@@ -0,0 +1,166 @@
+# src/data_collector/web_scrapers/selector_scraper.py
+import logging
+from datetime import datetime
+from urllib.parse import urljoin
+
+from src.utils.ru_dates import parse_list_date
+from .base import WebScraperBase
+from .parsing import Selector, parse_html, text_of
+from . import register
+
+
+@register
+class SelectorScraper(WebScraperBase):
+    """
+    Универсальный скрапер «список → деталь» по CSS-селекторам из config.json:
+
+        {"class": "SelectorScraper", "url": "https://site/news", "max_pages": 2,
+         "selectors": {"item": "article.news", "link": "a", "title": "h2",
+                       "date": "time", "date_attr": "datetime",
+                       "body": "div.article-body", "media": "div.article-body img",
+                       "next_page": "a.pagination__next"}}
+
+    Селекторы компилируются один раз на источник, разбор — в общем пуле,
+    запросы — через общий Fetcher. Следующие страницы списка (next_page или
+    шаблон page_url с {page}) читаются, пока не кончится max_pages или пока
+    на странице не останется ни одной новой ссылки. С шаблоном page_url
+    работает и догонялка после простоя (WebScraperBase.catch_up).
+    """
+
+    def __init__(self, url: str, http=None, fetcher=None, selectors=None, max_pages=1):
+        super().__init__(url, http, fetcher)
+        if selectors is None or not selectors.item:
+            raise ValueError("SelectorScraper требует selectors.item в SourceSpec")
+        self.logger = logging.getLogger("bot")
+        self.spec = selectors
+        self.max_pages = max(1, max_pages)
+        self.item = Selector(selectors.item)
+        self.link = self._compile(selectors.link)
+        self.title = self._compile(selectors.title)
+        self.date = self._compile(selectors.date)
+        self.body = self._compile(selectors.body)
+        self.media = self._compile(selectors.media)
+        self.next_page = self._compile(selectors.next_page)
+        self.any_link = Selector("a[href]")
+
+    @classmethod
+    def from_spec(cls, spec, http=None, fetcher=None):
+        return cls(str(spec.url), http=http, fetcher=fetcher,
+                   selectors=spec.selectors, max_pages=spec.max_pages)
+
+    @staticmethod
+    def _compile(css):
+        return Selector(css) if css else None
+
+    # ───────────────────────── список ───────────────────────── #
+    async def parse(self, html: str, known=None) -> list[dict]:
+        rows, next_url = await self.in_pool(self._parse_list, html, self.base_url)
+        if self.needs_catch_up(rows, known):
+            rows = await self.catch_up(rows, self._page_rows, known)
+            entries = [r for r in rows if not self.is_known(r[1], known)]
+        else:
+            entries = await self._read_pages(rows, next_url, known)
+
+        if self.body is None:
+            # без селектора тела текстом служит заголовок
+            return [self._item(title, url, date, title, []) for title, url, date in entries]
+        return await self.gather_details(self._fetch_detail(*e) for e in entries)
+
+    async def _read_pages(self, rows, next_url, known) -> list[tuple]:
+        """Обычный опрос: до max_pages страниц, пока на странице есть новые ссылки."""
+        page = 1
+        entries, seen = [], set()
+        while True:
+            fresh = [r for r in rows if r[1] not in seen]
+            seen.update(r[1] for r in fresh)
+            new = [r for r in fresh if not self.is_known(r[1], known)]
+            entries.extend(new)
+
+            page += 1
+            if not new or page > self.max_pages:
+                break
+            page_url = self._page_url(page, next_url)
+            if not page_url:
+                break
+            try:
+                html = await self.fetch_text(page_url, headers=self.LIST_HEADERS)
+            except Exception as e:
+                self.logger.error("Список %s, страница %d: %s", self.base_url, page, e)
+                self._count("failed")
+                break
+            rows, next_url = await self.in_pool(self._parse_list, html, page_url)
+        return entries
+
+    def page_url(self, page: int) -> str | None:
+        return self.spec.page_url.format(base=self.base_url, page=page) if self.spec.page_url else None
+
+    def _page_url(self, page, next_url):
+        return self.page_url(page) or next_url
+
+    def _page_rows(self, html: str, page_url: str) -> list[tuple]:
+        return self._parse_list(html, page_url)[0]
+
+    def _parse_list(self, html: str, page_url: str) -> tuple[list[tuple], str | None]:
+        root = parse_html(html)
+        rows = []
+        for node in self.item.all(root):
+            if self.link is not None:
+                href = self.link.attr(node, "href")
+            elif node.get("href"):
+                href = node.get("href")
+            else:
+                href = self.any_link.attr(node, "href")
+            if not href:
+                continue
+            url = urljoin(page_url, href)
+
+            if self.title is not None:
+                title = self.title.text(node)
+            else:
+                title = text_of(self.link.first(node) if self.link is not None else node)
+            if not title:
+                continue
+
+            date = None
+            if self.date is not None:
+                # ISO из атрибута или текст «12 мая» → datetime; нераспознанное — None,
+                # чтобы один источник не ронял сохранение батча в parse_date
+                date = parse_list_date(self.date.attr(node, self.spec.date_attr) if self.spec.date_attr
+                                       else self.date.text(node))
+            rows.append((title, url, date))
+
+        next_url = None
+        if self.next_page is not None:
+            href = self.next_page.attr(root, "href")
+            next_url = urljoin(page_url, href) if href else None
+        return rows, next_url
+
+    # ───────────────────────── деталь ───────────────────────── #
+    def _parse_detail(self, html: str, url: str) -> tuple[str, list[str]]:
+        root = parse_html(html)
+        text = self.body.text(root, separator="\n")
+        media_urls = []
+        if self.media is not None:
+            for el in self.media.all(root):
+                src = el.get(self.spec.media_attr)
+                # пропускаем пустые и шаблонные ссылки {{ … }}
+                if not src or ("{{" in src and "}}" in src):
+                    continue
+                full = urljoin(url, src)
+                if full.startswith(("http://", "https://")) and full not in media_urls:
+                    media_urls.append(full)
+        return text, media_urls
+
+    async def _fetch_detail(self, title: str, url: str, date: datetime | None) -> dict | None:
+        try:
+            html = await self.fetch_text(url)
+            text, media_urls = await self.in_pool(self._parse_detail, html, url)
+            return self._item(title, url, date, text, media_urls)
+        except Exception as e:
+            self.logger.error("Error parsing %s article %s: %s", self.base_url, url, e)
+            self._count("failed")
+            return None
+
+    @staticmethod
+    def _item(title, url, date, text, media_urls):
+        return {"title": title, "url": url, "date": date, "text": text, "media_urls": media_urls}
@@ -3,6 +3,8 @@ from pathlib import Path
 import duckdb
 from src.utils.paths import DB
 
+SEQ_RAW = "CREATE SEQUENCE IF NOT EXISTS raw_news_seq;"
+
 DDL_RAW = """
 CREATE TABLE IF NOT EXISTS raw_news (
     id        UBIGINT PRIMARY KEY,
@@ -12,7 +14,8 @@ CREATE TABLE IF NOT EXISTS raw_news (
     text      TEXT,
     media_ids TEXT,
     language  TEXT,
-    topic     TEXT
+    topic     TEXT,
+    seq       BIGINT DEFAULT nextval('raw_news_seq')
 );
 """
 
@@ -42,22 +45,157 @@ CREATE TABLE IF NOT EXISTS sent_news (
     topic     TEXT,
     confirmed BOOLEAN DEFAULT FALSE,
     main_message_id    BIGINT,
-    others_message_ids TEXT
+    others_message_ids TEXT,
+    sent_at   TIMESTAMP           -- когда ушла в предложку (date — дата публикации статьи)
+);
+"""
+
+DDL_STATE = """
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    key   TEXT PRIMARY KEY,
+    value BIGINT
+);
+"""
+
+DDL_EMBEDDINGS = """
+CREATE TABLE IF NOT EXISTS news_embeddings (
+    id    UBIGINT PRIMARY KEY,
+    date  TIMESTAMP,
+    emb   FLOAT[{dim}],
+    model TEXT              -- embedding_signature: бэкенд:модель:точность:размерность
+);
+"""
+
+DDL_SIGNATURES = """
+CREATE TABLE IF NOT EXISTS news_signatures (
+    id      UBIGINT PRIMARY KEY,
+    date    TIMESTAMP,
+    simhash UBIGINT,
+    b0      USMALLINT,
+    b1      USMALLINT,
+    b2      USMALLINT,
+    b3      USMALLINT
+);
+"""
+
+SEQ_CLUSTERS = "CREATE SEQUENCE IF NOT EXISTS story_clusters_seq;"
+
+DDL_CLUSTERS = """
+CREATE TABLE IF NOT EXISTS story_clusters (
+    id         BIGINT PRIMARY KEY,
+    centroid   FLOAT[{dim}],
+    size       INTEGER,
+    best_id    UBIGINT,
+    best_score DOUBLE,
+    updated    TIMESTAMP
+);
+"""
+
+DDL_MEMBERS = """
+CREATE TABLE IF NOT EXISTS story_members (
+    news_id    UBIGINT PRIMARY KEY,
+    cluster_id BIGINT,
+    score      DOUBLE
+);
+"""
+
+DDL_HTTP_VALIDATORS = """
+CREATE TABLE IF NOT EXISTS http_validators (
+    url           TEXT PRIMARY KEY,
+    etag          TEXT,
+    last_modified TEXT,
+    content_hash  TEXT,
+    updated       TIMESTAMP
+);
+"""
+
+DDL_SOURCE_SCHEDULE = """
+CREATE TABLE IF NOT EXISTS source_schedule (
+    source   TEXT PRIMARY KEY,
+    interval DOUBLE,
+    rate     DOUBLE,
+    last_run TIMESTAMP,
+    next_run TIMESTAMP
+);
+"""
+
+DDL_MEDIA_FILES = """
+CREATE TABLE IF NOT EXISTS media_files (
+    hash    TEXT PRIMARY KEY,   -- sha256 содержимого
+    file    TEXT,               -- имя в MEDIA_DIR (у почти-копий — файл канонической картинки)
+    size    BIGINT,
+    phash   UBIGINT,            -- dHash; NULL — не картинка или почти-копия
+    created TIMESTAMP
+);
+"""
+
+DDL_MEDIA_URLS = """
+CREATE TABLE IF NOT EXISTS media_urls (
+    url     TEXT PRIMARY KEY,
+    hash    TEXT,
+    fetched TIMESTAMP
 );
 """
 
+DDL_TELEGRAM_FILES = """
+CREATE TABLE IF NOT EXISTS telegram_files (
+    file    TEXT PRIMARY KEY,   -- имя в MEDIA_DIR
+    file_id TEXT,
+    updated TIMESTAMP
+);
+"""
+
+DDL_MEDIA_ACCESS = """
+CREATE TABLE IF NOT EXISTS media_access (
+    file        TEXT PRIMARY KEY,   -- имя в MEDIA_DIR
+    size        BIGINT,
+    last_access TIMESTAMP
+);
+"""
+
+DDL_REJECTED_URLS = """
+CREATE TABLE IF NOT EXISTS rejected_urls (
+    url      TEXT PRIMARY KEY,
+    rejected TIMESTAMP
+);
+"""
+
+# миграции для баз, созданных до появления колонок
+MIGRATIONS = (
+    "ALTER TABLE raw_news ADD COLUMN IF NOT EXISTS seq BIGINT DEFAULT nextval('raw_news_seq');",
+    "ALTER TABLE sent_news ADD COLUMN IF NOT EXISTS sent_at TIMESTAMP;",
+    "ALTER TABLE news_embeddings ADD COLUMN IF NOT EXISTS model TEXT;",
+)
+
 class DuckDBClient:
     """Singleton-подключение к DuckDB + создание схемы."""
 
-    def __init__(self, db_path=DB, reset=False):
+    def __init__(self, db_path=DB, reset=False, embedding_dim=384):
         self.path = Path(db_path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         if reset and self.path.exists():
             self.path.unlink()
+        self.embedding_dim = embedding_dim
         self.conn = duckdb.connect(self.path)
         self._ensure_schema()
 
     def _ensure_schema(self):
+        self.conn.execute(SEQ_RAW)
         self.conn.execute(DDL_RAW)
         self.conn.execute(DDL_PROCESSED)
         self.conn.execute(DDL_SENT)
+        self.conn.execute(DDL_STATE)
+        self.conn.execute(DDL_EMBEDDINGS.format(dim=self.embedding_dim))
+        self.conn.execute(DDL_SIGNATURES)
+        self.conn.execute(SEQ_CLUSTERS)
+        self.conn.execute(DDL_CLUSTERS.format(dim=self.embedding_dim))
+        self.conn.execute(DDL_MEMBERS)
+        self.conn.execute(DDL_HTTP_VALIDATORS)
+        self.conn.execute(DDL_SOURCE_SCHEDULE)
+        self.conn.execute(DDL_MEDIA_FILES)
+        self.conn.execute(DDL_MEDIA_URLS)
+        self.conn.execute(DDL_TELEGRAM_FILES)
+        self.conn.execute(DDL_MEDIA_ACCESS)
+        self.conn.execute(DDL_REJECTED_URLS)
+        for sql in MIGRATIONS:
+            self.conn.execute(sql)
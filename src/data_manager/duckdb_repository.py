@@ -2,38 +2,95 @@
 
 import json
 
+import numpy as np
+
+LIST_FIELDS = ("media_ids", "others_message_ids")
+
+
 class DuckDBRepository:
     """Универсальный репозиторий для Raw / Processed / Sent моделей."""
 
-    def __init__(self, conn, table, model):
+    def __init__(self, conn, table, model, bulk=False):
         self.conn = conn
         self.table = table
         self.model = model
+        self.bulk = bulk  # True -> insert_news одним INSERT ... SELECT
 
     def insert_news(self, items):
+        """Вставляет модели, дубликаты по id пропускаются. Возвращает число реально вставленных строк."""
         if not items:
             return 0
+        if self.bulk:
+            return self._insert_bulk(items)
+        return self._insert_rows(items)
+
+    def _insert_rows(self, items):
         cols = list(items[0].dict().keys())
         sql = (
             f"INSERT INTO {self.table} ({', '.join(cols)}) "
             f"VALUES ({', '.join('?' for _ in cols)}) "
             f"ON CONFLICT (id) DO NOTHING"
         )
+        inserted = 0
         for m in items:
             vals = list(m.dict().values())
             # url -> str
             vals[cols.index("url")] = str(vals[cols.index("url")])
             # сериализуем списки
-            for list_field in ("media_ids", "others_message_ids"):
+            for list_field in LIST_FIELDS:
                 if list_field in cols:
                     vals[cols.index(list_field)] = json.dumps(vals[cols.index(list_field)])
-            self.conn.execute(sql, vals)
-        return len(items)
+            inserted += self.conn.execute(sql, vals).fetchone()[0]
+        return inserted
+
+    def _insert_bulk(self, items):
+        """
+        Собирает из всех моделей один колоночный батч (dict NumPy-массивов),
+        регистрирует его в DuckDB и вставляет одним INSERT ... SELECT в транзакции.
+        """
+        batch = self._to_columns(items)
+        cols = list(batch)
+        view = f"_{self.table}_batch"
+        self.conn.register(view, batch)
+        try:
+            self.conn.begin()
+            try:
+                inserted = self.conn.execute(
+                    f"INSERT INTO {self.table} ({', '.join(cols)}) "
+                    f"SELECT {', '.join(cols)} FROM {view} "
+                    f"ON CONFLICT (id) DO NOTHING"
+                ).fetchone()[0]
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        finally:
+            self.conn.unregister(view)
+        return inserted
+
+    @staticmethod
+    def _to_columns(items):
+        rows = [m.dict() for m in items]  # .dict() — один раз на модель
+        columns = {}
+        for col in rows[0]:
+            values = [r[col] for r in rows]
+            if col == "id":
+                # UBIGINT: md5-id не влезает в int64
+                columns[col] = np.array(values, dtype=np.uint64)
+                continue
+            if col == "url":
+                values = [None if v is None else str(v) for v in values]
+            elif col in LIST_FIELDS:
+                values = [json.dumps(v) for v in values]
+            arr = np.empty(len(values), dtype=object)
+            arr[:] = values
+            columns[col] = arr
+        return columns
 
     def _row_to_model(self, row, cols):
         data = {}
         for k, v in zip(cols, row):
-            if k in ("media_ids", "others_message_ids") and v is not None:
+            if k in LIST_FIELDS and v is not None:
                 try:
                     data[k] = json.loads(v)
                 except Exception:
@@ -47,10 +104,49 @@ class DuckDBRepository:
         cols = [c[0] for c in rel.description]
         return [self._row_to_model(r, cols) for r in rel.fetchall()]
 
+    def iter_unmatched(self, other_table, after_seq=0, chunk_size=500):
+        """
+        Стримит чанками строки, для которых нет пары по id в other_table
+        и seq > after_seq. Отдаёт списки (seq, модель) в порядке seq.
+        Каждый чанк — отдельный keyset-запрос, поэтому между чанками можно писать в БД.
+        """
+        last = after_seq
+        while True:
+            rel = self.conn.execute(
+                f"SELECT t.* FROM {self.table} t "
+                f"ANTI JOIN {other_table} o ON t.id = o.id "
+                f"WHERE t.seq > ? ORDER BY t.seq LIMIT ?",
+                [last, chunk_size],
+            )
+            cols = [c[0] for c in rel.description]
+            rows = rel.fetchall()
+            if not rows:
+                return
+            seq_idx = cols.index("seq")
+            last = rows[-1][seq_idx]
+            yield [(r[seq_idx], self._row_to_model(r, cols)) for r in rows]
+            if len(rows) < chunk_size:
+                return
+
     def all_field(self, field):
         rel = self.conn.execute(f"SELECT {field} FROM {self.table}")
         return {r[0] for r in rel.fetchall()}
 
+    def existing_values(self, field, values):
+        """Какие из values уже есть в колонке field — JOIN с батчем, без чтения всей таблицы."""
+        values = list(dict.fromkeys(values))
+        if not values:
+            return set()
+        view = f"_{self.table}_{field}_q"
+        self.conn.register(view, {"v": np.array(values, dtype=object)})
+        try:
+            rows = self.conn.execute(
+                f"SELECT DISTINCT t.{field} FROM {self.table} t JOIN {view} q ON t.{field} = q.v"
+            ).fetchall()
+        finally:
+            self.conn.unregister(view)
+        return {r[0] for r in rows}
+
     def fetch_unsuggested(self, limit):
         rel = self.conn.execute(
             f"SELECT * FROM {self.table} WHERE suggested = FALSE LIMIT ?",
@@ -64,6 +160,20 @@ class DuckDBRepository:
         row = rel.fetchone()
         return None if row is None else self._row_to_model(row, [c[0] for c in rel.description])
 
+    def fetch_by_ids(self, ids):
+        if not ids:
+            return []
+        view = f"_{self.table}_ids"
+        self.conn.register(view, {"id": np.asarray(ids, dtype=np.uint64)})
+        try:
+            rel = self.conn.execute(
+                f"SELECT t.* FROM {self.table} t JOIN {view} q ON t.id = q.id"
+            )
+            cols = [c[0] for c in rel.description]
+            return [self._row_to_model(r, cols) for r in rel.fetchall()]
+        finally:
+            self.conn.unregister(view)
+
     def select_field_where(self, field, where=None, params=None):
         params = params or []
         if where:
@@ -75,7 +185,7 @@ class DuckDBRepository:
 
     def update_fields(self, id_, **fields):
         # сериализуем списки
-        for list_field in ("media_ids", "others_message_ids"):
+        for list_field in LIST_FIELDS:
             if list_field in fields:
                 fields[list_field] = json.dumps(fields[list_field])
         sets = ", ".join(f"{k}=?" for k in fields)
@@ -84,6 +194,11 @@ class DuckDBRepository:
             list(fields.values()) + [id_],
         )
 
+    def delete_ids(self, ids):
+        if ids:
+            ph = ",".join("?" for _ in ids)
+            self.conn.execute(f"DELETE FROM {self.table} WHERE id IN ({ph})", list(ids))
+
     def set_flag(self, flag, ids):
         if ids:
             ph = ",".join("?" for _ in ids)
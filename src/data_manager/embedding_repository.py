@@ -0,0 +1,77 @@
+# src/data_manager/embedding_repository.py
+import numpy as np
+
+
+class EmbeddingRepository:
+    """
+    id новости → нормированный эмбеддинг (FLOAT[dim]) в отдельной таблице DuckDB.
+    Считается один раз на id, дальше только читается.
+    Каждая строка помечена подписью модели (signature); читаются только свои —
+    векторы другого бэкенда/модели/квантования несравнимы.
+    """
+
+    def __init__(self, conn, dim, table="news_embeddings", signature=None):
+        self.conn = conn
+        self.dim = dim
+        self.table = table
+        self.signature = signature
+
+    def drop_foreign(self):
+        """Удаляет векторы с чужой подписью (и без подписи); возвращает их число."""
+        return self.conn.execute(
+            f"DELETE FROM {self.table} WHERE model IS DISTINCT FROM ?", [self.signature]
+        ).fetchone()[0]
+
+    def _with_ids(self, ids, sql, numpy=True):
+        view = f"_{self.table}_ids"
+        self.conn.register(view, {"id": np.asarray(ids, dtype=np.uint64)})
+        try:
+            rel = self.conn.execute(sql.format(ids=view), [self.signature])
+            return rel.fetchnumpy() if numpy else rel.fetchall()
+        finally:
+            self.conn.unregister(view)
+
+    def get_many(self, ids):
+        """{id: np.ndarray(dim)} для тех id, что уже посчитаны."""
+        if not ids:
+            return {}
+        res = self._with_ids(
+            ids,
+            f"SELECT e.id, e.emb FROM {self.table} e JOIN {{ids}} q ON e.id = q.id "
+            "WHERE e.model IS NOT DISTINCT FROM ?",
+        )
+        return {int(i): np.asarray(v, dtype=np.float32) for i, v in zip(res["id"], res["emb"])}
+
+    def get_dates(self, ids):
+        """{id: date} для тех id, что уже посчитаны."""
+        if not ids:
+            return {}
+        rows = self._with_ids(
+            ids,
+            f"SELECT e.id, e.date FROM {self.table} e JOIN {{ids}} q ON e.id = q.id "
+            "WHERE e.model IS NOT DISTINCT FROM ?",
+            numpy=False,
+        )
+        return dict(rows)
+
+    def save_many(self, ids, dates, matrix):
+        if not len(ids):
+            return
+        view = f"_{self.table}_batch"
+        emb = np.empty(len(ids), dtype=object)
+        emb[:] = list(np.asarray(matrix, dtype=np.float32))
+        date_col = np.empty(len(ids), dtype=object)
+        date_col[:] = list(dates)
+        self.conn.register(
+            view,
+            {"id": np.asarray(ids, dtype=np.uint64), "date": date_col, "emb": emb},
+        )
+        try:
+            self.conn.execute(
+                f"INSERT INTO {self.table} (id, date, emb, model) "
+                f"SELECT id, date, emb::FLOAT[{self.dim}], ? FROM {view} "
+                f"ON CONFLICT (id) DO NOTHING",
+                [self.signature],
+            )
+        finally:
+            self.conn.unregister(view)
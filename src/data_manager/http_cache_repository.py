@@ -0,0 +1,31 @@
+# src/data_manager/http_cache_repository.py
+from datetime import datetime
+
+
+class HttpCacheRepository:
+    """
+    Валидаторы условного GET для страниц-списков: ETag, Last-Modified
+    и хэш тела последнего обработанного ответа (url → строка в http_validators).
+    """
+
+    FIELDS = ("etag", "last_modified", "content_hash")
+
+    def __init__(self, conn, table="http_validators"):
+        self.conn = conn
+        self.table = table
+
+    def get(self, url):
+        row = self.conn.execute(
+            f"SELECT {', '.join(self.FIELDS)} FROM {self.table} WHERE url=?", [url]
+        ).fetchone()
+        return dict(zip(self.FIELDS, row)) if row else None
+
+    def save(self, url, etag, last_modified, content_hash):
+        self.conn.execute(
+            f"INSERT INTO {self.table} (url, etag, last_modified, content_hash, updated) "
+            f"VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (url) DO UPDATE SET etag = excluded.etag, "
+            f"last_modified = excluded.last_modified, "
+            f"content_hash = excluded.content_hash, updated = excluded.updated",
+            [url, etag, last_modified, content_hash, datetime.utcnow()],
+        )
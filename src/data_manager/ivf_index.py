@@ -0,0 +1,182 @@
+# src/data_manager/ivf_index.py
+from pathlib import Path
+
+import numpy as np
+
+
+class IVFIndex:
+    """
+    Приближённый поиск ближайших соседей (IVF): векторы разбиты по n_lists
+    центроидам сферического k-means, запрос сканирует только n_probe ближайших списков.
+    Векторы должны быть L2-нормированы (косинус = скалярное произведение).
+
+    Пока точек мало для обучения — всё лежит в одном списке и поиск точный.
+    Хранится в .npz рядом с data.duckdb, эвикция — по дате новости.
+    """
+
+    MIN_POINTS_PER_LIST = 4
+    KMEANS_ITERS = 10
+
+    def __init__(self, dim, n_lists=64, n_probe=8, path=None, signature=None):
+        self.dim = dim
+        self.signature = signature  # embedding_signature; индекс другой модели не загружается
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.path = Path(path) if path else None
+        self.centroids = None  # None → не обучен, поиск brute force
+        self._reset_storage()
+        self._trained_size = 0
+
+    def _reset_storage(self):
+        self.ids = np.empty(0, dtype=np.uint64)
+        self.dates = np.empty(0, dtype="datetime64[s]")
+        self.vecs = np.empty((0, self.dim), dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self._packed_cache = None
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ───────────────────────── обновление ───────────────────────── #
+    def add(self, ids, dates, vecs):
+        ids = np.asarray(ids, dtype=np.uint64)
+        if not len(ids):
+            return
+        fresh = ~np.isin(ids, self.ids)
+        if not fresh.any():
+            return
+        vecs = np.asarray(vecs, dtype=np.float32)[fresh]
+        dates = np.array(
+            [np.datetime64(d, "s") if d is not None else np.datetime64("NaT") for d in dates],
+            dtype="datetime64[s]",
+        )[fresh]
+
+        self.ids = np.concatenate([self.ids, ids[fresh]])
+        self.dates = np.concatenate([self.dates, dates])
+        self.vecs = np.vstack([self.vecs, vecs])
+        self.assign = np.concatenate([self.assign, self._nearest_lists(vecs)])
+        self._packed_cache = None
+        self._dirty = True
+
+        # переобучаем, когда данных стало вдвое больше, чем при прошлом обучении
+        if len(self) >= self.n_lists * self.MIN_POINTS_PER_LIST and len(self) >= 2 * self._trained_size:
+            self.train()
+
+    def evict_older(self, cutoff):
+        """Удаляет точки с датой < cutoff (и без даты) — индекс покрывает только окно."""
+        keep = self.dates >= np.datetime64(cutoff, "s")
+        if keep.all():
+            return 0
+        removed = int((~keep).sum())
+        self.ids = self.ids[keep]
+        self.dates = self.dates[keep]
+        self.vecs = self.vecs[keep]
+        self.assign = self.assign[keep]
+        self._packed_cache = None
+        self._dirty = True
+        return removed
+
+    def missing(self, ids):
+        ids = np.asarray(ids, dtype=np.uint64)
+        return [int(i) for i in ids[~np.isin(ids, self.ids)]]
+
+    def train(self):
+        """Сферический k-means по текущим точкам."""
+        n = len(self)
+        k = min(self.n_lists, n)
+        if k < 2:
+            self.centroids = None
+            self.assign = np.zeros(n, dtype=np.int32)
+            self._packed_cache = None
+            return
+        rng = np.random.default_rng(0)
+        centroids = self.vecs[rng.choice(n, size=k, replace=False)].copy()
+        for _ in range(self.KMEANS_ITERS):
+            assign = np.argmax(self.vecs @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, self.vecs)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = sums / norms
+        self.centroids = centroids.astype(np.float32)
+        self.assign = self._nearest_lists(self.vecs)
+        self._packed_cache = None
+        self._dirty = True
+        self._trained_size = n
+
+    # ───────────────────────── поиск ───────────────────────── #
+    def max_similarity(self, queries):
+        """Для каждого запроса — максимальный косинус среди просмотренных списков."""
+        queries = np.asarray(queries, dtype=np.float32)
+        out = np.zeros(len(queries), dtype=np.float32)
+        if not len(self) or not len(queries):
+            return out
+        if self.centroids is None:
+            return (queries @ self.vecs.T).max(axis=1)
+
+        probe = min(self.n_probe, len(self.centroids))
+        lists = np.argsort(-(queries @ self.centroids.T), axis=1)[:, :probe]
+        packed, bounds = self._packed()
+        out[:] = -1.0
+        # по спискам, а не по запросам: каждый список — один матричный умнож на все его запросы
+        for l in np.unique(lists):
+            lo, hi = bounds[l], bounds[l + 1]
+            if lo == hi:
+                continue
+            qs = np.flatnonzero((lists == l).any(axis=1))
+            sims = (queries[qs] @ packed[lo:hi].T).max(axis=1)
+            out[qs] = np.maximum(out[qs], sims)
+        return np.maximum(out, 0.0)
+
+    def _packed(self):
+        """Векторы, упорядоченные по спискам (каждый список — непрерывный срез), и границы списков."""
+        if self._packed_cache is None:
+            order = np.argsort(self.assign, kind="stable")
+            bounds = np.searchsorted(self.assign[order], np.arange(len(self.centroids) + 1))
+            self._packed_cache = (self.vecs[order], bounds)
+        return self._packed_cache
+
+    def _nearest_lists(self, vecs):
+        if self.centroids is None or not len(vecs):
+            return np.zeros(len(vecs), dtype=np.int32)
+        return np.argmax(vecs @ self.centroids.T, axis=1).astype(np.int32)
+
+    # ───────────────────────── хранение ───────────────────────── #
+    def save(self):
+        if self.path is None or not self._dirty:
+            return
+        tmp = self.path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            ids=self.ids,
+            dates=self.dates.astype(np.int64),
+            vecs=self.vecs,
+            assign=self.assign,
+            centroids=self.centroids if self.centroids is not None else np.empty((0, self.dim), np.float32),
+            trained_size=np.array(self._trained_size),
+            signature=np.array(self.signature or ""),
+        )
+        tmp.replace(self.path)
+        self._dirty = False
+
+    def load(self):
+        """Подгружает индекс с диска; False — файла нет, размерность или модель не совпали."""
+        if self.path is None or not self.path.exists():
+            return False
+        data = np.load(self.path)
+        if data["vecs"].shape[1] != self.dim:
+            return False
+        saved = str(data["signature"]) if "signature" in data.files else ""
+        if saved != (self.signature or ""):
+            return False
+        self.ids = data["ids"]
+        self.dates = data["dates"].astype("datetime64[s]")
+        self.vecs = data["vecs"]
+        self.assign = data["assign"]
+        self.centroids = data["centroids"] if len(data["centroids"]) else None
+        self._trained_size = int(data["trained_size"])
+        self._packed_cache = None
+        return True
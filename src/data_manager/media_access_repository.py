@@ -0,0 +1,82 @@
+# src/data_manager/media_access_repository.py
+import json
+
+
+class MediaAccessRepository:
+    """
+    Учёт файлов MEDIA_DIR для сборщика мусора (media_access): размер и время
+    последнего обращения. Плюс выборка файлов, на которые ещё ссылаются новости.
+    """
+
+    def __init__(self, conn, table="media_access"):
+        self.conn = conn
+        self.table = table
+
+    def touch_many(self, rows):
+        """rows: [(file, size, last_access)] — обращение к файлу (новому или известному)."""
+        if rows:
+            self.conn.executemany(
+                f"INSERT INTO {self.table} (file, size, last_access) VALUES (?, ?, ?) "
+                f"ON CONFLICT (file) DO UPDATE SET size = excluded.size, "
+                f"last_access = greatest(last_access, excluded.last_access)",
+                rows,
+            )
+
+    def register_many(self, rows):
+        """rows: [(file, size, mtime)] — найдено сканированием; время доступа известных не трогаем."""
+        if rows:
+            self.conn.executemany(
+                f"INSERT INTO {self.table} (file, size, last_access) VALUES (?, ?, ?) "
+                f"ON CONFLICT (file) DO UPDATE SET size = excluded.size",
+                rows,
+            )
+
+    def total_size(self):
+        return self.conn.execute(f"SELECT coalesce(sum(size), 0) FROM {self.table}").fetchone()[0]
+
+    def iter_lru(self, before, chunk_size=1000):
+        """(file, size) от давно не использованных к свежим; только last_access < before."""
+        cur = self.conn.execute(
+            f"SELECT file, size FROM {self.table} WHERE last_access < ? ORDER BY last_access",
+            [before],
+        )
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield from rows
+
+    def delete(self, files):
+        if files:
+            self.conn.executemany(f"DELETE FROM {self.table} WHERE file = ?", [[f] for f in files])
+
+    def forget_missing(self, seen, before):
+        """Удаляет строки файлов, которых не было в законченном обходе каталога (начатом в before)."""
+        known = self.conn.execute(
+            f"SELECT file FROM {self.table} WHERE last_access < ?", [before]
+        ).fetchall()
+        self.delete([f for (f,) in known if f not in seen])
+
+    def referenced(self, sent_after, raw_after_seq=None):
+        """
+        Файлы, которые ещё понадобятся: ждущие обработки raw (seq > raw_after_seq;
+        без водяного знака — date >= sent_after), не предложенные processed,
+        все неподтверждённые sent и подтверждённые, отправленные после sent_after
+        (по sent_at; у строк до появления sent_at — по дате статьи).
+        """
+        raw_where, raw_param = ("seq > ?", raw_after_seq) if raw_after_seq is not None else ("date >= ?", sent_after)
+        rows = self.conn.execute(
+            f"SELECT media_ids FROM raw_news WHERE {raw_where} "
+            f"UNION ALL SELECT media_ids FROM processed_news WHERE suggested = FALSE "
+            f"UNION ALL SELECT media_ids FROM sent_news WHERE confirmed = FALSE "
+            f"OR sent_at >= ? OR (sent_at IS NULL AND date >= ?)",
+            [raw_param, sent_after, sent_after],
+        ).fetchall()
+        files = set()
+        for (media_ids,) in rows:
+            if media_ids:
+                try:
+                    files.update(json.loads(media_ids))
+                except ValueError:
+                    continue
+        return files
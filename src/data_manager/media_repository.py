@@ -0,0 +1,52 @@
+# src/data_manager/media_repository.py
+from datetime import datetime
+
+
+class MediaRepository:
+    """
+    Медиа-хранилище, адресуемое по содержимому:
+      media_urls  — url → sha256 тела;
+      media_files — sha256 → файл в MEDIA_DIR (+ dHash картинки для поиска почти-копий).
+    Почти-копия (пережатая/уменьшенная картинка) получает свою строку с файлом канонической.
+    """
+
+    def __init__(self, conn, files_table="media_files", urls_table="media_urls"):
+        self.conn = conn
+        self.files = files_table
+        self.urls = urls_table
+
+    def file_for_url(self, url):
+        row = self.conn.execute(
+            f"SELECT f.file FROM {self.urls} u JOIN {self.files} f ON f.hash = u.hash WHERE u.url = ?",
+            [url],
+        ).fetchone()
+        return row[0] if row else None
+
+    def file_for_hash(self, digest):
+        row = self.conn.execute(f"SELECT file FROM {self.files} WHERE hash = ?", [digest]).fetchone()
+        return row[0] if row else None
+
+    def nearest(self, phash, max_distance):
+        """(файл, расстояние Хэмминга) ближайшей картинки в пределах max_distance или None."""
+        # полный проход по колонке UBIGINT — дёшево для DuckDB даже на сотнях тысяч строк
+        row = self.conn.execute(
+            f"SELECT file, bit_count(xor(phash, ?::UBIGINT)) AS d FROM {self.files} "
+            f"WHERE phash IS NOT NULL AND d <= ? ORDER BY d LIMIT 1",
+            [phash, max_distance],
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def add_file(self, digest, file, size, phash=None):
+        self.conn.execute(
+            f"INSERT INTO {self.files} (hash, file, size, phash, created) VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (hash) DO UPDATE SET file = excluded.file, size = excluded.size, "
+            f"phash = excluded.phash",
+            [digest, file, size, phash, datetime.utcnow()],
+        )
+
+    def map_url(self, url, digest):
+        self.conn.execute(
+            f"INSERT INTO {self.urls} (url, hash, fetched) VALUES (?, ?, ?) "
+            f"ON CONFLICT (url) DO UPDATE SET hash = excluded.hash, fetched = excluded.fetched",
+            [url, digest, datetime.utcnow()],
+        )
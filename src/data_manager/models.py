@@ -38,14 +38,36 @@ class SentNewsItem(BaseModel):
     confirmed: bool = False
     main_message_id: Optional[int] = None
     others_message_ids: List[int] = []
+    sent_at: Optional[datetime] = None
 
 
 
 # --------- Config Models ---------
+class SelectorSpec(BaseModel):
+    """CSS-селекторы для SelectorScraper (link/title/date/… ищутся внутри item); FeedScraper берёт body/media."""
+    item:       Optional[str] = None  # обязателен для SelectorScraper
+    link:       Optional[str] = None  # пусто — href самого item или первой ссылки в нём
+    title:      Optional[str] = None  # пусто — текст ссылки
+    date:       Optional[str] = None
+    date_attr:  Optional[str] = None  # например datetime у <time>
+    body:       Optional[str] = None  # пусто — детальные страницы не качаются
+    media:      Optional[str] = None
+    media_attr: str = "src"
+    next_page:  Optional[str] = None  # ссылка «дальше» на странице списка
+    page_url:   Optional[str] = None  # или шаблон адреса страницы: ".../news?page={page}" ({base} — url источника)
+
 class SourceSpec(BaseModel):
     class_: str = Field(..., alias="class")
     module: Optional[str] = None
     url:    HttpUrl
+    weight: float = 1.0  # надёжность источника при выборе лучшего варианта сюжета
+    rate_limit:      Optional[float] = None  # запросов в секунду к хосту (None — без ограничения)
+    rate_burst:      int = 1
+    max_concurrency: Optional[int] = None    # одновременных запросов к хосту (None — http_host_concurrency)
+    selectors:       Optional[SelectorSpec] = None  # для SelectorScraper
+    max_pages:       int = 1
+    catchup_pages:   Optional[int] = None  # глубина догонялки после простоя (None — settings.catchup_pages, 0 — выкл.)
+    deadline:        Optional[float] = None  # предел опроса, с (None — settings.source_deadline)
 
 class TelegramChannels(BaseModel):
     suggested_chat_id: int
@@ -61,8 +83,63 @@ class SettingsBlock(BaseModel):
     use_chatgpt:   bool = True
     test_one_raw:  bool = False
     poll_interval: int = 900
+    adaptive_polling: bool = True  # свой интервал у каждого источника (SourceScheduler)
+    poll_min_interval: int = 120
+    poll_max_interval: int = 3600
+    poll_target_new: float = 3.0   # сколько новых статей в идеале за опрос
+    poll_jitter: float = 0.1
+    poll_startup_spread: int = 30  # секунд, по которым размазываются просроченные опросы
     dub_threshold: float = 0.90
     dub_hours_threshold: int = 6
+    embedding_backend: str = "torch"  # torch | onnx
+    embedding_model: str = "paraphrase-MiniLM-L6-v2"
+    embedding_quantize: bool = False  # int8 для onnx
+    embedding_dim: int = 384
+    embedding_cache_size: int = 4096
+    embedding_batch_size: int = 64
+    simhash_distance: int = 3
+    story_clustering: bool = False  # сюжеты вместо окна похожих (StoryClusterService)
+    http_limit: int = 100
+    http_limit_per_host: int = 8
+    http_dns_ttl: int = 300
+    http_keepalive: int = 30
+    http_host_concurrency: int = 4
+    http_retries: int = 3
+    http_backoff_base: float = 0.5
+    http_backoff_max: float = 30.0
+    conditional_get: bool = True  # ETag/Last-Modified/хэш для страниц-списков
+    http_archive_mode: Optional[str] = None  # record | replay — см. HttpArchive
+    http_replay_latency: float = 0.0
+    parse_workers: int = 2        # потоков для разбора HTML
+    collect_batch_size: int = 20  # микробатч сохранения в raw
+    collect_batch_wait: float = 2.0
+    catchup_pages: int = 5              # сколько страниц списка дочитывать после простоя
+    catchup_max_age_hours: float = 48   # статьи старше не догоняем
+    source_deadline: float = 120        # предел одного опроса источника, с
+    breaker_threshold: int = 3          # неудач подряд до отключения источника
+    breaker_cooldown: float = 300       # первое отключение, с (дальше удваивается)
+    breaker_max_cooldown: float = 21600
+    media_concurrency: int = 8          # одновременных загрузок медиа
+    media_host_concurrency: int = 3
+    media_max_mb: float = 20            # больше — загрузка обрывается
+    media_timeout: int = 20
+    media_phash_distance: Optional[int] = 6  # бит dHash до «той же картинки»; None — только точные копии
+    image_prep: bool = True             # уменьшать и перекодировать картинки перед отправкой
+    image_workers: int = 2              # процессов для перекодирования
+    image_max_side: int = 1280
+    image_quality: int = 82
+    image_format: str = "jpeg"          # jpeg | webp
+    image_min_side: int = 200           # меньше по меньшей стороне — не отправляем
+    media_budget_gb: float = 5.0        # предел размера MEDIA_DIR для MediaGC
+    media_retention_days: int = 7       # файлы отправленных за столько дней не трогаем
+    media_gc_interval: int = 600        # секунд между проходами очистки
+    media_gc_scan_batch: int = 1000     # записей каталога за проход
+    media_gc_min_age: int = 3600        # недавно использованные файлы не удаляются
+    dub_ann: bool = False
+    dub_ann_lists: int = 64
+    dub_ann_probe: int = 8
+    incremental_processing: bool = True
+    process_chunk_size: int = 200
 
 class AppConfig(BaseModel):
     telegram_channels: TelegramChannels
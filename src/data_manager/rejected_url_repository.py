@@ -0,0 +1,29 @@
+# src/data_manager/rejected_url_repository.py
+from datetime import datetime
+
+import numpy as np
+
+
+class RejectedUrlRepository:
+    """URL статей, отсеянных как копии до raw_news (rejected_urls) — чтобы не качать их снова."""
+
+    def __init__(self, conn, table="rejected_urls"):
+        self.conn = conn
+        self.table = table
+
+    def all_urls(self):
+        return {r[0] for r in self.conn.execute(f"SELECT url FROM {self.table}").fetchall()}
+
+    def add_many(self, urls):
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return
+        view = f"_{self.table}_batch"
+        self.conn.register(view, {"url": np.array(urls, dtype=object)})
+        try:
+            self.conn.execute(
+                f"INSERT INTO {self.table} SELECT url, ? FROM {view} ON CONFLICT (url) DO NOTHING",
+                [datetime.utcnow()],
+            )
+        finally:
+            self.conn.unregister(view)
@@ -0,0 +1,27 @@
+# src/data_manager/schedule_repository.py
+
+
+class SourceScheduleRepository:
+    """Состояние адаптивного расписания по источникам (source_schedule)."""
+
+    FIELDS = ("interval", "rate", "last_run", "next_run")
+
+    def __init__(self, conn, table="source_schedule"):
+        self.conn = conn
+        self.table = table
+
+    def load(self):
+        """{source: {"interval", "rate", "last_run", "next_run"}}"""
+        rows = self.conn.execute(
+            f"SELECT source, {', '.join(self.FIELDS)} FROM {self.table}"
+        ).fetchall()
+        return {r[0]: dict(zip(self.FIELDS, r[1:])) for r in rows}
+
+    def save(self, source, interval, rate, last_run, next_run):
+        self.conn.execute(
+            f"INSERT INTO {self.table} (source, interval, rate, last_run, next_run) "
+            f"VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (source) DO UPDATE SET interval = excluded.interval, "
+            f"rate = excluded.rate, last_run = excluded.last_run, next_run = excluded.next_run",
+            [source, interval, rate, last_run, next_run],
+        )
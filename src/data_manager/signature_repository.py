@@ -0,0 +1,65 @@
+# src/data_manager/signature_repository.py
+import numpy as np
+
+from src.utils.simhash import bands, N_BANDS
+
+
+class SignatureRepository:
+    """
+    SimHash-подписи новостей + LSH-полосы (b0..b3) в DuckDB.
+    Кандидаты ищутся одним JOIN'ом по совпадению любой полосы.
+    """
+
+    def __init__(self, conn, table="news_signatures"):
+        self.conn = conn
+        self.table = table
+
+    @staticmethod
+    def _columns(sigs):
+        cols = {"simhash": np.array(sigs, dtype=np.uint64)}
+        band_rows = np.array([bands(s) for s in sigs], dtype=np.uint16).reshape(-1, N_BANDS)
+        for i in range(N_BANDS):
+            cols[f"b{i}"] = band_rows[:, i]
+        return cols
+
+    def save_many(self, ids, dates, sigs):
+        if not ids:
+            return
+        view = f"_{self.table}_batch"
+        date_col = np.empty(len(ids), dtype=object)
+        date_col[:] = list(dates)
+        batch = {"id": np.asarray(ids, dtype=np.uint64), "date": date_col, **self._columns(sigs)}
+        cols = ", ".join(batch)
+        self.conn.register(view, batch)
+        try:
+            self.conn.execute(
+                f"INSERT INTO {self.table} ({cols}) SELECT {cols} FROM {view} "
+                f"ON CONFLICT (id) DO NOTHING"
+            )
+        finally:
+            self.conn.unregister(view)
+
+    def min_distances(self, sigs, cutoff=None):
+        """
+        Для каждой подписи — минимальное расстояние Хэмминга до LSH-кандидатов
+        (date >= cutoff). None — кандидатов в общих полосах нет.
+        """
+        if not sigs:
+            return []
+        view = f"_{self.table}_query"
+        self.conn.register(view, {"qid": np.arange(len(sigs)), **self._columns(sigs)})
+        same_band = " OR ".join(f"s.b{i} = q.b{i}" for i in range(N_BANDS))
+        where, params = ("WHERE s.date >= ?", [cutoff]) if cutoff else ("", [])
+        try:
+            rows = self.conn.execute(
+                f"SELECT q.qid, min(bit_count(xor(q.simhash, s.simhash))) "
+                f"FROM {view} q JOIN {self.table} s ON ({same_band}) {where} "
+                f"GROUP BY q.qid",
+                params,
+            ).fetchall()
+        finally:
+            self.conn.unregister(view)
+        out = [None] * len(sigs)
+        for qid, dist in rows:
+            out[qid] = dist
+        return out
@@ -0,0 +1,22 @@
+# src/data_manager/state_repository.py
+
+
+class StateRepository:
+    """Ключ → число в таблице pipeline_state (водяные знаки, счётчики и т.п.)."""
+
+    def __init__(self, conn, table="pipeline_state"):
+        self.conn = conn
+        self.table = table
+
+    def get(self, key, default=0):
+        row = self.conn.execute(
+            f"SELECT value FROM {self.table} WHERE key=?", [key]
+        ).fetchone()
+        return default if row is None or row[0] is None else row[0]
+
+    def set(self, key, value):
+        self.conn.execute(
+            f"INSERT INTO {self.table} (key, value) VALUES (?, ?) "
+            f"ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            [key, value],
+        )
@@ -0,0 +1,108 @@
+# src/data_manager/story_repository.py
+import numpy as np
+
+
+class StoryClusterRepository:
+    """Кластеры сюжетов (центроид + лучший вариант) и принадлежность новостей к ним."""
+
+    def __init__(self, conn, dim, clusters_table="story_clusters", members_table="story_members"):
+        self.conn = conn
+        self.dim = dim
+        self.clusters_table = clusters_table
+        self.members_table = members_table
+
+    def is_empty(self):
+        return self.conn.execute(f"SELECT count(*) FROM {self.clusters_table}").fetchone()[0] == 0
+
+    def clear(self):
+        """Центроиды посчитаны другой моделью — сюжеты заводятся заново (засев из processed)."""
+        self.conn.execute(f"DELETE FROM {self.members_table}")
+        self.conn.execute(f"DELETE FROM {self.clusters_table}")
+
+    def next_id(self):
+        return self.conn.execute("SELECT nextval('story_clusters_seq')").fetchone()[0]
+
+    def fetch_active(self, cutoff):
+        """Кластеры, обновлявшиеся после cutoff: dict полей + матрица центроидов."""
+        res = self.conn.execute(
+            f"SELECT id, centroid, size, best_id, best_score FROM {self.clusters_table} "
+            f"WHERE updated >= ? ORDER BY id",
+            [cutoff],
+        ).fetchnumpy()
+        centroids = (
+            np.vstack(res["centroid"]).astype(np.float32)
+            if len(res["id"]) else np.empty((0, self.dim), dtype=np.float32)
+        )
+        clusters = [
+            {"id": int(i), "size": int(n), "best_id": int(b), "best_score": float(sc)}
+            for i, n, b, sc in zip(res["id"], res["size"], res["best_id"], res["best_score"])
+        ]
+        return clusters, centroids
+
+    def fetch_members(self, news_ids):
+        """{news_id: cluster_id} для уже распределённых новостей."""
+        if not news_ids:
+            return {}
+        view = f"_{self.members_table}_ids"
+        self.conn.register(view, {"id": np.asarray(news_ids, dtype=np.uint64)})
+        try:
+            rows = self.conn.execute(
+                f"SELECT m.news_id, m.cluster_id FROM {self.members_table} m "
+                f"JOIN {view} q ON m.news_id = q.id"
+            ).fetchall()
+        finally:
+            self.conn.unregister(view)
+        return dict(rows)
+
+    def fetch_best(self, cluster_ids):
+        """{cluster_id: best_id}."""
+        if not cluster_ids:
+            return {}
+        ph = ",".join("?" for _ in cluster_ids)
+        rows = self.conn.execute(
+            f"SELECT id, best_id FROM {self.clusters_table} WHERE id IN ({ph})",
+            list(cluster_ids),
+        ).fetchall()
+        return dict(rows)
+
+    def save(self, clusters, centroids, members, updated):
+        """
+        clusters/centroids — изменённые кластеры (upsert), members — [(news_id, cluster_id, score)].
+        """
+        if clusters:
+            view = f"_{self.clusters_table}_batch"
+            emb = np.empty(len(clusters), dtype=object)
+            emb[:] = list(np.asarray(centroids, dtype=np.float32))
+            self.conn.register(view, {
+                "id": np.array([c["id"] for c in clusters], dtype=np.int64),
+                "centroid": emb,
+                "size": np.array([c["size"] for c in clusters], dtype=np.int32),
+                "best_id": np.array([c["best_id"] for c in clusters], dtype=np.uint64),
+                "best_score": np.array([c["best_score"] for c in clusters], dtype=np.float64),
+            })
+            try:
+                self.conn.execute(
+                    f"INSERT INTO {self.clusters_table} "
+                    f"SELECT id, centroid::FLOAT[{self.dim}], size, best_id, best_score, ? FROM {view} "
+                    f"ON CONFLICT (id) DO UPDATE SET centroid = excluded.centroid, "
+                    f"size = excluded.size, best_id = excluded.best_id, "
+                    f"best_score = excluded.best_score, updated = excluded.updated",
+                    [updated],
+                )
+            finally:
+                self.conn.unregister(view)
+
+        if members:
+            view = f"_{self.members_table}_batch"
+            self.conn.register(view, {
+                "news_id": np.array([m[0] for m in members], dtype=np.uint64),
+                "cluster_id": np.array([m[1] for m in members], dtype=np.int64),
+                "score": np.array([m[2] for m in members], dtype=np.float64),
+            })
+            try:
+                self.conn.execute(
+                    f"INSERT INTO {self.members_table} SELECT news_id, cluster_id, score FROM {view} "
+                    f"ON CONFLICT (news_id) DO NOTHING"
+                )
+            finally:
+                self.conn.unregister(view)
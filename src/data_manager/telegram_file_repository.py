@@ -0,0 +1,27 @@
+# src/data_manager/telegram_file_repository.py
+from datetime import datetime
+
+
+class TelegramFileRepository:
+    """Локальный медиафайл → file_id Telegram после первой загрузки (telegram_files)."""
+
+    def __init__(self, conn, table="telegram_files"):
+        self.conn = conn
+        self.table = table
+
+    def load(self):
+        """{file: file_id}"""
+        return dict(self.conn.execute(f"SELECT file, file_id FROM {self.table}").fetchall())
+
+    def save(self, file, file_id):
+        self.conn.execute(
+            f"INSERT INTO {self.table} (file, file_id, updated) VALUES (?, ?, ?) "
+            f"ON CONFLICT (file) DO UPDATE SET file_id = excluded.file_id, updated = excluded.updated",
+            [file, file_id, datetime.utcnow()],
+        )
+
+    def delete(self, files):
+        if files:
+            self.conn.execute(
+                f"DELETE FROM {self.table} WHERE file IN ({', '.join('?' * len(files))})", list(files)
+            )
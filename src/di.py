@@ -1,6 +1,8 @@
 # src/di.py
 # ────────────── 0. stdlib / сторонние ────────────── #
+from datetime import timedelta
 import shutil
+from urllib.parse import urlparse
 
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
@@ -11,7 +13,7 @@ from src.utils.file_utils import *
 from src.utils.paths import *
 from src.utils.formatters import *
 from src.bot.logger import setup_logger
-from src.bot.filter import ProgOrAdminFilter
+from src.bot.filter import ProgFilter, ProgOrAdminFilter
 from src.bot.middleware import (
     LoggingMiddleware,
     RoleMiddleware,
@@ -19,24 +21,47 @@ from src.bot.middleware import (
 )
 from src.bot.handlers.general import router as general_router
 from src.bot.handlers.post import build_post_admin_router
+from src.bot.handlers.prog_private import build_prog_router
 
 # ────────────── 2. модели / БД ────────────── #
 from src.data_manager.models import *
 from src.data_manager.duckdb_client import DuckDBClient
 from src.data_manager.duckdb_repository import DuckDBRepository
+from src.data_manager.state_repository import StateRepository
+from src.data_manager.embedding_repository import EmbeddingRepository
+from src.data_manager.ivf_index import IVFIndex
+from src.data_manager.signature_repository import SignatureRepository
+from src.data_manager.story_repository import StoryClusterRepository
+from src.data_manager.http_cache_repository import HttpCacheRepository
+from src.data_manager.media_repository import MediaRepository
+from src.data_manager.telegram_file_repository import TelegramFileRepository
+from src.data_manager.media_access_repository import MediaAccessRepository
+from src.data_manager.rejected_url_repository import RejectedUrlRepository
+from src.data_manager.schedule_repository import SourceScheduleRepository
 
 # ────────────── 3. сервис-слой ────────────── #
 from src.services.duplicate_filter_service import DuplicateFilterService
+from src.services.embedding_backends import LazyEmbeddingModel, build_embedding_backend, embedding_signature
 from src.services.media_service import MediaService
 from src.services.translate_service import TranslateService
 from src.services.chat_gpt_service import ChatGPTService
 from src.services.collector_service import CollectorService
 from src.services.processed_service import ProcessedService
+from src.services.story_cluster_service import StoryClusterService
 from src.services.sending_service import SendingService
+from src.services.telegram_file_cache import TelegramFileCache
+from src.services.media_gc import MediaGC
 from src.services.polling_service import PollingService
+from src.services.source_scheduler import SourceScheduler
 
+from src.data_collector.http_client import HttpClient
+from src.data_collector.fetcher import Fetcher
+from src.data_collector.http_archive import HttpArchive
 from src.data_collector.web_scraper_collector import WebScraperCollector
+from src.data_collector.known_urls import KnownUrls
 from src.data_collector.web_scrapers import *
+from src.data_collector.web_scrapers.parsing import ParsePool
+from src.utils.image_prep import ImagePrep
 
 # ────────────── 4. конфиг + окружение ────────────── #
 load_env()                                   # .env → os.environ
@@ -45,6 +70,7 @@ cfg = load_app_config("config.json")
 # ────────────── 5. подготовка файловой среды ────────────── #
 if cfg.settings.reset:
     Path(DB).unlink(missing_ok=True)
+    DEDUP_INDEX.unlink(missing_ok=True)
     if MEDIA_DIR.exists():
         shutil.rmtree(MEDIA_DIR)
 MEDIA_DIR.mkdir(parents=True, exist_ok=True)
@@ -74,10 +100,54 @@ dp.update.middleware(
 dp.include_router(general_router)
 
 # ────────────── 7. БД и репозитории ────────────── #
-db_client      = DuckDBClient(DB)
-raw_repo       = DuckDBRepository(db_client.conn, "raw_news",       RawNewsItem)
-processed_repo = DuckDBRepository(db_client.conn, "processed_news", ProcessedNewsItem)
-sent_repo      = DuckDBRepository(db_client.conn, "sent_news", SentNewsItem)
+db_client      = DuckDBClient(DB, embedding_dim=cfg.settings.embedding_dim)
+# подпись векторов: смена бэкенда/модели/квантования не смешивает несравнимые эмбеддинги
+embedding_sig  = embedding_signature(
+    cfg.settings.embedding_backend,
+    cfg.settings.embedding_model,
+    quantize=cfg.settings.embedding_quantize,
+    dim=cfg.settings.embedding_dim,
+)
+raw_repo       = DuckDBRepository(db_client.conn, "raw_news",       RawNewsItem,       bulk=True)
+processed_repo = DuckDBRepository(db_client.conn, "processed_news", ProcessedNewsItem, bulk=True)
+sent_repo      = DuckDBRepository(db_client.conn, "sent_news",      SentNewsItem,      bulk=True)
+state_repo     = StateRepository(db_client.conn)
+embedding_repo = EmbeddingRepository(db_client.conn, cfg.settings.embedding_dim, signature=embedding_sig)
+signature_repo = SignatureRepository(db_client.conn)
+story_repo     = StoryClusterRepository(db_client.conn, cfg.settings.embedding_dim)
+stale_embeddings = embedding_repo.drop_foreign()
+if stale_embeddings:
+    # окно пересчитается новой моделью по мере надобности, сюжеты засеются заново
+    story_repo.clear()
+    logger.warning("Эмбеддинги другой модели удалены: %d (теперь %s)", stale_embeddings, embedding_sig)
+http_cache_repo = HttpCacheRepository(db_client.conn)
+media_gc = MediaGC(
+    repo=MediaAccessRepository(db_client.conn),
+    state_repo=state_repo,
+    media_dir=MEDIA_DIR,
+    budget_bytes=int(cfg.settings.media_budget_gb * 2 ** 30),
+    retention_days=cfg.settings.media_retention_days,
+    min_age=cfg.settings.media_gc_min_age,
+    interval=cfg.settings.media_gc_interval,
+    scan_batch=cfg.settings.media_gc_scan_batch,
+    raw_watermark_key=ProcessedService.WATERMARK_KEY if cfg.settings.incremental_processing else None,
+    logger=logger,
+)
+dp.shutdown.register(media_gc.stop)
+telegram_files = TelegramFileCache(
+    TelegramFileRepository(db_client.conn), MEDIA_DIR, logger=logger, access=media_gc
+)
+
+dedup_index = None
+if cfg.settings.dub_ann:
+    dedup_index = IVFIndex(
+        dim=cfg.settings.embedding_dim,
+        n_lists=cfg.settings.dub_ann_lists,
+        n_probe=cfg.settings.dub_ann_probe,
+        path=DEDUP_INDEX,
+        signature=embedding_sig,
+    )
+    dedup_index.load()
 
 # ────────────── 8. сервисы ────────────── #
 prog_admin_filter = ProgOrAdminFilter(
@@ -91,31 +161,107 @@ dp.include_router(
         cfg=cfg,
         build_caption=build_caption,
         build_meta=build_meta,
+        file_cache=telegram_files,
     )
 )
 
 translate_svc = TranslateService()
+
+# модель грузится в фоне — бот начинает отвечать сразу
+embedding_model = LazyEmbeddingModel(
+    build_embedding_backend(
+        cfg.settings.embedding_backend,
+        cfg.settings.embedding_model,
+        quantize=cfg.settings.embedding_quantize,
+    ),
+    logger=logger,
+).start()
+
 dup_raw = DuplicateFilterService(
     repo=raw_repo,
     dub_threshold=cfg.settings.dub_threshold,
-    dub_hours_threshold=cfg.settings.dub_hours_threshold
+    dub_hours_threshold=cfg.settings.dub_hours_threshold,
+    embedding_model=embedding_model,
+    signature_store=signature_repo,
+    simhash_distance=cfg.settings.simhash_distance,
 )
 dup_proc = DuplicateFilterService(
     repo=processed_repo,
     dub_threshold=cfg.settings.dub_threshold,
-    dub_hours_threshold=cfg.settings.dub_hours_threshold
+    dub_hours_threshold=cfg.settings.dub_hours_threshold,
+    embedding_model=embedding_model,
+    embedding_store=embedding_repo,
+    cache_size=cfg.settings.embedding_cache_size,
+    encode_batch_size=cfg.settings.embedding_batch_size,
+    ann_index=dedup_index,
+)
+
+# один HTTP-клиент на процесс: keep-alive, DNS-кэш, лимиты на хост
+http_client = HttpClient(
+    limit=cfg.settings.http_limit,
+    limit_per_host=cfg.settings.http_limit_per_host,
+    dns_ttl=cfg.settings.http_dns_ttl,
+    keepalive_timeout=cfg.settings.http_keepalive,
+)
+dp.shutdown.register(http_client.close)
+
+fetcher = Fetcher(
+    http_client,
+    retries=cfg.settings.http_retries,
+    backoff_base=cfg.settings.http_backoff_base,
+    backoff_max=cfg.settings.http_backoff_max,
+    host_concurrency=cfg.settings.http_host_concurrency,
+    logger=logger,
+    archive=HttpArchive(
+        HTTP_ARCHIVE_DIR,
+        mode=cfg.settings.http_archive_mode,
+        latency=cfg.settings.http_replay_latency,
+    ) if cfg.settings.http_archive_mode else None,
 )
 
+parse_pool = ParsePool(max_workers=cfg.settings.parse_workers)
+dp.shutdown.register(parse_pool.close)
+
 web_collector = WebScraperCollector(
     source_map=cfg.source_map,
     source_spec_model=SourceSpec,
     scraper_registry=SCRAPER_REGISTRY,
     logger=logger,
+    http=http_client,
+    fetcher=fetcher,
+    validators=http_cache_repo if cfg.settings.conditional_get else None,
+    parse_pool=parse_pool,
+    catchup_pages=cfg.settings.catchup_pages,
+    catchup_max_age=timedelta(hours=cfg.settings.catchup_max_age_hours),
+    deadline=cfg.settings.source_deadline,
+    breaker_threshold=cfg.settings.breaker_threshold,
+    breaker_cooldown=cfg.settings.breaker_cooldown,
+    breaker_max_cooldown=cfg.settings.breaker_max_cooldown,
 )
 
+image_prep = None
+if cfg.settings.image_prep:
+    image_prep = ImagePrep(
+        max_workers=cfg.settings.image_workers,
+        max_side=cfg.settings.image_max_side,
+        quality=cfg.settings.image_quality,
+        fmt=cfg.settings.image_format,
+        min_side=cfg.settings.image_min_side,
+    )
+    dp.shutdown.register(image_prep.close)
+
 media_service = MediaService(
     logger=logger,
     media_dir=MEDIA_DIR,
+    http=http_client,
+    concurrency=cfg.settings.media_concurrency,
+    host_concurrency=cfg.settings.media_host_concurrency,
+    max_bytes=int(cfg.settings.media_max_mb * 2 ** 20),
+    timeout=cfg.settings.media_timeout,
+    repo=MediaRepository(db_client.conn),
+    phash_distance=cfg.settings.media_phash_distance,
+    image_prep=image_prep,
+    access=media_gc,
 )
 
 collector_service = CollectorService(
@@ -128,6 +274,9 @@ collector_service = CollectorService(
     model=RawNewsItem,
     parse_date=parse_date,
     test_one_raw=cfg.settings.test_one_raw,
+    known_urls=KnownUrls(raw_repo, rejected=RejectedUrlRepository(db_client.conn)),
+    batch_size=cfg.settings.collect_batch_size,
+    batch_wait=cfg.settings.collect_batch_wait,
 )
 
 chatgpt_service = ChatGPTService(
@@ -135,6 +284,22 @@ chatgpt_service = ChatGPTService(
     proxy_url= os.environ.get("PROXY"),
 )
 
+story_clusters = None
+if cfg.settings.story_clustering:
+    story_clusters = StoryClusterService(
+        cluster_repo     = story_repo,
+        duplicate_filter = dup_proc,
+        processed_repo   = processed_repo,
+        source_weights   = {
+            urlparse(str(spec.url)).netloc: spec.weight
+            for specs in cfg.source_map.values()
+            for spec in specs
+        },
+        threshold        = cfg.settings.dub_threshold,
+        window_hours     = cfg.settings.dub_hours_threshold,
+        logger           = logger,
+    )
+
 processed_service = ProcessedService(
     raw_repo          = raw_repo,
     processed_repo    = processed_repo,
@@ -143,6 +308,10 @@ processed_service = ProcessedService(
     duplicate_filter  = dup_proc,
     logger            = logger,
     use_chatgpt       = cfg.settings.use_chatgpt,
+    state_repo        = state_repo,
+    incremental       = cfg.settings.incremental_processing,
+    chunk_size        = cfg.settings.process_chunk_size,
+    story_clusters    = story_clusters,
 )
 
 sending_service = SendingService(
@@ -154,8 +323,23 @@ sending_service = SendingService(
     build_caption=build_caption,
     build_meta=build_meta,
     media_dir=MEDIA_DIR,
+    file_cache=telegram_files,
 )
 
+source_scheduler = None
+if cfg.settings.adaptive_polling:
+    source_scheduler = SourceScheduler(
+        repo=SourceScheduleRepository(db_client.conn),
+        sources=[s.base_url for s in web_collector.scrapers],
+        base_interval=cfg.settings.poll_interval,
+        min_interval=cfg.settings.poll_min_interval,
+        max_interval=cfg.settings.poll_max_interval,
+        target_new=cfg.settings.poll_target_new,
+        jitter=cfg.settings.poll_jitter,
+        startup_spread=cfg.settings.poll_startup_spread,
+        logger=logger,
+    )
+
 polling_service = PollingService(
     collector_service = collector_service,
     processed_service = processed_service,
@@ -165,7 +349,17 @@ polling_service = PollingService(
     interval          = cfg.settings.poll_interval,
     first_run         = cfg.settings.first_run,
     logger            = logger,
+    scheduler         = source_scheduler,
+)
+
+# последним: ловит все прочие команды в личке
+dp.include_router(
+    build_prog_router(
+        web_collector,
+        prog_filter=ProgFilter(set(cfg.users.prog_ids)),
+        scheduler=source_scheduler,
+    )
 )
 
 # ────────────── 9. экспорт ────────────── #
-__all__ = ["bot", "dp", "polling_service", "cfg", "logger"]
+__all__ = ["bot", "dp", "polling_service", "media_gc", "cfg", "logger", "http_client"]
@@ -1,11 +1,14 @@
 # src/services/collector_service.py
+import asyncio
+
 from src.utils.file_utils import make_id
+from src.utils.simhash import simhash
 class CollectorService:
     """
-    1. Запускает WebScraperCollector -> получает list[dict].
-    2. Скачивает медиa, переводит язык, парсит дату.
+    1. Читает WebScraperCollector.stream() -> микробатчи list[dict] по мере готовности.
+    2. Для каждого батча скачивает медиa, переводит язык, парсит дату.
     3. Валидирует всё в RawNewsItem.
-    4. Отфильтровывает дубликаты и кладёт в raw_repo.
+    4. Считает SimHash-подписи, отфильтровывает дубликаты (URL, почти-копии) и кладёт в raw_repo.
     """
 
     def __init__(
@@ -21,6 +24,9 @@ class CollectorService:
         parse_date,  # <--- функция парсинга даты через DI
         test_one_raw=False,
         item_index=2,
+        known_urls=None,
+        batch_size=20,
+        batch_wait=2.0,
     ):
         self.raw_repo = raw_repo
         self.collector = collector
@@ -32,31 +38,45 @@ class CollectorService:
         self.parse_date = parse_date
         self.test_one_raw = test_one_raw
         self.item_index = item_index
+        self.known_urls = known_urls
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
 
-    async def collect_and_save(self):
-        raw = await self.collector.collect()
-        if self.test_one_raw and raw:
-            raw = [raw[self.item_index]]
+    @property
+    def sources(self):
+        """Скраперы — единицы расписания для PollingService."""
+        return self.collector.scrapers
 
-        already_urls = self.raw_repo.all_field("url")
-        items = []
-        for r in raw:
-            # --- фильтруем сразу по наличию в базе
-            if r["url"] in already_urls:
-                continue
+    async def collect_and_save(self, scrapers=None):
+        """scrapers — опросить только эти источники (по умолчанию все)."""
+        if self.test_one_raw:
+            raw = await self.collector.collect(known=self.known_urls, scrapers=scrapers)
+            if raw:
+                await self._save_batch([raw[self.item_index]])
+            return
 
-            media_ids = []
-            for murl in r.get("media_urls", []):
-                fid = await self.media_service.download(murl)
-                if fid:
-                    media_ids.append(fid)
+        # скраперы продолжают качать, пока мы обрабатываем уже пришедшие микробатчи
+        async for batch in self.collector.stream(
+            known=self.known_urls,
+            scrapers=scrapers,
+            batch_size=self.batch_size,
+            max_wait=self.batch_wait,
+        ):
+            await self._save_batch(batch)
 
-            raw_text = r.get("text", "")
-            lang = self.translate_service.detect_language(raw_text)
-            if lang == "en":
-                raw_text = self.translate_service.translate(raw_text)
-                lang = "ru"
+    async def _save_batch(self, raw):
+        already_urls = self.known_urls if self.known_urls is not None else self.raw_repo.all_field("url")
+        # --- фильтруем сразу по наличию в базе
+        raw = [r for r in raw if r["url"] not in already_urls]
+        if not raw:
+            return
+
+        # медиа всего батча качаются параллельно, язык/перевод — в потоке (argos блокирует)
+        media = await asyncio.gather(*(self._download_media(r) for r in raw))
+        langs = await asyncio.to_thread(self._localize, [r.get("text", "") for r in raw])
 
+        items = []
+        for r, media_ids, (raw_text, lang) in zip(raw, media, langs):
             # --- модель ---
             item = self.model(
                 id=make_id(r["url"]),
@@ -70,7 +90,32 @@ class CollectorService:
             )
             items.append(item)
 
-        unique = self.duplicate_filter.filter(items)
-        if unique:
-            self.raw_repo.insert_news(unique)
-            self.logger.debug("Сохранили в raw: %d", len(unique))
+        # с known_urls батч уже сверен с базой выше — полный скан raw_news на каждый
+        # микробатч не нужен, остаётся только дедуп URL внутри батча
+        unique = self.duplicate_filter.filter(items, known=self.known_urls)
+        signatures = {it.id: simhash(it.text) for it in unique}
+        lexical = self.duplicate_filter.filter_lexical(unique, signatures)
+        if lexical:
+            saved = self.raw_repo.insert_news(lexical)
+            self.duplicate_filter.save_signatures(lexical, signatures)
+            self.logger.debug("Сохранили в raw: %d", saved)
+        if self.known_urls is not None:
+            # отсеянные копии тоже запоминаем (и в БД) — иначе их деталь качалась бы
+            # каждый опрос, в том числе после перезапуска
+            kept = {it.id for it in lexical}
+            self.known_urls.add_many(str(it.url) for it in lexical)
+            self.known_urls.reject_many(it.url for it in unique if it.id not in kept)
+
+    async def _download_media(self, r):
+        return await self.media_service.download_many(r.get("media_urls", []))
+
+    def _localize(self, texts):
+        """[(текст, язык)] — английское переводится на русский."""
+        out = []
+        for raw_text in texts:
+            lang = self.translate_service.detect_language(raw_text)
+            if lang == "en":
+                raw_text = self.translate_service.translate(raw_text)
+                lang = "ru"
+            out.append((raw_text, lang))
+        return out
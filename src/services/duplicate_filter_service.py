@@ -1,13 +1,23 @@
 # src/services/duplicate_filter_service.py
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
 from datetime import datetime, timedelta
 
+from src.utils.lru_cache import LRUCache
+from src.utils.simhash import bands, hamming
+
 class DuplicateFilterService:
     """
     1) filter() — фильтрация только по URL
     2) is_duplicate_content() — проверка на дубликат по содержанию
-    3) filter_content() — отбор неповторяющихся по содержанию элементов
+    3) is_similar_recent() — сравнение с окном последних новостей
+    4) filter_similar() — то же для целого батча одной матрицей + дедуп внутри батча
+    5) filter_lexical() — дешёвый SimHash/LSH-фильтр точных и почти точных копий
+
+    Эмбеддинги считаются один раз на id новости, хранятся в DuckDB
+    (embedding_store) и кэшируются в LRU — сравнения дальше только скалярные произведения.
+
+    Окно — либо (ids, матрица) для brute force, либо ann_index (IVFIndex)
+    для длинных окон: он обновляется инкрементально и чистится по дате.
     """
 
     def __init__(
@@ -16,66 +26,259 @@ class DuplicateFilterService:
         dub_threshold,
         dub_hours_threshold,
         embedding_model=None,
+        embedding_store=None,
+        cache_size=4096,
+        encode_batch_size=64,
+        ann_index=None,
+        signature_store=None,
+        simhash_distance=3,
     ):
         self.repo = repo
         self.dub_threshold = dub_threshold
         self.dub_hours_threshold = dub_hours_threshold
+        self.store = embedding_store
+        self.cache = LRUCache(cache_size)
+        self.encode_batch_size = encode_batch_size
+        self.ann = ann_index if embedding_store is not None else None
+        self.signature_store = signature_store
+        self.simhash_distance = simhash_distance
         if embedding_model is not None:
             self._model = embedding_model
         else:
             if not hasattr(DuplicateFilterService, "_model"):
+                from sentence_transformers import SentenceTransformer
                 DuplicateFilterService._model = SentenceTransformer("paraphrase-MiniLM-L6-v2")
             self._model = DuplicateFilterService._model
 
-    def get_recent_texts(self, raw_items, processed_ids):
-        cutoff = datetime.utcnow() - timedelta(hours=self.dub_hours_threshold)
-        return [
-            it.text
-            for it in raw_items
+    def _cutoff(self):
+        return datetime.utcnow() - timedelta(hours=self.dub_hours_threshold)
+
+    def get_recent_window(self, raw_items, processed_ids):
+        """(ids, матрица) обработанных новостей за окно — из уже загруженных raw_items."""
+        cutoff = self._cutoff()
+        recent = [
+            it for it in raw_items
             if (it.id in processed_ids and it.date and it.date >= cutoff)
         ]
+        return [it.id for it in recent], self.embeddings(recent)
+
+    def fetch_recent_window(self, source_repo):
+        """
+        (ids, матрица) новостей из source_repo за окно dub_hours_threshold,
+        чьи id уже есть в self.repo. Тексты подтягиваются только для id без эмбеддинга.
+        С ann_index — возвращает сам индекс, догрузив в него недостающие id окна.
+        """
+        cutoff = self._cutoff()
+        ids = source_repo.select_field_where(
+            field="id",
+            where=f"date >= ? AND id IN (SELECT id FROM {self.repo.table})",
+            params=[cutoff],
+        )
+        if self.ann is not None:
+            self.ann.evict_older(cutoff)
+            ids = self.ann.missing(ids)
+            window_ids, matrix = self._window_vectors(ids, source_repo)
+            dates = self.store.get_dates(window_ids)
+            self.ann.add(window_ids, [dates.get(i) for i in window_ids], matrix)
+            return self.ann
+        return self._window_vectors(ids, source_repo)
+
+    def _window_vectors(self, ids, source_repo):
+        found = self._lookup(ids)
+        missing = [i for i in ids if i not in found]
+        if missing:
+            items = source_repo.fetch_by_ids(missing)
+            found.update(zip((it.id for it in items), self._compute(items)))
+        ids = [i for i in ids if i in found]
+        return ids, self._stack([found[i] for i in ids])
 
-    def filter(self, items):
-        existing_urls = self.repo.all_field("url")
+    def filter(self, items, known=None):
+        """
+        Отбрасывает URL, уже лежащие в repo, и повторы внутри items.
+        known — уже загруженное множество URL (KnownUrls); без него в repo
+        проверяются только URL этого батча — стоимость не растёт с архивом.
+        """
+        existing_urls = known
+        if existing_urls is None:
+            existing_urls = self.repo.existing_values("url", [str(it.url) for it in items])
+        seen = set()
         unique = []
         for it in items:
             url = str(it.url)
-            if url in existing_urls:
+            if url in seen or url in existing_urls:
                 continue
-            existing_urls.add(url)
+            seen.add(url)
             unique.append(it)
         return unique
 
+    def filter_lexical(self, items, signatures):
+        """
+        Отбрасывает копии по SimHash (расстояние Хэмминга <= simhash_distance)
+        относительно окна в БД и внутри самого батча — до всякого эмбеддинга.
+        signatures: {id: simhash}. Пустые тексты (подпись 0) не сравниваются.
+        """
+        if self.signature_store is None or not items:
+            return items
+        sigs = [signatures[it.id] for it in items]
+        dists = self.signature_store.min_distances(sigs, self._cutoff())
+
+        buckets = {}  # (номер полосы, значение) -> подписи уже принятых
+        unique = []
+        for it, sig, dist in zip(items, sigs, dists):
+            if sig:
+                if dist is not None and dist <= self.simhash_distance:
+                    continue
+                keys = list(enumerate(bands(sig)))
+                if any(
+                    hamming(sig, other) <= self.simhash_distance
+                    for key in keys
+                    for other in buckets.get(key, ())
+                ):
+                    continue
+                for key in keys:
+                    buckets.setdefault(key, []).append(sig)
+            unique.append(it)
+        return unique
+
+    def save_signatures(self, items, signatures):
+        if self.signature_store is None or not items:
+            return
+        self.signature_store.save_many(
+            [it.id for it in items],
+            [it.date or datetime.utcnow() for it in items],
+            [signatures[it.id] for it in items],
+        )
+
     def is_duplicate_content(self, item):
-        # Тут нужна выборка text по дате — реализуем в репозитории!
-        cutoff = datetime.utcnow() - timedelta(hours=self.dub_hours_threshold)
-        existing_texts = self.repo.select_field_where(
-            field="text",
+        existing_ids = self.repo.select_field_where(
+            field="id",
             where="date >= ?",
-            params=[cutoff],
+            params=[self._cutoff()],
         )
-        for existing_text in existing_texts:
-            if self._similarity(item.text, existing_text) >= self.dub_threshold:
-                return True
-        return False
-
-    def is_similar_recent(self, text, recent_texts):
-        if not recent_texts:
-            return False
-        new_emb = self._embedding(text)
-        for old in recent_texts:
-            if self._similarity(new_emb, self._embedding(old)) >= self.dub_threshold:
-                return True
-        return False
+        found = self._lookup(existing_ids)
+        missing = [i for i in existing_ids if i not in found]
+        if missing:
+            olds = self.repo.fetch_by_ids(missing)
+            found.update(zip((it.id for it in olds), self._compute(olds)))
+        matrix = self._stack([found[i] for i in existing_ids if i in found])
+        return self._max_similarity(self.embeddings([item])[0], matrix) >= self.dub_threshold
+
+    def is_similar_recent(self, item, recent_window):
+        return bool(self._window_max(self.embeddings([item]), recent_window)[0] >= self.dub_threshold)
+
+    def filter_similar(self, items, recent_window):
+        """
+        Батч-версия is_similar_recent: один encode на все абзацы батча,
+        одно матричное произведение с окном и жадный дедуп внутри батча
+        (из похожих друг на друга остаётся первый по порядку).
+        """
+        if not items:
+            return []
+        batch = self.embeddings(items)
+        dup = self._window_max(batch, recent_window) >= self.dub_threshold
+
+        inner = batch @ batch.T
+        kept = []
+        for i in range(len(items)):
+            if dup[i]:
+                continue
+            if kept and inner[i, kept].max() >= self.dub_threshold:
+                continue
+            kept.append(i)
+        return [items[i] for i in kept]
+
+    def extend_window(self, recent_window, items):
+        """Добавляет принятые items в окно, чтобы следующие чанки сравнивались и с ними."""
+        if not items:
+            return recent_window
+        added = self.embeddings(items)
+        if self.ann is not None and recent_window is self.ann:
+            self.ann.add([it.id for it in items], [it.date for it in items], added)
+            return recent_window
+        ids, matrix = recent_window
+        matrix = np.vstack([matrix, added]) if len(matrix) else added
+        return list(ids) + [it.id for it in items], matrix
+
+    def save_window(self, recent_window):
+        """Сбрасывает ANN-индекс на диск (для матричного окна — ничего)."""
+        if self.ann is not None and recent_window is self.ann:
+            self.ann.save()
+
+    def embeddings(self, items):
+        """Нормированные эмбеддинги items (по id): LRU → DuckDB → модель."""
+        if not items:
+            return self._stack([])
+        found = self._lookup([it.id for it in items])
+        missing = [it for it in items if it.id not in found]
+        if missing:
+            found.update(zip((it.id for it in missing), self._compute(missing)))
+        return self._stack([found[it.id] for it in items])
+
+    async def wait_ready(self):
+        """Ждёт фоновую загрузку модели (LazyEmbeddingModel), не блокируя event loop."""
+        if hasattr(self._model, "wait_ready"):
+            await self._model.wait_ready()
+
+    def cache_stats(self):
+        return self.cache.stats()
 
     # ─────────────────── helpers (приватные) ─────────────────── #
-    def _embedding(self, text):
-        parts = [p for p in text.split("\n") if len(p.split()) > 5]
-        if not parts:
-            parts = [text]
-        embs = self._model.encode(parts)
-        return embs.mean(axis=0)
+    def _lookup(self, ids):
+        found = {}
+        for i in ids:
+            emb = self.cache.get(i)
+            if emb is not None:
+                found[i] = emb
+        if self.store is not None:
+            rest = [i for i in ids if i not in found]
+            for i, emb in self.store.get_many(rest).items():
+                self.cache.put(i, emb)
+                found[i] = emb
+        return found
+
+    def _compute(self, items):
+        """Считает эмбеддинги моделью, сохраняет в DuckDB и кэш."""
+        matrix = self._encode([it.text for it in items])
+        if self.store is not None:
+            self.store.save_many([it.id for it in items], [it.date for it in items], matrix)
+        for it, emb in zip(items, matrix):
+            self.cache.put(it.id, emb)
+        return matrix
+
+    def _encode(self, texts):
+        """Все абзацы всех текстов — одним model.encode, затем mean-pooling по тексту и L2-нормировка."""
+        parts, starts = [], []
+        for text in texts:
+            starts.append(len(parts))
+            chunk = [p for p in text.split("\n") if len(p.split()) > 5]
+            parts.extend(chunk or [text])
+        embs = np.asarray(
+            self._model.encode(parts, batch_size=self.encode_batch_size),
+            dtype=np.float32,
+        )
+        counts = np.diff(starts + [len(parts)])
+        pooled = np.add.reduceat(embs, starts, axis=0) / counts[:, None]
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (pooled / norms).astype(np.float32)
+
+    def _stack(self, vectors):
+        if not len(vectors):
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(vectors).astype(np.float32, copy=False)
+
+    @staticmethod
+    def _window_max(batch, recent_window):
+        """Максимальная похожесть каждой строки batch на окно."""
+        if hasattr(recent_window, "max_similarity"):
+            return recent_window.max_similarity(batch)
+        _, matrix = recent_window
+        if not len(matrix):
+            return np.zeros(len(batch), dtype=np.float32)
+        return (batch @ matrix.T).max(axis=1)
 
     @staticmethod
-    def _similarity(a_emb, b_emb):
-        return float(util.cos_sim(a_emb, b_emb))
\ No newline at end of file
+    def _max_similarity(emb, matrix):
+        if not len(matrix):
+            return 0.0
+        return float(np.max(matrix @ emb))
@@ -0,0 +1,195 @@
+# src/services/embedding_backends.py
+"""
+Бэкенды эмбеддингов для DuplicateFilterService:
+  • TorchEmbeddingBackend — SentenceTransformer на PyTorch (как было);
+  • OnnxEmbeddingBackend  — та же модель, экспортированная в ONNX Runtime,
+    опционально с динамической int8-квантизацией (быстрее на CPU без GPU).
+LazyEmbeddingModel грузит любой из них в фоновом потоке, чтобы не тормозить старт бота.
+"""
+import asyncio
+import json
+import threading
+
+import numpy as np
+
+from src.utils.paths import MODELS_DIR
+
+
+class TorchEmbeddingBackend:
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self._model = None
+
+    def load(self):
+        from sentence_transformers import SentenceTransformer
+        self._model = SentenceTransformer(self.model_name, device="cpu")
+
+    def encode(self, texts, batch_size=32):
+        return self._model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+
+
+class OnnxEmbeddingBackend:
+    """
+    При первом запуске экспортирует трансформер + mean-pooling в ONNX
+    (нужен torch, только один раз), дальше работает на onnxruntime.
+    Файлы кладутся в models/onnx/<имя модели>/.
+    """
+
+    def __init__(self, model_name, quantize=False, model_dir=None, threads=None):
+        self.model_name = model_name
+        self.quantize = quantize
+        self.model_dir = model_dir or MODELS_DIR / "onnx" / model_name.replace("/", "__")
+        self.threads = threads
+        self._session = None
+        self._tokenizer = None
+        self._input_names = []
+        self._max_length = 128
+
+    def load(self):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        fp32 = self.model_dir / "model.onnx"
+        if not fp32.exists():
+            self._export(fp32)
+        path = fp32
+        if self.quantize:
+            path = self.model_dir / "model.int8.onnx"
+            if not path.exists():
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                quantize_dynamic(str(fp32), str(path), weight_type=QuantType.QInt8)
+
+        meta = json.loads((self.model_dir / "export.json").read_text(encoding="utf-8"))
+        self._input_names = meta["input_names"]
+        self._max_length = meta["max_length"]
+        self._tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+
+        opts = ort.SessionOptions()
+        if self.threads:
+            opts.intra_op_num_threads = self.threads
+        self._session = ort.InferenceSession(
+            str(path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+
+    def encode(self, texts, batch_size=32):
+        out = []
+        for start in range(0, len(texts), batch_size):
+            enc = self._tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self._max_length,
+                return_tensors="np",
+            )
+            feeds = {name: enc[name].astype(np.int64) for name in self._input_names}
+            out.append(self._session.run(None, feeds)[0])
+        if not out:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(out).astype(np.float32)
+
+    def _export(self, target):
+        import torch
+        from sentence_transformers import SentenceTransformer
+
+        st = SentenceTransformer(self.model_name, device="cpu")
+        tokenizer = st.tokenizer
+        transformer = st[0].auto_model.eval()
+        input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids")
+                       if n in tokenizer.model_input_names]
+
+        class _MeanPooled(torch.nn.Module):
+            """Трансформер + mean-pooling по маске — как в SentenceTransformer."""
+
+            def __init__(self, model):
+                super().__init__()
+                self.model = model
+
+            def forward(self, *inputs):
+                kwargs = dict(zip(input_names, inputs))
+                hidden = self.model(**kwargs).last_hidden_state
+                mask = kwargs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+                return (hidden * mask).sum(1) / mask.sum(1).clamp(min=1e-9)
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        dummy = tokenizer(["пример текста"], return_tensors="pt")
+        axes = {n: {0: "batch", 1: "seq"} for n in input_names}
+        axes["embedding"] = {0: "batch"}
+        torch.onnx.export(
+            _MeanPooled(transformer),
+            tuple(dummy[n] for n in input_names),
+            str(target),
+            input_names=input_names,
+            output_names=["embedding"],
+            dynamic_axes=axes,
+            opset_version=17,
+            dynamo=False,
+        )
+        tokenizer.save_pretrained(self.model_dir)
+        (self.model_dir / "export.json").write_text(
+            json.dumps({"input_names": input_names, "max_length": st.max_seq_length}),
+            encoding="utf-8",
+        )
+
+
+def build_embedding_backend(name, model_name, quantize=False):
+    if name == "torch":
+        return TorchEmbeddingBackend(model_name)
+    if name == "onnx":
+        return OnnxEmbeddingBackend(model_name, quantize=quantize)
+    raise ValueError(f"Неизвестный бэкенд эмбеддингов: {name!r}")
+
+
+def embedding_signature(name, model_name, quantize=False, dim=None):
+    """
+    Чем посчитаны векторы: бэкенд, модель, квантование, размерность.
+    Векторы с разной подписью несравнимы — хранилища сверяют её при старте.
+    """
+    precision = "int8" if name == "onnx" and quantize else "fp32"
+    return f"{name}:{model_name}:{precision}:{dim}"
+
+
+class LazyEmbeddingModel:
+    """
+    Обёртка с интерфейсом encode(): модель грузится в фоновом потоке (start()),
+    encode() ждёт окончания загрузки. wait_ready() — то же ожидание, но без блокировки event loop.
+    """
+
+    def __init__(self, backend, logger=None):
+        self.backend = backend
+        self.logger = logger
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="embedding-warmup", daemon=True)
+            self._thread.start()
+        return self
+
+    def _load(self):
+        try:
+            self.backend.load()
+            if self.logger:
+                self.logger.debug("Модель эмбеддингов загружена: %s", type(self.backend).__name__)
+        except Exception as e:
+            self._error = e
+            if self.logger:
+                self.logger.error("Не удалось загрузить модель эмбеддингов: %s", e)
+        finally:
+            self._ready.set()
+
+    @property
+    def ready(self):
+        return self._ready.is_set() and self._error is None
+
+    async def wait_ready(self):
+        self.start()
+        await asyncio.to_thread(self._ready.wait)
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise RuntimeError("Модель эмбеддингов не загружена") from self._error
+        return self.backend.encode(texts, batch_size=batch_size)
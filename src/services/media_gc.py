@@ -0,0 +1,174 @@
+# src/services/media_gc.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta
+
+
+class MediaGC:
+    """
+    Сборщик мусора MEDIA_DIR с бюджетом по байтам.
+      • touch() — обращение к файлу (скачан, подготовлен, отправлен); копится в памяти
+        и раз в проход пишется в media_access;
+      • каталог обходится по кусочкам: за проход — scan_batch записей в потоке,
+        итератор продолжает с того же места в следующем проходе; после полного
+        обхода из media_access удаляются строки исчезнувших файлов;
+      • если сумма размеров больше budget — удаляются давно не использованные файлы,
+        кроме нужных новостям (ждущие обработки raw, не предложенные processed,
+        неподтверждённые sent и отправленные за retention) и тех, к которым
+        обращались позже min_age назад;
+      • брошенные временные файлы (*.part, *.tmp) старше часа удаляются.
+    """
+
+    TEMP_SUFFIXES = (".part", ".tmp")
+    TEMP_MAX_AGE = 3600
+
+    def __init__(
+        self,
+        *,
+        repo,
+        state_repo,
+        media_dir,
+        budget_bytes,
+        retention_days=7,
+        min_age=3600,
+        interval=600,
+        scan_batch=1000,
+        raw_watermark_key=None,
+        logger=None,
+    ):
+        self.repo = repo
+        self.state_repo = state_repo
+        self.media_dir = media_dir
+        self.budget = budget_bytes
+        self.retention = timedelta(days=retention_days)
+        self.min_age = timedelta(seconds=min_age)
+        self.interval = interval
+        self.scan_batch = scan_batch
+        self.raw_watermark_key = raw_watermark_key  # ProcessedService.WATERMARK_KEY; None — по дате
+        self.logger = logger
+        self._touched = {}   # file -> datetime
+        self._scan = None    # os.scandir между проходами
+        self._seen = set()
+        self._sweep_started = None
+        self._running = False
+
+    def touch(self, files):
+        now = datetime.utcnow()
+        for f in files:
+            if f:
+                self._touched[f] = now
+
+    # ───────────────────────── цикл ───────────────────────── #
+    async def run(self):
+        self._running = True
+        while self._running:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.collect()
+            except Exception as e:
+                if self.logger:
+                    self.logger.error("Ошибка очистки медиа: %s", e, exc_info=True)
+
+    async def stop(self):
+        """Останавливает цикл и сохраняет ещё не записанные обращения (dp.shutdown)."""
+        self._running = False
+        if self._scan is not None:
+            self._scan.close()
+            self._scan = None
+        await self._flush()
+
+    async def collect(self):
+        """Один проход: сброс обращений, следующий кусок обхода, вытеснение по бюджету."""
+        await self._flush()
+        await self._scan_step()
+        return await self._evict()
+
+    # ───────────────────────── шаги ───────────────────────── #
+    async def _flush(self):
+        touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        sizes = await asyncio.to_thread(self._sizes, list(touched))
+        self.repo.touch_many([(f, sizes[f], t) for f, t in touched.items() if f in sizes])
+
+    def _sizes(self, files):
+        out = {}
+        for f in files:
+            try:
+                out[f] = (self.media_dir / f).stat().st_size
+            except OSError:
+                pass
+        return out
+
+    async def _scan_step(self):
+        if self._scan is None:
+            self._scan = await asyncio.to_thread(os.scandir, self.media_dir)
+            self._seen = set()
+            self._sweep_started = datetime.utcnow()
+        rows, done = await asyncio.to_thread(self._read_batch)
+        self._seen.update(r[0] for r in rows)
+        self.repo.register_many(rows)
+        if done:
+            self._scan.close()
+            self._scan = None
+            self.repo.forget_missing(self._seen, self._sweep_started)
+            self._seen = set()
+
+    def _read_batch(self):
+        """Следующие scan_batch записей каталога → ([(file, size, mtime)], обход закончен)."""
+        rows, now = [], time.time()
+        for entry in self._scan:
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith(self.TEMP_SUFFIXES):
+                if now - st.st_mtime > self.TEMP_MAX_AGE:
+                    try:
+                        os.unlink(entry.path)
+                    except OSError:
+                        pass
+                continue
+            rows.append((entry.name, st.st_size, datetime.utcfromtimestamp(st.st_mtime)))
+            if len(rows) >= self.scan_batch:
+                return rows, False
+        return rows, True
+
+    async def _evict(self):
+        total = self.repo.total_size()
+        if total <= self.budget:
+            return 0
+        now = datetime.utcnow()
+        watermark = self.state_repo.get(self.raw_watermark_key) if self.raw_watermark_key else None
+        keep = self.repo.referenced(now - self.retention, watermark)
+        keep.update(self._touched)
+
+        victims, excess = [], total - self.budget
+        for f, size in self.repo.iter_lru(now - self.min_age):
+            if f in keep:
+                continue
+            victims.append(f)
+            excess -= size or 0
+            if excess <= 0:
+                break
+        if not victims:
+            if self.logger:
+                self.logger.warning("Медиа %.1f МБ сверх бюджета, но всё ещё нужно", (total - self.budget) / 2 ** 20)
+            return 0
+
+        await asyncio.to_thread(self._unlink, victims)
+        self.repo.delete(victims)
+        if self.logger:
+            self.logger.info("Очистка медиа: удалено файлов %d, освобождено %.1f МБ",
+                             len(victims), (total - self.budget - excess) / 2 ** 20)
+        return len(victims)
+
+    def _unlink(self, files):
+        for f in files:
+            try:
+                (self.media_dir / f).unlink(missing_ok=True)
+            except OSError:
+                pass
@@ -1,41 +1,215 @@
-import aiohttp, uuid, mimetypes
-from hashlib import md5
+import asyncio
+import uuid, mimetypes
+from hashlib import md5, sha256
 from pathlib import Path
 from urllib.parse import urlparse
 
+import aiohttp
+
+from src.utils.image_hash import dhash
+
+
+class MediaTooLarge(Exception):
+    pass
+
+
 class MediaService:
-    def __init__(self, logger, media_dir):
+    """
+    Скачивание медиа в media_dir:
+      • параллельно, но не больше concurrency загрузок всего и host_concurrency на хост;
+      • тело пишется на диск кусками по CHUNK во временный *.part и атомарно
+        переименовывается — недокачанный файл никогда не виден под итоговым именем;
+      • одновременные запросы одного URL сливаются в одну загрузку (single-flight);
+      • файл больше max_bytes обрывается сразу (по Content-Length или по ходу чтения).
+
+    С repo (MediaRepository) хранилище адресуется по содержимому: файл называется
+    по sha256 тела, одинаковое фото с разных CDN-URL хранится один раз, а почти-копии
+    (dHash в пределах phash_distance бит) ссылаются на файл первой картинки.
+
+    С image_prep (ImagePrep) картинки перед отправкой уменьшаются и перекодируются
+    в пуле процессов; возвращается имя подготовленного файла, оригинал остаётся
+    источником. Подготовленный файл назван по исходному и параметрам — второй раз
+    та же картинка не перекодируется. Слишком мелкие картинки отбрасываются (None).
+    """
+
+    CHUNK = 64 * 1024
+
+    def __init__(
+        self,
+        logger,
+        media_dir,
+        http,
+        *,
+        concurrency=8,
+        host_concurrency=3,
+        max_bytes=20 * 2 ** 20,
+        timeout=20,
+        repo=None,
+        phash_distance=6,
+        image_prep=None,
+        access=None,
+    ):
         self.logger = logger
         self.media_dir = media_dir  # теперь путь всегда приходит из DI!
+        self.http = http            # общий HttpClient из DI
+        self.host_concurrency = host_concurrency
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.repo = repo
+        self.phash_distance = phash_distance  # None — без поиска почти-копий
+        self._slots = asyncio.Semaphore(concurrency)
+        self.image_prep = image_prep
+        self.access = access  # MediaGC: отметки обращений к файлам
+        self._hosts = {}     # host -> Semaphore
+        self._inflight = {}  # url / имя подготовленного файла -> Task
+        self._too_small = set()
 
     async def download(self, url):
         # a) ручное добавление
         if not url:
             return f"{uuid.uuid4().hex[:16]}.bin"
 
+        derived = self._prepared_for(url)
+        if derived is not None:
+            if self.access is not None:
+                self.access.touch([derived])
+            return derived
+
+        filename = await self._fetch(url)
+        if filename and self.image_prep is not None:
+            source, filename = filename, await self._prepare(filename)
+            if self.access is not None:
+                self.access.touch([source])
+        if filename and self.access is not None:
+            self.access.touch([filename])
+        return filename
+
+    def _prepared_for(self, url):
+        """
+        Уже подготовленная картинка для url — даже если оригинал вытеснен MediaGC:
+        без этой проверки ради существующего производного файла качался бы весь оригинал.
+        """
+        if self.image_prep is None or self.repo is None:
+            return None
+        known = self.repo.file_for_url(url)
+        if not known or not self.image_prep.accepts(known):
+            return None
+        derived = self.image_prep.derived_name(known)
+        return derived if (self.media_dir / derived).exists() else None
+
+    async def _fetch(self, url):
         # b) скачивание по URL
         p = urlparse(url)
         if not p.scheme or not p.netloc:
             return None
 
+        if self.repo is not None:
+            known = self.repo.file_for_url(url)
+            if known and (self.media_dir / known).exists():
+                return known
+        # файлы, скачанные до хранилища по содержимому (имя по md5(url))
         ext = Path(p.path).suffix or ".bin"
-        filename = f"{md5(url.encode()).hexdigest()[:16]}{ext}"
-        path = self.media_dir / filename
-        if path.exists():
-            return filename
+        legacy = f"{md5(url.encode()).hexdigest()[:16]}{ext}"
+        if (self.media_dir / legacy).exists():
+            return legacy
+
+        return await self._single_flight(url, lambda: self._download(url, p.netloc, ext))
+
+    async def _single_flight(self, key, start):
+        """Одна задача на key, сколько бы корутин её ни ждали."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(start())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: отмена одного ожидающего не обрывает работу для остальных
+        return await asyncio.shield(task)
+
+    async def download_many(self, urls):
+        """Параллельная загрузка списка; порядок сохраняется, неудачные отбрасываются."""
+        files = await asyncio.gather(*(self.download(u) for u in urls))
+        return [f for f in files if f]
 
+    async def _download(self, url, host, ext):
+        host_slots = self._hosts.setdefault(host, asyncio.Semaphore(self.host_concurrency))
+        tmp = self.media_dir / f".{uuid.uuid4().hex}.part"
         try:
-            async with aiohttp.ClientSession() as s:
-                async with s.get(url, timeout=20) as resp:
+            async with host_slots, self._slots:
+                async with self.http.session.get(
+                    url, timeout=aiohttp.ClientTimeout(total=self.timeout)
+                ) as resp:
                     resp.raise_for_status()
-                    # уточняем расширение по Content-Type, если нужно
-                    if ext == ".bin":
-                        mime = resp.headers.get("content-type", "")
-                        ext2 = mimetypes.guess_extension(mime) or ".bin"
-                        filename = filename[:-4] + ext2
-                        path = self.media_dir / filename
-                    path.write_bytes(await resp.read())
-            return filename
+                    if resp.content_length and resp.content_length > self.max_bytes:
+                        raise MediaTooLarge(f"{resp.content_length} байт по Content-Length")
+                    # расширение по Content-Type: одинаковые байты → одинаковое имя при любом URL
+                    mime = resp.headers.get("content-type", "").split(";")[0].strip().lower()
+                    ext = mimetypes.guess_extension(mime) or ext
+                    digest, size = sha256(), 0
+                    with tmp.open("wb") as f:
+                        async for chunk in resp.content.iter_chunked(self.CHUNK):
+                            size += len(chunk)
+                            if size > self.max_bytes:
+                                raise MediaTooLarge(f"больше {self.max_bytes} байт")
+                            digest.update(chunk)
+                            f.write(chunk)
+            return await self._store(url, tmp, digest.hexdigest(), size, ext, mime)
+        except MediaTooLarge as e:
+            self.logger.warning("Пропущено %s: %s", url, e)
         except Exception as e:
             self.logger.error("Не скачалось %s: %s", url, e)
+        finally:
+            tmp.unlink(missing_ok=True)
+        return None
+
+    async def _store(self, url, tmp, digest, size, ext, mime):
+        """Кладёт скачанный tmp в хранилище; возвращает имя файла (возможно, уже существующего)."""
+        phash = None
+        if self.repo is not None:
+            existing = self.repo.file_for_hash(digest)
+            if existing and (self.media_dir / existing).exists():
+                self.repo.map_url(url, digest)
+                return existing
+
+            if self.phash_distance is not None and mime.startswith("image/") and mime != "image/gif":
+                phash = await asyncio.to_thread(dhash, tmp)
+            if phash is not None:
+                near = self.repo.nearest(phash, self.phash_distance)
+                if near and (self.media_dir / near[0]).exists():
+                    self.logger.debug("%s — почти-копия %s (%d бит)", url, near[0], near[1])
+                    self.repo.add_file(digest, near[0], size)
+                    self.repo.map_url(url, digest)
+                    return near[0]
+
+        filename = f"{digest[:32]}{ext}"
+        tmp.replace(self.media_dir / filename)
+        if self.repo is not None:
+            self.repo.add_file(digest, filename, size, phash)
+            self.repo.map_url(url, digest)
+        return filename
+
+    async def _prepare(self, filename):
+        """Имя подготовленной к отправке картинки; None — картинка слишком мелкая."""
+        prep = self.image_prep
+        derived = prep.derived_name(filename)
+        if not prep.accepts(filename) or filename == derived:
+            return filename
+        if (self.media_dir / derived).exists():
+            return derived
+        if filename in self._too_small:
+            return None
+
+        async def transcode():
+            try:
+                return await prep.run(self.media_dir / filename, self.media_dir / derived)
+            except Exception as e:
+                self.logger.warning("Не подготовлена картинка %s: %s", filename, e)
+                return "skip"
+
+        status = await self._single_flight(derived, transcode)
+        if status == "ok":
+            return derived
+        if status == "small":
+            self._too_small.add(filename)
+            self.logger.debug("Отброшена мелкая картинка %s", filename)
             return None
+        return filename
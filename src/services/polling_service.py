@@ -2,6 +2,13 @@
 import asyncio
 
 class PollingService:
+    """
+    Без scheduler — как раньше: все источники раз в interval, затем обработка и отправка.
+    Со scheduler (SourceScheduler) — у каждого источника свой цикл со своим интервалом,
+    а обработка и отправка запускаются после любого завершившегося опроса
+    (и не реже раза в interval).
+    """
+
     def __init__(
         self,
         *,
@@ -12,7 +19,8 @@ class PollingService:
         suggest_group_id,
         interval,
         first_run,
-        logger
+        logger,
+        scheduler=None,
     ):
         self.collector = collector_service
         self.processor = processed_service
@@ -23,20 +31,32 @@ class PollingService:
         self.first_run = first_run
         self._running = False
         self.logger = logger
+        self.scheduler = scheduler
+        self._collected = asyncio.Event()
 
     async def run(self):
         self.logger.info(f"Запуск NeuroScope")
         self._running = True
+        if self.scheduler is None:
+            await self._run_fixed()
+            return
+
+        tasks = [asyncio.create_task(self._source_loop(s)) for s in self.collector.sources]
+        try:
+            await self._process_loop()
+        finally:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_fixed(self):
         while self._running:
             try:
                 # 1) Собираем и сохраняем raw
                 await self.collector.collect_and_save()
 
-                # 2) Обработка (при первом прогоне без GPT)
-                processed_count = self.processor.process_and_save(self.first_run)
-
-                # 3) Отправка в Telegram и пометка
-                await self.sender.send(processed_count, self.first_run)
+                # 2-3) Обработка и отправка
+                await self._process_and_send(self.first_run)
 
                 # 4) Сбрасываем флаг первого прогона
                 if self.first_run:
@@ -47,5 +67,43 @@ class PollingService:
 
             await asyncio.sleep(self.interval)
 
+    async def _source_loop(self, scraper):
+        source = scraper.base_url
+        while self._running:
+            await asyncio.sleep(self.scheduler.delay(source))
+            try:
+                await self.collector.collect_and_save(scrapers=[scraper])
+            except Exception as e:
+                self.logger.error(f"Ошибка опроса {source}: {e}", exc_info=True)
+            # новые URL за опрос = скачанные детали (известные пропускаются)
+            self.scheduler.record(source, scraper.cycle_stats["fetched"])
+            self._collected.set()
+
+    async def _process_loop(self):
+        while self._running:
+            try:
+                await asyncio.wait_for(self._collected.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._collected.clear()
+
+            first_run = self.first_run
+            try:
+                await self._process_and_send(first_run)
+            except Exception as e:
+                self.logger.error(f"Ошибка в PollingService: {e}", exc_info=True)
+            # первый прогон заканчивается, когда каждый источник опрошен хотя бы раз
+            if first_run and self.scheduler.all_ran():
+                self.first_run = False
+
+    async def _process_and_send(self, first_run):
+        # Обработка (при первом прогоне без GPT); модель эмбеддингов могла ещё грузиться
+        await self.processor.wait_ready()
+        processed_count = self.processor.process_and_save(first_run)
+
+        # Отправка в Telegram и пометка
+        await self.sender.send(processed_count, first_run)
+
     def stop(self):
-        self._running = False
\ No newline at end of file
+        self._running = False
+        self._collected.set()
@@ -2,12 +2,14 @@
 
 class ProcessedService:
     """
-    1. Берёт всё из raw_repo.
+    1. Берёт из raw_repo новые записи (инкрементально — только то, чего нет в processed).
     2. Переводит EN→RU (TranslateService).
     3. При необходимости обрабатывает GPT.
     4. Сохраняет уникальные записи в processed_repo.
     """
 
+    WATERMARK_KEY = "processed.raw_seq"
+
     def __init__(
         self,
         *,
@@ -18,6 +20,10 @@ class ProcessedService:
         duplicate_filter,
         logger,
         use_chatgpt,
+        state_repo=None,
+        incremental=False,
+        chunk_size=200,
+        story_clusters=None,
     ):
         self.raw_repo = raw_repo
         self.proc_repo = processed_repo
@@ -26,58 +32,127 @@ class ProcessedService:
         self.dup_filter = duplicate_filter
         self.logger = logger
         self.use_chatgpt = use_chatgpt
+        self.state_repo = state_repo
+        self.incremental = incremental and state_repo is not None
+        self.chunk_size = chunk_size
+        self.clusters = story_clusters
+        self._seeded = False
 
     # ───────────────────────── helpers ───────────────────────── #
     def _already_done_ids(self):
         return self.proc_repo.all_field("id")
 
-    # ───────────────────────── core ──────────────────────────── #
-    def process_and_save(self, first_run):
+    def _full_chunks(self):
+        """Старый режим: весь raw_news против всего множества id из processed."""
         done_ids = self._already_done_ids()
         raw_items = self.raw_repo.fetch_all()
-        recent_texts = self.dup_filter.get_recent_texts(raw_items, done_ids)
-        batch = []
-
-        for item in raw_items:
-            if item.id in done_ids:
-                continue
-
-            text = item.text
-
-            # 1) проверка на похожие новости (за последние dub_hours_threshold)
-            if self.dup_filter.is_similar_recent(text, recent_texts):
-                self.logger.debug("Похожая новость уже есть, пропускаем id=%s", item.id)
-                continue
-
-            # 2) GPT-обработка
-            if not first_run and self.use_chatgpt:
-                try:
-                    text = self.chat_gpt.process(text)
-                except Exception as e:
-                    self.logger.error("GPT не справился для %s: %s", item.id, e)
-                    continue
-
-            processed = self.proc_repo.model(
-                id=item.id,
-                title=item.title,
-                url=item.url,
-                date=item.date,
-                text=text,
-                media_ids=item.media_ids,
-                language=item.language,
-                topic=item.topic,
-            )
-            batch.append(processed)
-
-        if not batch:
-            self.logger.debug("Нет новых элементов для обработки.")
-            return 0
+        recent_window = self.dup_filter.get_recent_window(raw_items, done_ids)
+        fresh = [(None, it) for it in raw_items if it.id not in done_ids]
+        return recent_window, [fresh] if fresh else []
+
+    def _incremental_chunks(self, watermark):
+        """Только raw-строки после водяного знака и без пары в processed (anti-join)."""
+        recent_window = None if self.clusters else self.dup_filter.fetch_recent_window(self.raw_repo)
+        chunks = self.raw_repo.iter_unmatched(
+            self.proc_repo.table, after_seq=watermark, chunk_size=self.chunk_size
+        )
+        return recent_window, chunks
 
+    def _select_fresh(self, items, recent_window):
+        """Что из чанка идёт дальше: лучшие варианты сюжетов либо просто непохожие на окно."""
+        if self.clusters is None:
+            return self.dup_filter.filter_similar(items, recent_window)
+
+        promoted, replaced = self.clusters.assign(items)
+        if replaced:
+            self.proc_repo.delete_ids(replaced)
+            self.logger.debug("Заменены лучшими вариантами сюжета: %s", replaced)
+        return promoted
+
+    def _process_item(self, item, first_run):
+        """False — временная ошибка, повторить позже."""
+        text = item.text
+
+        # GPT-обработка
+        if not first_run and self.use_chatgpt:
+            try:
+                text = self.chat_gpt.process(text)
+            except Exception as e:
+                self.logger.error("GPT не справился для %s: %s", item.id, e)
+                return False
+
+        return self.proc_repo.model(
+            id=item.id,
+            title=item.title,
+            url=item.url,
+            date=item.date,
+            text=text,
+            media_ids=item.media_ids,
+            language=item.language,
+            topic=item.topic,
+        )
+
+    def _save(self, batch):
         unique = self.dup_filter.filter(batch)
         if not unique:
             self.logger.debug("Все элементы оказались дубликатами.")
             return 0
+        return self.proc_repo.insert_news(unique)
+
+    async def wait_ready(self):
+        await self.dup_filter.wait_ready()
+
+    # ───────────────────────── core ──────────────────────────── #
+    def process_and_save(self, first_run):
+        if self.clusters is not None and not self._seeded:
+            self.clusters.seed()
+            self._seeded = True
+
+        watermark = self.state_repo.get(self.WATERMARK_KEY) if self.incremental else None
+        if self.incremental:
+            recent_window, chunks = self._incremental_chunks(watermark)
+        else:
+            recent_window, chunks = self._full_chunks()
+
+        saved = 0
+        seen = 0
+        stalled = False  # после временной ошибки водяной знак дальше не двигаем
+        for chunk in chunks:
+            # 1) похожие новости (за последние dub_hours_threshold и внутри чанка) — одним батчем;
+            #    при кластеризации — только лучшие варианты сюжетов
+            fresh = self._select_fresh([it for _, it in chunk], recent_window)
+            fresh_ids = {it.id for it in fresh}
+
+            batch = []
+            accepted = []
+            for seq, item in chunk:
+                seen += 1
+                if item.id not in fresh_ids:
+                    self.logger.debug("Похожая новость уже есть, пропускаем id=%s", item.id)
+                else:
+                    # 2) GPT-обработка
+                    processed = self._process_item(item, first_run)
+                    if processed is False:
+                        stalled = True
+                    else:
+                        batch.append(processed)
+                        accepted.append(item)
+                if self.incremental and not stalled:
+                    watermark = seq
+
+            if batch:
+                saved += self._save(batch)
+                if self.clusters is None:
+                    recent_window = self.dup_filter.extend_window(recent_window, accepted)
+            if self.incremental:
+                self.state_repo.set(self.WATERMARK_KEY, watermark)
+
+        if recent_window is not None:
+            self.dup_filter.save_window(recent_window)
+
+        if not seen:
+            self.logger.debug("Нет новых элементов для обработки.")
+            return 0
 
-        saved = self.proc_repo.insert_news(unique)
         self.logger.debug("Сохранили в processed: %d", saved)
         return saved
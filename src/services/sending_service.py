@@ -1,11 +1,11 @@
 import asyncio
-from pathlib import Path
+from datetime import datetime
+
 from src.bot.keyboards import main_keyboard
 from src.data_manager.models import SentNewsItem
 
 class SendingService:
     MAX_MEDIA   = 10
-    FILE_ID_MIN = 40
     CAPTION_MAX = 1024
     TEXT_MAX    = 4096
 
@@ -19,6 +19,7 @@ class SendingService:
         build_caption,
         build_meta,
         media_dir,
+        file_cache,
     ):
         self.bot   = bot
         self.chat  = chat_id
@@ -28,6 +29,7 @@ class SendingService:
         self.build_caption = build_caption
         self.build_meta = build_meta
         self.media_dir = media_dir
+        self.file_cache = file_cache  # TelegramFileCache: файл → file_id
 
     async def send(self, limit: int = 10, first_run: bool = False):
         items = self.processed_repo.fetch_unsuggested(limit)
@@ -81,7 +83,8 @@ class SendingService:
                         topic=news.topic,
                         confirmed=False,
                         main_message_id=main_mid,
-                        others_message_ids=album_ids
+                        others_message_ids=album_ids,
+                        sent_at=datetime.utcnow(),
                     )
                 ])
 
@@ -91,43 +94,50 @@ class SendingService:
                 self.logger.error("Ошибка при отправке новости %s: %s", news.id, e)
 
     async def _send_media(self, news, caption):
-        from aiogram.types import FSInputFile, InputMediaPhoto
-
         if not news.media_ids:
             return None, []
 
-        album = []
-        main_mid = None
-        album_ids = []
-        trimmed = False
-
-        for i, mid in enumerate(news.media_ids[: self.MAX_MEDIA]):
-            path = Path(self.media_dir) / mid
-            if path.exists():
-                media_src = FSInputFile(path)
-            elif len(mid) >= self.FILE_ID_MIN and "." not in mid:
-                media_src = mid
-            else:
+        album, names = self._build_album(news.media_ids, caption)
+        if not album:
+            return None, []
+
+        try:
+            msgs = await self._send_album(album)
+        except Exception as e:
+            if not (self.file_cache.is_stale_error(e) and self.file_cache.has_cached(names)):
+                self.logger.error("Ошибка при отправке альбома: %s", e)
+                return None, []
+            # Telegram отверг file_id — загружаем файлы заново
+            self.file_cache.forget(names)
+            album, names = self._build_album(news.media_ids, caption)
+            msgs = await self._safe_send_album(album)
+        self.file_cache.remember(names, msgs)
+
+        album_ids = [m.message_id for m in msgs]
+        main_mid = album_ids[0] if album_ids else None
+
+        return main_mid, album_ids
+
+    def _build_album(self, media_ids, caption):
+        """InputMediaPhoto-альбом и имена медиа в том же порядке."""
+        from aiogram.types import InputMediaPhoto
+
+        album, names = [], []
+        for mid in media_ids[: self.MAX_MEDIA]:
+            media_src = self.file_cache.source(mid)
+            if media_src is None:
                 self.logger.warning("Пропускаем медиа «%s»: файла нет", mid)
                 continue
 
             # Только к первой фотке прикрепляем подпись
-            if i == 0:
-                cap, cap_trim = self._clip(caption, self.CAPTION_MAX)
-                trimmed = trimmed or cap_trim
+            if not album:
+                cap, _ = self._clip(caption, self.CAPTION_MAX)
                 kwargs = {"caption": cap, "parse_mode": "HTML"}
             else:
                 kwargs = {}
             album.append(InputMediaPhoto(media=media_src, **kwargs))
-
-        if not album:
-            return None, []
-
-        msgs = await self._safe_send_album(album)
-        album_ids = [m.message_id for m in msgs]
-        main_mid = album_ids[0] if album_ids else None
-
-        return main_mid, album_ids
+            names.append(mid)
+        return album, names
 
     @classmethod
     def _clip(cls, text, limit):
@@ -135,14 +145,21 @@ class SendingService:
             return text, False
         return text[: limit - 1] + "…", True
 
-    async def _safe_send_album(self, album):
+    async def _send_album(self, album):
+        """send_media_group с одним повтором после флуд-контроля; прочие ошибки — наружу."""
         try:
             return await self.bot.send_media_group(self.chat, album)
         except Exception as e:
-            if hasattr(e, "retry_after"):
-                self.logger.warning("Флуд-контроль альбома: %.1f сек", e.retry_after)
-                await asyncio.sleep(e.retry_after)
-                return await self.bot.send_media_group(self.chat, album)
+            if not hasattr(e, "retry_after"):
+                raise
+            self.logger.warning("Флуд-контроль альбома: %.1f сек", e.retry_after)
+            await asyncio.sleep(e.retry_after)
+            return await self.bot.send_media_group(self.chat, album)
+
+    async def _safe_send_album(self, album):
+        try:
+            return await self._send_album(album)
+        except Exception as e:
             self.logger.error("Ошибка при отправке альбома: %s", e)
             return []
 
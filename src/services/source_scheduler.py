@@ -0,0 +1,91 @@
+# src/services/source_scheduler.py
+import random
+from datetime import datetime, timedelta
+
+
+class SourceScheduler:
+    """
+    Адаптивное расписание опроса: у каждого источника свой интервал и время следующего запуска.
+    1. После опроса оценивает темп публикаций источника (новых URL в секунду, EWMA).
+    2. Интервал = сколько ждать, чтобы набралось ~target_new новых статей, в пределах [min, max].
+       Пустой опрос (в т.ч. 304) — интервал растёт в IDLE_BACKOFF раз.
+    3. К следующему запуску добавляется джиттер ±jitter, чтобы источники не синхронизировались.
+    Состояние хранится в DuckDB; просроченные после рестарта запуски размазываются
+    по startup_spread секунд, а не стартуют все разом.
+    """
+
+    EWMA_ALPHA = 0.3
+    IDLE_BACKOFF = 1.5
+
+    def __init__(
+        self,
+        *,
+        repo,
+        sources,
+        base_interval,
+        min_interval,
+        max_interval,
+        target_new=3.0,
+        jitter=0.1,
+        startup_spread=30,
+        logger=None,
+    ):
+        self.repo = repo
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_new = target_new
+        self.jitter = jitter
+        self.logger = logger
+        self._ran = set()
+
+        stored = repo.load()
+        now = datetime.utcnow()
+        self.state = {}
+        for source in sources:
+            st = stored.get(source) or {
+                "interval": base_interval, "rate": None, "last_run": None, "next_run": None,
+            }
+            st["interval"] = self._clamp(st["interval"] or base_interval)
+            if st["next_run"] is None or st["next_run"] <= now:
+                st["next_run"] = now + timedelta(seconds=random.uniform(0, startup_spread))
+            self.state[source] = st
+
+    def _clamp(self, interval):
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def delay(self, source):
+        """Секунд до следующего запуска источника (0 — пора)."""
+        return max(0.0, (self.state[source]["next_run"] - datetime.utcnow()).total_seconds())
+
+    def all_ran(self):
+        """Каждый источник опрошен хотя бы раз с момента старта."""
+        return self._ran >= set(self.state)
+
+    def record(self, source, new_count):
+        """Учитывает результат опроса и планирует следующий; возвращает новый интервал (с)."""
+        st = self.state[source]
+        now = datetime.utcnow()
+        elapsed = (now - st["last_run"]).total_seconds() if st["last_run"] else st["interval"]
+
+        if new_count > 0:
+            rate = new_count / max(elapsed, 1.0)
+            st["rate"] = rate if st["rate"] is None else (
+                self.EWMA_ALPHA * rate + (1 - self.EWMA_ALPHA) * st["rate"]
+            )
+            interval = self.target_new / st["rate"]
+        else:
+            if st["rate"] is not None:
+                st["rate"] *= 1 - self.EWMA_ALPHA
+            interval = st["interval"] * self.IDLE_BACKOFF
+
+        st["interval"] = self._clamp(interval)
+        st["last_run"] = now
+        wait = st["interval"] * random.uniform(1 - self.jitter, 1 + self.jitter)
+        st["next_run"] = now + timedelta(seconds=wait)
+        self.repo.save(source, st["interval"], st["rate"], st["last_run"], st["next_run"])
+        self._ran.add(source)
+        if self.logger:
+            self.logger.debug(
+                "%s: новых %d, следующий опрос через %.0f с", source, new_count, wait
+            )
+        return st["interval"]
@@ -0,0 +1,149 @@
+# src/services/story_cluster_service.py
+import math
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+import numpy as np
+
+
+class StoryClusterService:
+    """
+    Вместо «кто первый скачан — тот и остался» собирает похожие новости в сюжеты:
+    1. Держит центроид каждого сюжета за окно dub_hours_threshold.
+    2. Новую новость присоединяет к ближайшему сюжету (косинус >= threshold) или заводит новый.
+    3. Оценивает вариант: длина текста, число медиа, вес источника из source_map.
+    4. В processed_news идёт только лучший вариант сюжета; если лучший приходит позже,
+       а прежний ещё не ушёл в предложку — прежний заменяется.
+    """
+
+    MIN_TEXT_LEN = 200   # короче — вариант почти не котируется
+    TEXT_CAP     = 3000  # длиннее — бонус за длину не растёт
+    MEDIA_WEIGHT = 0.2
+    MEDIA_CAP    = 5
+
+    def __init__(
+        self,
+        *,
+        cluster_repo,
+        duplicate_filter,
+        processed_repo,
+        source_weights,
+        threshold,
+        window_hours,
+        logger,
+    ):
+        self.repo = cluster_repo
+        self.dup_filter = duplicate_filter
+        self.proc_repo = processed_repo
+        self.source_weights = source_weights
+        self.threshold = threshold
+        self.window_hours = window_hours
+        self.logger = logger
+
+    # ───────────────────────── scoring ───────────────────────── #
+    def source_weight(self, url):
+        return self.source_weights.get(urlparse(str(url)).netloc, 1.0)
+
+    def score(self, item):
+        text_len = len(item.text or "")
+        length = math.log1p(min(text_len, self.TEXT_CAP)) / math.log1p(self.TEXT_CAP)
+        if text_len < self.MIN_TEXT_LEN:
+            length *= 0.1
+        media = self.MEDIA_WEIGHT * min(len(item.media_ids), self.MEDIA_CAP)
+        return self.source_weight(item.url) * (length + media)
+
+    # ───────────────────────── helpers ───────────────────────── #
+    def _already_suggested(self, news_id):
+        row = self.proc_repo.fetch_by_id(news_id)
+        return row is not None and row.suggested
+
+    @staticmethod
+    def _normalize(v):
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    # ───────────────────────── core ──────────────────────────── #
+    def seed(self):
+        """
+        Первый запуск с кластеризацией: раскладывает по сюжетам то, что уже лежит
+        в processed_news за окно, — иначе новые новости сравнивать не с чем и уже
+        разосланные сюжеты ушли бы повторно. Сохранённые варианты остаются лучшими.
+        """
+        if not self.repo.is_empty():
+            return 0
+        cutoff = datetime.utcnow() - timedelta(hours=self.window_hours)
+        ids = self.proc_repo.select_field_where("id", "date >= ?", [cutoff])
+        items = self.proc_repo.fetch_by_ids(ids)
+        if items:
+            self.assign(items, replace=False)
+            self.logger.info("Сюжеты заполнены из processed_news: %d новостей", len(items))
+        return len(items)
+
+    def assign(self, items, replace=True):
+        """
+        Распределяет items по сюжетам.
+        Возвращает (к продвижению в processed, id прежних лучших вариантов к удалению из processed).
+        replace=False — лучший вариант сюжета не вытесняется (засев уже сохранёнными).
+        """
+        if not items:
+            return [], []
+
+        embs = self.dup_filter.embeddings(items)
+        known = self.repo.fetch_members([it.id for it in items])
+        best_of = self.repo.fetch_best(set(known.values()))
+        cutoff = datetime.utcnow() - timedelta(hours=self.window_hours)
+        clusters, centroids = self.repo.fetch_active(cutoff)
+
+        changed = set()
+        members = []
+        promoted = []   # новости, ставшие лучшими в своём сюжете
+        replaced = []   # прежние лучшие, которых они вытеснили
+
+        for item, emb in zip(items, embs):
+            # повтор после временной ошибки: продвигаем снова, если всё ещё лучший
+            if item.id in known:
+                if best_of.get(known[item.id]) == item.id:
+                    promoted.append(item)
+                continue
+
+            score = self.score(item)
+            sims = centroids @ emb if len(centroids) else np.empty(0)
+            j = int(np.argmax(sims)) if len(sims) else -1
+
+            if j >= 0 and sims[j] >= self.threshold:
+                c = clusters[j]
+                centroids[j] = self._normalize(centroids[j] * c["size"] + emb)
+                c["size"] += 1
+                changed.add(j)
+                members.append((item.id, c["id"], score))
+                if replace and score > c["best_score"] and not self._already_suggested(c["best_id"]):
+                    self.logger.debug(
+                        "Сюжет %s: вариант %s лучше %s (%.3f > %.3f)",
+                        c["id"], item.id, c["best_id"], score, c["best_score"],
+                    )
+                    replaced.append(c["best_id"])
+                    c["best_id"], c["best_score"] = item.id, score
+                    promoted.append(item)
+                else:
+                    self.logger.debug("Новость %s добавлена в сюжет %s", item.id, c["id"])
+                continue
+
+            c = {"id": self.repo.next_id(), "size": 1, "best_id": item.id, "best_score": score}
+            clusters.append(c)
+            centroids = np.vstack([centroids, emb[None, :]]) if len(centroids) else emb[None, :].copy()
+            changed.add(len(clusters) - 1)
+            members.append((item.id, c["id"], score))
+            promoted.append(item)
+
+        idx = sorted(changed)
+        self.repo.save(
+            [clusters[i] for i in idx],
+            centroids[idx] if idx else centroids[:0],
+            members,
+            datetime.utcnow(),
+        )
+
+        # вытесненные в этом же батче не продвигаем вовсе
+        dropped = set(replaced)
+        promoted = [it for it in promoted if it.id not in dropped]
+        return promoted, [i for i in replaced if i not in {it.id for it in items}]
@@ -0,0 +1,75 @@
+# src/services/telegram_file_cache.py
+from pathlib import Path
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile
+
+
+class TelegramFileCache:
+    """
+    Кэш file_id загруженных в Telegram медиафайлов.
+    Первая отправка файла идёт как FSInputFile; file_id из ответа send_media_group
+    запоминается (в памяти и в DuckDB), и дальше — пересборка поста после
+    редактирования, повторные отправки — ссылаются на него без повторной загрузки байт.
+    Имена файлов адресуются по содержимому (MediaService), так что ключ по имени —
+    это ключ по хэшу содержимого.
+    """
+
+    FILE_ID_MIN = 40
+    # ответы Telegram на устаревший/чужой file_id (прочие ошибки к кэшу не относятся)
+    STALE_MARKS = ("file identifier", "file_id", "file reference", "file_reference", "wrong remote file", "wrong file")
+
+    def __init__(self, repo, media_dir, logger=None, access=None):
+        self.repo = repo
+        self.media_dir = Path(media_dir)
+        self.logger = logger
+        self.access = access  # MediaGC: отправка — тоже обращение к файлу
+        self._ids = None
+
+    @property
+    def ids(self):
+        if self._ids is None:
+            self._ids = self.repo.load()
+        return self._ids
+
+    @classmethod
+    def is_stale_error(cls, error):
+        """Ошибка отправки из-за отвергнутого file_id — только тогда кэш сбрасывается."""
+        if not isinstance(error, TelegramBadRequest):
+            return False
+        text = str(error).lower()
+        return any(mark in text for mark in cls.STALE_MARKS)
+
+    def has_cached(self, mids):
+        return any(m in self.ids for m in mids)
+
+    def source(self, mid):
+        """Что положить в InputMedia*: file_id из кэша, локальный файл или сам mid (file_id); None — нечего."""
+        if self.access is not None:
+            self.access.touch([mid])
+        if mid in self.ids:
+            return self.ids[mid]
+        path = self.media_dir / mid
+        if path.exists():
+            return FSInputFile(path)
+        if len(mid) >= self.FILE_ID_MIN and "." not in mid:
+            return mid
+        return None
+
+    def remember(self, mids, msgs):
+        """mids — имена медиа в порядке альбома, msgs — ответ send_media_group."""
+        for mid, msg in zip(mids, msgs):
+            if mid in self.ids or not msg.photo or not (self.media_dir / mid).exists():
+                continue
+            file_id = msg.photo[-1].file_id
+            self.ids[mid] = file_id
+            self.repo.save(mid, file_id)
+
+    def forget(self, mids):
+        """Сбросить file_id (например, Telegram их отверг) — следующая отправка загрузит файлы заново."""
+        stale = [m for m in mids if m in self.ids and (self.media_dir / m).exists()]
+        for m in stale:
+            del self.ids[m]
+        self.repo.delete(stale)
+        if stale and self.logger:
+            self.logger.warning("Сброшены file_id: %s", ", ".join(stale))
@@ -0,0 +1,30 @@
+# src/utils/image_hash.py
+"""
+Перцептивный хэш картинок (dHash, 64 бита): устойчив к уменьшению, пережатию
+и мелкой цветокоррекции — у копий расстояние Хэмминга обычно не больше 5–6 бит.
+Pillow импортируется лениво: без него хэш просто не считается.
+"""
+
+HASH_SIZE = 8
+
+
+def dhash(path):
+    """64-битный dHash файла картинки; None — не картинка или нечем читать."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        with Image.open(path) as img:
+            # JPEG декодируется сразу в уменьшенном масштабе — в разы быстрее полного
+            img.draft("L", (HASH_SIZE * 4, HASH_SIZE * 4))
+            small = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+    except Exception:
+        return None
+    px = small.tobytes()
+    value = 0
+    for row in range(HASH_SIZE):
+        line = px[row * (HASH_SIZE + 1):(row + 1) * (HASH_SIZE + 1)]
+        for col in range(HASH_SIZE):
+            value = (value << 1) | (line[col] > line[col + 1])
+    return value
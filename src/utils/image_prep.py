@@ -0,0 +1,91 @@
+# src/utils/image_prep.py
+"""
+Подготовка картинок к отправке в Telegram: уменьшение до max_side по большей стороне,
+перекодирование в progressive JPEG (или WebP) с quality, без EXIF/ICC/комментариев.
+Слишком мелкие картинки (иконки, счётчики, аватарки) отбрасываются.
+
+prepare_image выполняется в процессах ImagePrep — декодирование и ресайз
+держат GIL, в потоках они тормозили бы event loop.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+IMAGE_EXTS = frozenset({".jpg", ".jpeg", ".png", ".webp", ".bmp"})
+FORMATS = {"jpeg": ".jpg", "webp": ".webp"}
+
+
+def prepare_image(src, dst, max_side, quality, fmt, min_side):
+    """
+    src → dst. Возвращает "ok", "small" (меньше min_side по меньшей стороне)
+    или "skip" (не картинка / анимация — отправлять как есть).
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        if getattr(img, "is_animated", False):
+            return "skip"
+        if min(img.size) < min_side:
+            return "small"
+        # JPEG декодируется сразу в уменьшенном масштабе (кратно 1/2…1/8)
+        img.draft("RGB", (max_side, max_side))
+        img = ImageOps.exif_transpose(img)  # поворот из EXIF — до того, как EXIF выбросим
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            if fmt == "jpeg":
+                bg = Image.new("RGB", img.size, "white")
+                bg.paste(img, mask=img.getchannel("A"))
+                img = bg
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        if fmt == "webp":
+            img.save(tmp, "WEBP", quality=quality, method=4)
+        else:
+            img.save(tmp, "JPEG", quality=quality, optimize=True, progressive=True)
+    os.replace(tmp, dst)
+    return "ok"
+
+
+class ImagePrep:
+    """Пул процессов для prepare_image с параметрами из настроек."""
+
+    def __init__(self, max_workers=2, max_side=1280, quality=82, fmt="jpeg", min_side=200):
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат картинок: {fmt!r}")
+        self.max_workers = max_workers
+        self.max_side = max_side
+        self.quality = quality
+        self.fmt = fmt
+        self.min_side = min_side
+        self._executor = None
+
+    def derived_name(self, name):
+        """Имя подготовленного файла: от исходного и параметров, т.е. готовый ключ кэша."""
+        return f"{Path(name).stem}.{self.max_side}q{self.quality}{FORMATS[self.fmt]}"
+
+    def accepts(self, name):
+        return Path(name).suffix.lower() in IMAGE_EXTS
+
+    async def run(self, src, dst):
+        if self._executor is None:
+            # spawn, а не fork: в процессе уже крутятся потоки (загрузка модели, ParsePool),
+            # и fork унаследовал бы их захваченные блокировки
+            self._executor = ProcessPoolExecutor(
+                self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            partial(prepare_image, str(src), str(dst), self.max_side, self.quality, self.fmt, self.min_side),
+        )
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
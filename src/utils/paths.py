@@ -13,6 +13,12 @@ DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 DB = DATA_DIR / 'data.duckdb'
 
+# ANN-индекс эмбеддингов для дедупликации (лежит рядом с БД)
+DEDUP_INDEX = DATA_DIR / 'dedup_index.npz'
+
+# архив HTTP-ответов для record/replay (бенчмарки скраперов без живых сайтов)
+HTTP_ARCHIVE_DIR = DATA_DIR / 'http_archive'
+
 # папка для медиа (изображения, видео и пр.)
 MEDIA_DIR = BASE_DIR / 'media'
 MEDIA_DIR.mkdir(parents=True, exist_ok=True)
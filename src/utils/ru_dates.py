@@ -0,0 +1,98 @@
+# src/utils/ru_dates.py
+"""
+Даты из лент новостных сайтов: «только что», «5 минут назад», «сегодня, 10:15»,
+«вчера в 22:40», «12 мая», «12 мая 2024, 10:00», «12.05.2024 10:00», ISO 8601.
+Точность — до минуты; часовой пояс сайта не учитывается (для ограничения
+по возрасту в часах/днях это несущественно).
+"""
+import re
+from datetime import datetime, timedelta, timezone
+
+MONTHS = {
+    "января": 1, "февраля": 2, "марта": 3, "апреля": 4,
+    "мая": 5, "июня": 6, "июля": 7, "августа": 8,
+    "сентября": 9, "октября": 10, "ноября": 11, "декабря": 12,
+}
+
+UNITS = {
+    "секунд": "seconds", "минут": "minutes", "мин": "minutes",
+    "час": "hours", "ч": "hours", "дн": "days", "день": "days", "недел": "weeks",
+}
+
+_AGO      = re.compile(r"(\d+)?\s*([а-я]+)\.?\s+назад")
+_DAY      = re.compile(r"(сегодня|вчера|позавчера)")
+_TEXTDATE = re.compile(r"(\d{1,2})\s+([а-я]+)(?:\s+(\d{4}))?")
+_NUMDATE  = re.compile(r"(\d{1,2})\.(\d{1,2})\.(\d{2,4})")
+_TIME     = re.compile(r"(\d{1,2}):(\d{2})")
+
+
+def _unit(word):
+    for prefix, unit in UNITS.items():
+        if word.startswith(prefix):
+            return unit
+    return None
+
+
+def _with_time(day, text):
+    m = _TIME.search(text)
+    return day.replace(hour=int(m[1]), minute=int(m[2])) if m else day
+
+
+def parse_list_date(value, now=None):
+    """datetime (naive) или None, если формат не распознан."""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    iso = _iso(value)
+    if iso is not None:
+        return iso
+    now = now or datetime.utcnow()
+    text = " ".join(str(value).lower().replace("\xa0", " ").split())
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    if text in ("только что", "сейчас"):
+        return now
+
+    m = _AGO.search(text)
+    if m:
+        unit = _unit(m[2])
+        if unit:
+            return now - timedelta(**{unit: int(m[1] or 1)})
+
+    m = _DAY.search(text)
+    if m:
+        shift = {"сегодня": 0, "вчера": 1, "позавчера": 2}[m[1]]
+        return _with_time(midnight - timedelta(days=shift), text)
+
+    m = _TEXTDATE.search(text)
+    if m and m[2] in MONTHS:
+        year = int(m[3]) if m[3] else now.year
+        try:
+            day = datetime(year, MONTHS[m[2]], int(m[1]))
+        except ValueError:
+            return None
+        # «28 декабря» в январе — это прошлый год
+        if not m[3] and day > midnight + timedelta(days=1):
+            day = day.replace(year=year - 1)
+        return _with_time(day, text)
+
+    m = _NUMDATE.search(text)
+    if m:
+        year = int(m[3]) + (2000 if len(m[3]) == 2 else 0)
+        try:
+            return _with_time(datetime(year, int(m[2]), int(m[1])), text)
+        except ValueError:
+            return None
+    return None
+
+
+def _iso(value):
+    """ISO 8601 (атрибут datetime у <time>, sitemap) → naive UTC; None — не ISO."""
+    try:
+        dt = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
@@ -0,0 +1,47 @@
+# src/utils/simhash.py
+"""
+SimHash-подписи текста для дешёвого поиска почти-копий.
+64 бита по словесным шинглам; LSH-полосы — 4 куска по 16 бит:
+подписи на расстоянии Хэмминга <= 3 гарантированно совпадут хотя бы в одной полосе.
+"""
+import re
+from hashlib import blake2b
+
+import numpy as np
+
+SIMHASH_BITS = 64
+N_BANDS = 4
+BAND_BITS = SIMHASH_BITS // N_BANDS
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _shingles(text, size):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text, shingle_size=3):
+    """64-битный SimHash по шинглам из shingle_size слов."""
+    shingles = _shingles(text, shingle_size)
+    if not shingles:
+        return 0
+    digests = b"".join(blake2b(sh.encode(), digest_size=8).digest() for sh in shingles)
+    # (n_shingles, 64) бит, младший бит — первый; голосуем по каждому биту
+    bits = np.unpackbits(
+        np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8)[:, ::-1], axis=1, bitorder="little"
+    )
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0, bitorder="little").tobytes(), "little")
+
+
+def bands(sig):
+    """LSH-полосы подписи: N_BANDS чисел по BAND_BITS бит."""
+    mask = (1 << BAND_BITS) - 1
+    return [(sig >> (i * BAND_BITS)) & mask for i in range(N_BANDS)]
+
+
+def hamming(a, b):
+    return (a ^ b).bit_count()
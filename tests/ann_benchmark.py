@@ -0,0 +1,75 @@
+"""
+Recall и задержка IVFIndex против brute force на синтетических эмбеддингах.
+Запуск: python -m tests.ann_benchmark [n_points] [n_queries]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.data_manager.ivf_index import IVFIndex
+
+DIM = 384
+THRESHOLD = 0.90
+
+
+def normalize(m):
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def make_corpus(n, n_topics=200, seed=0):
+    """Кластеризованные векторы — как новости, сгруппированные по темам."""
+    rng = np.random.default_rng(seed)
+    topics = normalize(rng.normal(size=(n_topics, DIM)))
+    labels = rng.integers(0, n_topics, size=n)
+    return normalize(topics[labels] + 0.35 * rng.normal(size=(n, DIM)) / np.sqrt(DIM) * 8).astype(np.float32)
+
+
+def make_queries(corpus, n_queries, seed=1):
+    """Половина — перефразы существующих точек, половина — новые новости."""
+    rng = np.random.default_rng(seed)
+    half = n_queries // 2
+    base = corpus[rng.choice(len(corpus), size=half, replace=False)]
+    rewrites = normalize(base + 0.015 * rng.normal(size=base.shape))
+    fresh = make_corpus(n_queries - half, seed=seed + 1)
+    return np.vstack([rewrites, fresh]).astype(np.float32)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    corpus = make_corpus(n)
+    queries = make_queries(corpus, n_queries)
+    now = datetime.utcnow()
+    dates = [now - timedelta(minutes=i) for i in range(n)]
+
+    t = time.perf_counter()
+    exact = (queries @ corpus.T).max(axis=1)
+    brute_ms = (time.perf_counter() - t) * 1000
+    print(f"points={n} queries={n_queries} dim={DIM}")
+    print(f"brute force: {brute_ms:.1f} ms ({brute_ms / n_queries:.3f} ms/query)")
+
+    for n_lists, n_probe in ((64, 4), (64, 8), (128, 8), (256, 16)):
+        index = IVFIndex(DIM, n_lists=n_lists, n_probe=n_probe)
+        t = time.perf_counter()
+        index.add(np.arange(n), dates, corpus)
+        build_s = time.perf_counter() - t
+
+        t = time.perf_counter()
+        approx = index.max_similarity(queries)
+        ann_ms = (time.perf_counter() - t) * 1000
+
+        is_dup = exact >= THRESHOLD
+        recall = float(((approx >= THRESHOLD) & is_dup).sum() / max(is_dup.sum(), 1))
+        exact_hit = float(np.isclose(approx, exact, atol=1e-5).mean())
+        print(
+            f"IVF lists={n_lists:<4} probe={n_probe:<3} build={build_s:.2f}s "
+            f"search={ann_ms:.1f} ms ({ann_ms / n_queries:.3f} ms/query) "
+            f"dup-recall={recall:.3f} max-sim exact={exact_hit:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Паритет ONNX-бэкенда (fp32 и int8) с PyTorch-бэкендом по косинусной похожести.
+Запуск: python -m tests.embedding_parity [model_name]
+"""
+import sys
+import time
+
+import numpy as np
+
+from src.services.embedding_backends import OnnxEmbeddingBackend, TorchEmbeddingBackend
+
+TOLERANCE = {"onnx-fp32": 1e-3, "onnx-int8": 0.03}
+
+TEXTS = [
+    "Трехрядный кроссовер Evolute i-Space вышел на наш рынок в прошлом году – это первый гибрид отечественной марки.",
+    "Evolute i-Space, первый гибрид российской марки, появился в продаже в прошлом году.",
+    "На автозаводе «Моторинвест» в Липецкой области начнут собирать гибридные седаны Voyah Passion EVR.",
+    "Электромобиль Атом разработан под поколенческое изменение отношения к автомобилю.",
+    "Цена новинки — 5 590 000 рублей, однако с госпрограммой скидка составит 925 000 рублей.",
+    "КАМАЗ — ключевой инвестор проекта первого российского массового электромобиля.",
+]
+
+
+def cosine_matrix(embs):
+    embs = embs / np.linalg.norm(embs, axis=1, keepdims=True)
+    return embs @ embs.T
+
+
+def timed_encode(backend, repeat=5):
+    backend.encode(TEXTS)  # прогрев
+    t = time.perf_counter()
+    for _ in range(repeat):
+        embs = backend.encode(TEXTS)
+    return embs, (time.perf_counter() - t) / repeat * 1000
+
+
+def main():
+    model_name = sys.argv[1] if len(sys.argv) > 1 else "paraphrase-MiniLM-L6-v2"
+
+    torch_backend = TorchEmbeddingBackend(model_name)
+    torch_backend.load()
+    reference, torch_ms = timed_encode(torch_backend)
+    ref_scores = cosine_matrix(reference)
+    print(f"torch:     {torch_ms:.1f} ms / {len(TEXTS)} текстов")
+
+    failed = False
+    for label, quantize in (("onnx-fp32", False), ("onnx-int8", True)):
+        backend = OnnxEmbeddingBackend(model_name, quantize=quantize)
+        backend.load()
+        embs, ms = timed_encode(backend)
+        diff = float(np.abs(cosine_matrix(embs) - ref_scores).max())
+        ok = diff <= TOLERANCE[label]
+        failed |= not ok
+        print(f"{label}: {ms:.1f} ms, max |Δcos| = {diff:.5f} (допуск {TOLERANCE[label]}) {'OK' if ok else 'FAIL'}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
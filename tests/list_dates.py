@@ -0,0 +1,100 @@
+"""
+Даты строк списка Drom и Kolesa для ограничения догонялки по возрасту (row_date)
+и нормализация дат SelectorScraper (ISO из атрибута, «12 мая» из текста).
+Разметка — как на страницах-списках сайтов, даты — в их собственном виде.
+Запуск: python -m tests.list_dates
+"""
+import sys
+from datetime import datetime, timedelta
+
+from src.data_collector.web_scrapers.drom_scraper import DromNewsScraper
+from src.data_collector.web_scrapers.kolesa_news_scraper import KolesaNewsScraper
+from src.data_collector.web_scrapers.selector_scraper import SelectorScraper
+from src.data_manager.models import SelectorSpec
+from src.utils.file_utils import parse_date
+from src.utils.ru_dates import parse_list_date
+
+NOW = datetime(2026, 1, 10, 15, 30)
+
+DROM_LIST = """
+<div class="b-wrapper"><div class="b-content"><div class="b-left-side">
+<div class="b-media-query b-random-group">
+  <div class="b-info-block"><a class="b-info-block__cont" href="/news/1.html">
+    <div class="b-info-block__title">Lada Iskra получила вариатор</div>
+    <div class="b-info-block__text b-info-block__text_type_news-date">сегодня, 12:05</div></a></div>
+  <div class="b-info-block"><a class="b-info-block__cont" href="/news/2.html">
+    <div class="b-info-block__title">Haval обновил Jolion</div>
+    <div class="b-info-block__text b-info-block__text_type_news-date">28 декабря</div></a></div>
+</div></div></div></div>
+"""
+
+KOLESA_LIST = """
+<a class="post-list-item" href="/news/3">
+  <span class="post-name">Tenet T7 подешевел</span>
+  <span class="post-meta-item pull-right">2 часа назад</span></a>
+<a class="post-list-item" href="/news/4">
+  <span class="post-name">АвтоВАЗ уходит на четырёхдневку</span>
+  <span class="post-meta-item pull-right">5 января 2026</span></a>
+"""
+
+SELECTOR_LIST = """
+<article class="news"><a href="/n/1"><h2>Первая</h2></a><time datetime="2026-05-12T10:00:00+03:00">12 мая</time></article>
+<article class="news"><a href="/n/2"><h2>Вторая</h2></a><time>12 мая</time></article>
+<article class="news"><a href="/n/3"><h2>Третья</h2></a><time>на днях</time></article>
+"""
+
+SELECTOR_SPECS = [
+    (SelectorSpec(item="article.news", link="a", title="h2", date="time", date_attr="datetime"),
+     [datetime(2026, 5, 12, 7, 0), None, None]),
+    (SelectorSpec(item="article.news", link="a", title="h2", date="time"),
+     [parse_list_date("12 мая"), parse_list_date("12 мая"), None]),
+]
+
+CASES = [
+    ("только что", NOW),
+    ("5 минут назад", NOW - timedelta(minutes=5)),
+    ("час назад", NOW - timedelta(hours=1)),
+    ("3 дня назад", NOW - timedelta(days=3)),
+    ("вчера в 22:40", datetime(2026, 1, 9, 22, 40)),
+    ("12 мая 2024, 10:00", datetime(2024, 5, 12, 10, 0)),
+    ("28 декабря", datetime(2025, 12, 28)),
+    ("10.01.2026 09:15", datetime(2026, 1, 10, 9, 15)),
+    ("2026-01-10T12:00:00+03:00", datetime(2026, 1, 10, 9, 0)),
+    ("скоро", None),
+]
+
+
+def main():
+    failed = False
+    for text, expected in CASES:
+        got = parse_list_date(text, now=NOW)
+        ok = got == expected
+        failed |= not ok
+        print(f"{text!r:32} → {got} {'OK' if ok else f'FAIL (ожидалось {expected})'}")
+
+    # реальная разметка: row_date не должен падать в «дата неизвестна»
+    for scraper, html in (
+        (DromNewsScraper("https://news.drom.ru"), DROM_LIST),
+        (KolesaNewsScraper("https://www.kolesa.ru/news"), KOLESA_LIST),
+    ):
+        for row in scraper._parse_list(html):
+            date = scraper.row_date(row)
+            ok = isinstance(date, datetime)
+            failed |= not ok
+            print(f"{scraper.__class__.__name__}: {row[2]!r:20} → {date} {'OK' if ok else 'FAIL'}")
+
+    # SelectorScraper: в строке списка уже datetime или None — parse_date в CollectorService не падает
+    for spec, expected in SELECTOR_SPECS:
+        scraper = SelectorScraper("https://site.ru/news", selectors=spec)
+        rows, _ = scraper._parse_list(SELECTOR_LIST, scraper.base_url)
+        dates = [r[2] for r in rows]
+        ok = dates == expected and all(parse_date(d) == d for d in dates)
+        failed |= not ok
+        print(f"SelectorScraper date_attr={spec.date_attr!r}: {dates} {'OK' if ok else 'FAIL'}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
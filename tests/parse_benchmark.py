@@ -0,0 +1,189 @@
+"""
+Время разбора страницы: прежний BeautifulSoup(html.parser) против движка на lxml
+(src/data_collector/web_scrapers/parsing.py) для Drom, Kolesa и Autonews.
+Страницы синтетические, но со структурой реальных сайтов; результаты сверяются.
+Запуск: python -m tests.parse_benchmark [повторов]
+"""
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from src.data_collector.web_scrapers.auto_news_scraper import AutonewsNewsScraper
+from src.data_collector.web_scrapers.drom_scraper import DromNewsScraper
+from src.data_collector.web_scrapers.kolesa_news_scraper import KolesaNewsScraper
+
+N_ITEMS = 40
+PARAGRAPH = "Новая модель получила обновлённый двигатель, улучшенную подвеску и мультимедиа. " * 6
+NOISE = "".join(f'<div class="ad"><script>var x{i}=1;</script><p>реклама {i}</p></div>' for i in range(150))
+
+
+def page(body):
+    return f"<html><head><title>t</title><style>.a{{}}</style></head><body>{NOISE}{body}{NOISE}</body></html>"
+
+
+# ───────────────────────── страницы ───────────────────────── #
+def drom_list():
+    blocks = "".join(
+        f'<div class="b-info-block"><a class="b-info-block__cont" href="/{i}.html">'
+        f'<div class="b-info-block__title">Новость {i}</div>'
+        f'<div class="b-info-block__text_type_news-date">{i} мая</div></a></div>'
+        for i in range(N_ITEMS)
+    )
+    return page(
+        '<div class="b-wrapper"><div class="b-content"><div class="b-left-side">'
+        f'<div class="b-media-query b-random-group">{blocks}</div></div></div></div>'
+    )
+
+
+def drom_detail():
+    imgs = "".join(f'<div class="news_img"><a href="https://c.drom.ru/{i}.jpg">x</a></div>' for i in range(8))
+    text = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(12))
+    return page(f'<div id="news_text">{text}</div>{imgs}')
+
+
+def kolesa_list():
+    return page("".join(
+        f'<a class="post-list-item" href="/news/{i}"><span class="post-name">Новость {i}</span>'
+        f'<span class="post-meta-item pull-right">{i} мая</span></a>'
+        for i in range(N_ITEMS)
+    ))
+
+
+def kolesa_detail():
+    imgs = "".join(f'<img src="/uploads/{i}.jpg">' for i in range(8)) + '<img src="{{ tpl }}">'
+    text = "".join(f"<p>{PARAGRAPH}</p>" for _ in range(12))
+    return page(
+        '<span class="post-image" style="background-image: url(\'/uploads/main.jpg\')"></span>'
+        f'<div class="post-content">{text}</div><div class="post-gallery">{imgs}</div>'
+    )
+
+
+def autonews_list():
+    return page("".join(
+        f'<div class="item-big__inner"><a class="item-big__link" href="/news/{i}">'
+        f'<span class="item-big__title">Новость {i}</span></a>'
+        f'<span class="item-big__date">{i % 28 + 1} мая, 10:00</span></div>'
+        for i in range(N_ITEMS)
+    ))
+
+
+def autonews_detail():
+    text = "".join(f'<p>{PARAGRAPH}</p><img src="/img/{i}.jpg">' for i in range(12))
+    return page(f'<div class="article__text" itemprop="articleBody">{text}</div>')
+
+
+# ───────────────────── прежняя реализация (bs4) ───────────────────── #
+def drom_list_bs4(s, html):
+    out = []
+    soup = BeautifulSoup(html, "html.parser")
+    for block in soup.select(
+        "div.b-wrapper div.b-content div.b-left-side "
+        "div.b-media-query.b-random-group div.b-info-block"
+    ):
+        a_tag = block.find("a", class_="b-info-block__cont")
+        title_tag = block.find("div", class_="b-info-block__title")
+        date_tag = block.find("div", class_="b-info-block__text_type_news-date")
+        title = title_tag.get_text(strip=True) if title_tag else None
+        url = a_tag.get("href") if a_tag else None
+        date = date_tag.get_text(strip=True) if date_tag else None
+        if url and not url.startswith("http"):
+            url = urljoin(s.base_url, url)
+        if title and url:
+            out.append((title, url, date))
+    return out
+
+
+def drom_detail_bs4(s, html):
+    soup = BeautifulSoup(html, "html.parser")
+    block = soup.select_one("#news_text")
+    text = block.get_text(strip=True, separator="\n") if block else ""
+    return text, [a.get("href") for a in soup.select("div.news_img > a") if a.get("href")]
+
+
+def kolesa_list_bs4(s, html):
+    out = []
+    for link in BeautifulSoup(html, "html.parser").select("a.post-list-item"):
+        href = link.get("href")
+        if href and not href.startswith("http"):
+            href = urljoin(s.BASE_HOST, href)
+        title_tag = link.select_one("span.post-name")
+        date_tag = link.select_one("span.post-meta-item.pull-right")
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        date = date_tag.get_text(strip=True) if date_tag else ""
+        if title and href:
+            out.append((title, href, date))
+    return out
+
+
+def kolesa_detail_bs4(s, html):
+    soup = BeautifulSoup(html, "html.parser")
+    block = soup.select_one("div.post-content")
+    text = block.get_text(strip=True, separator="\n") if block else ""
+    media = []
+    for img in soup.select("div.post-gallery img"):
+        src = img.get("src")
+        if not src or ("{{" in src and "}}" in src):
+            continue
+        media.append(src if src.startswith(("http://", "https://")) else urljoin(s.BASE_HOST, src))
+    main = soup.select_one("span.post-image")
+    if main and main.has_attr("style") and "url(" in main["style"]:
+        img_url = main["style"].split("url(")[1].split(")")[0].strip("\"'")
+        if img_url and not ("{{" in img_url and "}}" in img_url):
+            media.insert(0, img_url if img_url.startswith(("http://", "https://")) else urljoin(s.BASE_HOST, img_url))
+    return text, media
+
+
+def autonews_list_bs4(s, html):
+    out = []
+    for block in BeautifulSoup(html, "html.parser").select("div.item-big__inner"):
+        link_tag = block.select_one("a.item-big__link")
+        url = urljoin(s.base_url, link_tag.get("href", "") if link_tag else "")
+        title_tag = block.select_one("span.item-big__title")
+        title = title_tag.get_text(strip=True) if title_tag else ""
+        date_tag = block.select_one("span.item-big__date")
+        out.append((title, url, s._parse_date(date_tag.get_text(strip=True) if date_tag else "")))
+    return out
+
+
+def autonews_detail_bs4(s, html):
+    content = BeautifulSoup(html, "html.parser").select_one("div.article__text[itemprop='articleBody']")
+    text = content.get_text(strip=True, separator="\n") if content else ""
+    media = [urljoin(s.base_url, img.get("src")) for img in content.find_all("img") if img.get("src")] if content else []
+    return text, media
+
+
+CASES = [
+    ("drom list", DromNewsScraper("https://news.drom.ru/"), drom_list, drom_list_bs4, "_parse_list"),
+    ("drom detail", DromNewsScraper("https://news.drom.ru/"), drom_detail, drom_detail_bs4, "_parse_detail"),
+    ("kolesa list", KolesaNewsScraper("https://www.kolesa.ru/news"), kolesa_list, kolesa_list_bs4, "_parse_list"),
+    ("kolesa detail", KolesaNewsScraper("https://www.kolesa.ru/news"), kolesa_detail, kolesa_detail_bs4, "_parse_detail"),
+    ("autonews list", AutonewsNewsScraper("https://www.autonews.ru/news"), autonews_list, autonews_list_bs4, "_parse_list"),
+    ("autonews detail", AutonewsNewsScraper("https://www.autonews.ru/news"), autonews_detail, autonews_detail_bs4, "_parse_detail"),
+]
+
+
+def timed(fn, repeats):
+    t = time.perf_counter()
+    for _ in range(repeats):
+        result = fn()
+    return (time.perf_counter() - t) * 1000 / repeats, result
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    failed = False
+    print(f"{'страница':<16} {'KB':>5} {'bs4 ms':>8} {'lxml ms':>8} {'x':>6}  совпадает")
+    for name, scraper, make, baseline, method in CASES:
+        html = make()
+        old_ms, old = timed(lambda: baseline(scraper, html), repeats)
+        new_ms, new = timed(lambda: getattr(scraper, method)(html), repeats)
+        same = old == new
+        failed |= not same
+        print(f"{name:<16} {len(html) // 1024:>5} {old_ms:>8.2f} {new_ms:>8.2f} {old_ms / new_ms:>6.1f}  {same}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
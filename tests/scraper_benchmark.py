@@ -0,0 +1,123 @@
+"""
+Бенчмарк скраперов из SCRAPER_REGISTRY на записанном корпусе (HttpArchive) — без живых сайтов.
+Источники берутся из source_map в config.json.
+
+Запись корпуса (один раз, нужна сеть):  python -m tests.scraper_benchmark --record
+Прогон:                                 python -m tests.scraper_benchmark [--latency 0.05] [--runs 3]
+
+Отчёт по источнику: страниц/с, мс разбора на страницу (время в пуле парсинга),
+пик памяти Python-объектов (tracemalloc) и промахи архива; в конце — maxrss процесса.
+"""
+import argparse
+import asyncio
+import logging
+import resource
+import threading
+import time
+import tracemalloc
+
+from src.data_collector.fetcher import Fetcher
+from src.data_collector.http_archive import HttpArchive
+from src.data_collector.http_client import HttpClient
+from src.data_collector.web_scrapers import SCRAPER_REGISTRY
+from src.data_collector.web_scrapers.parsing import ParsePool
+from src.utils.file_utils import load_app_config
+from src.utils.paths import CONFIG_DIR, HTTP_ARCHIVE_DIR
+
+
+class TimedParsePool(ParsePool):
+    """ParsePool, который считает чистое время разбора внутри потоков."""
+
+    def __init__(self, max_workers=2):
+        super().__init__(max_workers)
+        self.seconds = 0.0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    async def run(self, fn, *args):
+        def timed():
+            t = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.seconds += time.perf_counter() - t
+                    self.calls += 1
+        return await super().run(timed)
+
+
+def archive_counter(archive):
+    return archive.stats["recorded"] if archive.mode == "record" else archive.stats["hits"] + archive.stats["misses"]
+
+
+async def bench_source(topic, spec, archive, runs):
+    cls = SCRAPER_REGISTRY[spec.class_]
+    rows = []
+    for _ in range(runs):
+        http = HttpClient()
+        pool = TimedParsePool()
+        scraper = cls.from_spec(spec, http=http, fetcher=Fetcher(http, archive=archive, retries=0))
+        scraper.parse_pool = pool
+        pages_before = archive_counter(archive)
+        misses_before = archive.stats["misses"]
+
+        tracemalloc.start()
+        t = time.perf_counter()
+        try:
+            items = await scraper.run()
+        except Exception as e:
+            logging.getLogger("bot").error("%s: %s", spec.url, e)
+            items = []
+        elapsed = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        await http.close()
+        await pool.close()
+        pages = archive_counter(archive) - pages_before
+        rows.append({
+            "items": len(items),
+            "pages": pages,
+            "pages_s": pages / elapsed if elapsed else 0.0,
+            "parse_ms": pool.seconds * 1000 / max(pool.calls, 1),
+            "peak_mb": peak / 2 ** 20,
+            "misses": archive.stats["misses"] - misses_before,
+        })
+    best = max(rows, key=lambda r: r["pages_s"])
+    return topic, spec, best
+
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default=str(CONFIG_DIR))
+    ap.add_argument("--archive", default=str(HTTP_ARCHIVE_DIR))
+    ap.add_argument("--record", action="store_true", help="скачать корпус из сети")
+    ap.add_argument("--latency", type=float, default=0.0, help="задержка ответа при воспроизведении, с")
+    ap.add_argument("--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    cfg = load_app_config(args.config)
+    archive = HttpArchive(args.archive, mode="record" if args.record else "replay", latency=args.latency)
+    runs = 1 if args.record else args.runs
+
+    specs = [(topic, spec) for topic, lst in cfg.source_map.items() for spec in lst]
+    covered = {spec.class_ for _, spec in specs}
+    for name in sorted(set(SCRAPER_REGISTRY) - covered):
+        print(f"{name}: нет источника в {args.config} — пропущен")
+
+    print(f"режим={archive.mode} latency={args.latency}s прогонов={runs}")
+    print(f"{'источник':<40} {'статей':>6} {'стр.':>5} {'стр/с':>8} {'разбор мс/стр':>14} {'пик МБ':>7} {'промахи':>7}")
+    for topic, spec in specs:
+        if spec.class_ not in SCRAPER_REGISTRY:
+            print(f"{spec.url}: класс {spec.class_} не зарегистрирован")
+            continue
+        _, _, r = await bench_source(topic, spec, archive, runs)
+        print(
+            f"{str(spec.url)[:40]:<40} {r['items']:>6} {r['pages']:>5} {r['pages_s']:>8.1f} "
+            f"{r['parse_ms']:>14.2f} {r['peak_mb']:>7.1f} {r['misses']:>7}"
+        )
+    print(f"maxrss процесса: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} МБ")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())